@@ -0,0 +1,258 @@
+"""
+로테이션된 로그 아카이브(logs/YYYY-MM-DD-N.log.gz)로 player_stats를 과거 기록까지 채웁니다.
+
+아카이브를 스트리밍으로 압축 해제하며 프로세스 풀에서 병렬로 파싱하고,
+결과를 플레이어별로 합쳐 한 번의 배치로 DB에 반영합니다.
+이미 반영된 아카이브는 log_backfill 테이블에 기록되어 다시 실행해도 중복 집계되지 않습니다.
+
+봇이 실시간으로 반영하기 시작한 날(log_live_ingest) 이후의 아카이브는 이미 집계되었으므로 처리하지 않습니다.
+--until을 생략하면 그 날짜를 쓰고, 그보다 뒤의 --until은 거부합니다.
+
+실행: docker compose exec bot-server python backfill.py [--until 2025-12-01] [--dry-run]
+"""
+import argparse
+import asyncio
+import datetime
+import gzip
+import os
+import resource
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from core.log_parser import LogParser, ArchiveClock, ARCHIVE_NAME_PATTERN, archive_day, archive_sort_key
+from core.logger import setup_logging
+from core.player_index import PlayerIndex, is_player_name
+from core.stats_reader import StatsReader
+
+SLAIN_BY = "was slain by "
+
+
+def parse_archive(path):
+    """
+    아카이브 하나를 파싱하여 집계 결과를 반환합니다 (프로세스 풀 워커).
+    PvP 킬러는 모든 아카이브의 접속 기록을 모은 뒤 판별해야 하므로 원문 그대로 돌려줍니다.
+    """
+    # 빈 known_players로 파싱하여 킬러 판별은 메인 프로세스에서 수행
+    parser = LogParser(event_callback=None)
+    # 로그에는 시각만 있으므로 실시간 재생과 같은 규칙으로 파일명의 날짜와 합침 (자정을 넘기면 다음 날)
+    clock = ArchiveClock(archive_day(path))
+
+    increments = {}
+    last_seen = {}
+    slain_by = Counter()
+    logins = set()
+    lines = 0
+    events = 0
+
+    def add(player, stat):
+        player_stats = increments.setdefault(player, {})
+        player_stats[stat] = player_stats.get(stat, 0) + 1
+
+    with gzip.open(path, "rb") as f:
+        for raw in f:
+            lines += 1
+            line = raw.decode("utf-8", errors="ignore")
+            # 이벤트가 아닌 라인의 시각으로도 자정을 넘겼는지 추적
+            at = clock.at(line)
+            event = parser.parse_line(line)
+            if not event:
+                continue
+            events += 1
+            event_type, data = event
+
+            if event_type == "login":
+                logins.add(data["player"])
+                if at:
+                    last_seen.setdefault(data["player"], {})["last_login"] = at
+            elif event_type == "logout":
+                if at:
+                    last_seen.setdefault(data["player"], {})["last_logout"] = at
+            elif event_type == "advancement":
+                add(data["player"], "advancements")
+            elif event_type == "death":
+                add(data["victim"], "deaths")
+                if data["reason"].startswith(SLAIN_BY):
+                    slain_by[data["reason"][len(SLAIN_BY):]] += 1
+
+    return {
+        "path": path,
+        "size": os.path.getsize(path),
+        "lines": lines,
+        "events": events,
+        "increments": increments,
+        "last_seen": last_seen,
+        "slain_by": slain_by,
+        "logins": logins,
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def find_archives(logs_dir, until=None):
+    archives = []
+    for entry in os.scandir(logs_dir):
+        match = ARCHIVE_NAME_PATTERN.match(entry.name)
+        if not match:
+            continue
+        if until and match.group(1) >= until:
+            continue
+        archives.append(entry.path)
+    archives.sort(key=archive_sort_key)
+    return archives
+
+
+def merge_results(results, known_players):
+    """
+    아카이브별 결과를 시간 순서대로 합칩니다.
+    플레이어 이름 형식이 아닌 대상(채팅 속 "died" 등)은 배치 전체가 DB에서 거부되지 않도록 뺍니다.
+    반환: (increments, timestamps, files)
+    """
+    players = PlayerIndex(known_players)
+    for result in results:
+        players.update(result["logins"])
+
+    increments = {}
+    timestamps = {}
+    kill_cache = {}
+    for result in results:
+        for player, stats in result["increments"].items():
+            if not is_player_name(player):
+                continue
+            merged = increments.setdefault(player, {})
+            for stat, value in stats.items():
+                merged[stat] = merged.get(stat, 0) + value
+
+        # 같은 킬러 문구는 한 번만 판별
+        for killer_text, count in result["slain_by"].items():
+            if killer_text not in kill_cache:
+                kill_cache[killer_text] = players.match_prefix(killer_text.strip())
+            killer = kill_cache[killer_text]
+            if killer:
+                merged = increments.setdefault(killer, {})
+                merged["kills"] = merged.get("kills", 0) + count
+
+        # 아카이브를 시간 순으로 처리하므로 뒤의 값이 더 최근
+        for player, columns in result["last_seen"].items():
+            if not is_player_name(player):
+                continue
+            timestamps.setdefault(player, {}).update(columns)
+
+    files = [(os.path.basename(r["path"]), r["events"]) for r in results]
+    return increments, timestamps, files
+
+
+async def run(args, database):
+    """
+    백필 전체를 이벤트 루프 하나에서 실행합니다. DB 풀과 쓰기 버퍼는 처음 연결한 루프에 묶이므로
+    이미 반영된 파일 조회와 결과 기록을 같은 연결에서 처리합니다.
+    반환: (increments, timestamps, files) - 반영한(dry run이면 반영했을) 결과
+    """
+    logs_dir = os.path.join(args.mc_root, "logs")
+    if args.dry_run:
+        return await backfill_archives(args, find_archives(logs_dir, args.until), None)
+
+    await database.connect()
+    try:
+        await database.init_db()
+        until = resolve_until(args.until, await database.get_live_ingest_start())
+        done = await database.get_backfilled_files()
+        archives = [a for a in find_archives(logs_dir, until) if os.path.basename(a) not in done]
+        return await backfill_archives(args, archives, database)
+    finally:
+        await database.close()
+
+
+def resolve_until(until, live_start):
+    """
+    처리할 아카이브의 상한 날짜(YYYY-MM-DD, 미포함)를 정합니다.
+    live_start: 봇이 실시간으로 반영하기 시작한 날 (date, 기록이 없으면 None)
+    """
+    if live_start is None:
+        if until is None:
+            raise SystemExit(
+                "봇의 실시간 반영 시작일이 기록되어 있지 않습니다. 중복 집계를 막기 위해 --until(봇 배포일)을 지정하세요."
+            )
+        return until
+    live_start = live_start.isoformat()
+    if until is None:
+        print(f"--until not given, using the first live-ingested day {live_start}.")
+        return live_start
+    if until > live_start:
+        raise SystemExit(
+            f"--until {until}이(가) 봇이 실시간으로 반영하기 시작한 날({live_start})보다 뒤입니다. "
+            f"그 날 이후의 로그는 이미 집계되었으므로 --until은 {live_start} 이하여야 합니다."
+        )
+    return until
+
+
+async def backfill_archives(args, archives, database):
+    if not archives:
+        print("No archives to backfill.")
+        return {}, {}, []
+
+    stats_reader = StatsReader(
+        stats_dir=os.path.join(args.mc_root, "world", "stats"),
+        usercache_path=os.path.join(args.mc_root, "usercache.json"),
+    )
+    stats_reader.load_usercache()
+
+    print(f"Backfilling {len(archives)} archives with {args.workers} workers...")
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    cpu_start = os.times()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        # gather는 입력 순서를 유지하므로 결과도 시간 순서
+        results = await asyncio.gather(*(loop.run_in_executor(pool, parse_archive, a) for a in archives))
+    parse_elapsed = time.perf_counter() - start
+
+    increments, timestamps, files = merge_results(results, stats_reader.uuid_map.keys())
+
+    if database is not None:
+        await database.record_backfill(files, increments, timestamps)
+    elapsed = time.perf_counter() - start
+    cpu_end = os.times()
+
+    gz_bytes = sum(r["size"] for r in results)
+    lines = sum(r["lines"] for r in results)
+    events = sum(r["events"] for r in results)
+    cpu = (cpu_end.user - cpu_start.user) + (cpu_end.system - cpu_start.system) \
+        + (cpu_end.children_user - cpu_start.children_user) + (cpu_end.children_system - cpu_start.children_system)
+    main_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    worker_rss = max(r["max_rss_kb"] for r in results) / 1024
+
+    print(f"archives : {len(results)} ({gz_bytes / 1e6:.1f} MB gz), {lines:,} lines, {events:,} events")
+    print(f"players  : {len(increments):,} with stat changes, {len(timestamps):,} with login/logout times")
+    print(f"parse    : {parse_elapsed:.2f}s ({gz_bytes / 1e6 / parse_elapsed:.1f} MB/s gz, {lines / parse_elapsed:,.0f} lines/s)")
+    print(f"total    : {elapsed:.2f}s wall, {cpu:.2f}s CPU{' (dry run)' if database is None else ''}")
+    print(f"peak RSS : main {main_rss:.1f} MB, worker {worker_rss:.1f} MB")
+    return increments, timestamps, files
+
+
+def iso_date(value):
+    """아카이브 파일명과 문자열로 비교하므로 YYYY-MM-DD 형식으로 맞춥니다."""
+    return datetime.date.fromisoformat(value).isoformat()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mc-root", default="/mc-logs", help="마인크래프트 데이터 디렉토리")
+    parser.add_argument(
+        "--until", type=iso_date,
+        help="이 날짜(YYYY-MM-DD) 이전의 아카이브만 처리 (기본: 봇이 실시간으로 반영하기 시작한 날, 그보다 뒤는 거부)",
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="파싱 프로세스 수")
+    parser.add_argument("--dry-run", action="store_true", help="DB에 쓰지 않고 파싱 결과와 성능만 출력")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    setup_logging()
+
+    from core.db import db
+
+    asyncio.run(run(args, db))
+
+
+if __name__ == "__main__":
+    main()
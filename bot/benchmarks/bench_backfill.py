@@ -0,0 +1,264 @@
+"""
+로그 백필(backfill.py) 종단간 검증 및 벤치마크.
+
+임시 디렉토리에 마인크래프트 데이터(usercache.json, world/stats)와 로테이션된 아카이브
+(logs/YYYY-MM-DD-N.log.gz, 하루 --files-per-day개, 파일마다 --lines줄)를 만들고,
+1) backfill.py --dry-run을 별도 프로세스로 실행하여 CLI 경로를 확인하고,
+2) 봇이 마지막 날부터 실시간으로 반영했다고 두고 backfill.run을 이벤트 루프 하나에서
+   DB에 연결(쓰기 버퍼 포함)한 채 실행하여
+   - 그 날 이후까지 포함하는 --until은 거부하는지,
+   - --until을 생략하면 그 전날까지만 처리하고, 업적/사망/PvP 킬 집계가 아카이브 원문에서 직접 센 값과 같은지
+   확인합니다. 실시간 반영 시작일 기록이 없으면 --until 없이 실행을 거부하는지도 확인합니다.
+자정을 넘기는 아카이브의 접속/종료 시각을 실시간 재생과 같은 날짜로 보는지도 확인합니다.
+--dsn을 주면 실제 Postgres의 별도 스키마(bench_backfill)에 반영한 뒤 player_stats 값을 확인하고,
+한 번 더 실행하여 이미 반영된 아카이브를 다시 집계하지 않는지도 확인합니다. 끝나면 스키마를 삭제합니다.
+--dsn이 없으면 쿼리 수를 세는 대용 풀에 기록합니다.
+실행: cd bot && python -m benchmarks.bench_backfill [--days 7] [--files-per-day 2] [--lines 20000] [--dsn postgresql://...]
+"""
+import argparse
+import asyncio
+import datetime
+import gzip
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from collections import Counter
+
+import asyncpg
+
+import backfill
+from core.db import Database
+from core.log_parser import LogParser, ArchiveClock, archive_day
+from core.player_index import is_player_name
+from benchmarks.corpus import generate_log_lines, make_players, write_mc_root
+from benchmarks.fake_db import CountingPool
+
+SCHEMA = "bench_backfill"
+SLAIN_BY_PLAYER = re.compile(r'was slain by (\S+)')
+FIRST_DAY = datetime.date(2025, 1, 1)
+
+
+def write_archives(logs_dir, args):
+    """
+    아카이브를 쓰고 (날짜별로 원문에서 직접 센 기대값 {날짜: {플레이어: {통계: 값}}}, 등장한 플레이어 목록)을 반환합니다.
+    파일마다 다른 시드의 플레이어가 등장하므로 모두 usercache에 넣어 킬러 판별이 원문과 같도록 합니다.
+    이름 붙은 몹이나 채팅처럼 플레이어 이름이 아닌 사망 대상은 백필도 세지 않습니다.
+    """
+    scanner = LogParser()
+    expected = {}
+    players = []
+
+    for day in range(args.days):
+        date = (FIRST_DAY + datetime.timedelta(days=day)).isoformat()
+        day_expected = expected.setdefault(date, {})
+
+        def add(player, stat):
+            player_stats = day_expected.setdefault(player, {})
+            player_stats[stat] = player_stats.get(stat, 0) + 1
+
+        for n in range(1, args.files_per_day + 1):
+            seed = day * args.files_per_day + n
+            names = make_players(args.players, seed)
+            players.extend(names)
+            lines = generate_log_lines(args.lines, args.players, seed=seed)
+            with gzip.open(os.path.join(logs_dir, f"{date}-{n}.log.gz"), "wt", encoding="utf-8") as f:
+                f.write("".join(line + "\n" for line in lines))
+            for line in lines:
+                event = scanner.parse_line(line)
+                if not event:
+                    continue
+                event_type, data = event
+                if event_type == "advancement":
+                    add(data["player"], "advancements")
+                elif event_type == "death":
+                    if is_player_name(data["victim"]):
+                        add(data["victim"], "deaths")
+                    match = SLAIN_BY_PLAYER.search(line)
+                    if match and match.group(1) in names:
+                        add(match.group(1), "kills")
+    return expected, list(dict.fromkeys(players))
+
+
+def expected_until(expected, until):
+    """until 이전 날짜의 기대값을 플레이어별로 합칩니다."""
+    merged = {}
+    for date, day_expected in expected.items():
+        if date >= until:
+            continue
+        for player, stats in day_expected.items():
+            player_stats = merged.setdefault(player, {})
+            for stat, value in stats.items():
+                player_stats[stat] = player_stats.get(stat, 0) + value
+    return merged
+
+
+def totals(increments):
+    counter = Counter()
+    for stats in increments.values():
+        counter.update(stats)
+    return counter
+
+
+async def backfill_once(args, backfill_args, live_start=None):
+    """
+    봇과 같이 풀을 만들고 쓰기 버퍼를 시작한 Database로 backfill.run을 실행합니다.
+    live_start: 봇이 실시간으로 반영하기 시작한 날 (대용 풀에서는 DB 대신 돌려줌, 실제 DB에서는 log_live_ingest에 기록)
+    """
+    database = Database()
+    if args.dsn:
+        database.pool = await asyncpg.create_pool(
+            args.dsn, server_settings={"search_path": SCHEMA}
+        )
+        if live_start:
+            async with database.pool.acquire() as conn:
+                await database._create_schema(conn)
+                await conn.execute(
+                    "INSERT INTO log_live_ingest (first_day) VALUES ($1) ON CONFLICT (id) DO UPDATE SET first_day = $1;",
+                    live_start
+                )
+    else:
+        database.pool = CountingPool(rtt=0)
+
+        async def get_live_ingest_start():
+            return live_start
+
+        database.get_live_ingest_start = get_live_ingest_start
+    database.writer.start()
+    pool = database.pool
+    result = await backfill.run(backfill_args, database)
+    return result, pool
+
+
+def refused(args, backfill_args, live_start):
+    try:
+        asyncio.run(backfill_once(args, backfill_args, live_start))
+    except SystemExit as e:
+        print(f"refused : {e}")
+        return True
+    return False
+
+
+async def fetch_stats(dsn):
+    conn = await asyncpg.connect(dsn, server_settings={"search_path": SCHEMA})
+    try:
+        rows = await conn.fetch("SELECT player_name, advancements, deaths, kills FROM player_stats;")
+    finally:
+        await conn.close()
+    return {
+        row["player_name"]: {k: row[k] for k in ("advancements", "deaths", "kills") if row[k]}
+        for row in rows
+    }
+
+
+async def reset_schema(dsn, create=True):
+    conn = await asyncpg.connect(dsn)
+    try:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;")
+        if create:
+            await conn.execute(f"CREATE SCHEMA {SCHEMA};")
+    finally:
+        await conn.close()
+
+
+# 자정 직전 라인이 몇 초 거꾸로 찍힌 뒤(허용 오차 안) 자정을 넘기는 아카이브
+MIDNIGHT_LINES = [
+    "[23:59:50] [Server thread/INFO]: Steve joined the game",
+    "[23:59:58] [Server thread/INFO]: Alex joined the game",
+    "[23:59:40] [Server thread/INFO]: Steve has made the advancement [Stone Age]",
+    "[23:59:55] [Server thread/INFO]: Alex left the game",
+    "[00:00:05] [Server thread/INFO]: Steve left the game",
+]
+
+
+def check_midnight(logs_dir):
+    """백필이 실시간 재생(ArchiveClock)과 같은 규칙으로 아카이브 라인의 날짜를 정하는지 확인합니다."""
+    path = os.path.join(logs_dir, "2024-12-31-1.log.gz")
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write("".join(line + "\n" for line in MIDNIGHT_LINES))
+    try:
+        result = backfill.parse_archive(path)
+    finally:
+        os.remove(path)
+
+    clock = ArchiveClock(archive_day(path))
+    times = [clock.at(line) for line in MIDNIGHT_LINES]
+    expected = {
+        "Steve": {"last_login": times[0], "last_logout": times[4]},
+        "Alex": {"last_login": times[1], "last_logout": times[3]},
+    }
+    assert result["last_seen"] == expected, f"백필과 실시간 재생의 시각이 다름: {result['last_seen']}"
+    assert times[3].date() == datetime.date(2024, 12, 31), "허용 오차 안에서 거꾸로 간 시각을 다음 날로 넘김"
+    assert times[4].date() == datetime.date(2025, 1, 1), "자정을 넘긴 라인을 같은 날로 봄"
+    print("midnight: ok (backfill dates archive lines like live replay)")
+
+
+def run(args):
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, "logs"))
+        expected_by_date, players = write_archives(os.path.join(root, "logs"), args)
+        write_mc_root(root, players, mined_entries=10)
+        archive_count = args.days * args.files_per_day
+        end = (FIRST_DAY + datetime.timedelta(days=args.days)).isoformat()
+        # 마지막 날부터 봇이 실시간으로 반영했다고 둠
+        live_start = FIRST_DAY + datetime.timedelta(days=args.days - 1)
+        expected = expected_until(expected_by_date, live_start.isoformat())
+        print(f"{archive_count} archives, {archive_count * args.lines:,} lines, {len(players)} players, "
+              f"live ingest from {live_start}")
+        check_midnight(os.path.join(root, "logs"))
+
+        # 1) CLI 경로 (DB 없이)
+        subprocess.run(
+            [sys.executable, "backfill.py", "--mc-root", root, "--until", end,
+             "--workers", str(args.workers), "--dry-run"],
+            check=True,
+        )
+
+        def parse(*extra):
+            return backfill.parse_args(["--mc-root", root, "--workers", str(args.workers), *extra])
+
+        if args.dsn:
+            asyncio.run(reset_schema(args.dsn))
+        try:
+            # 2) 실시간 반영과 겹치는 범위는 거부
+            assert refused(args, parse("--until", end), live_start), "실시간 반영 이후 날짜를 포함하는 --until을 허용함"
+            if not args.dsn:
+                assert refused(args, parse(), None), "실시간 반영 시작일 기록 없이 --until을 생략해도 실행됨"
+
+            # 3) --until 생략: 실시간 반영 시작일 전날까지만 반영
+            (increments, timestamps, files), pool = asyncio.run(backfill_once(args, parse(), live_start))
+            assert increments == expected, (
+                f"집계 불일치: expected {dict(totals(expected))}, got {dict(totals(increments))}"
+            )
+            assert len(files) == archive_count - args.files_per_day
+            print(f"backfill: ok ({dict(totals(increments))}, {len(timestamps)} players with login/logout times)")
+
+            if args.dsn:
+                assert asyncio.run(fetch_stats(args.dsn)) == expected, "player_stats 값 불일치"
+                # 같은 아카이브를 다시 실행해도 중복 집계하지 않음
+                (increments, _, files), _ = asyncio.run(backfill_once(args, parse(), live_start))
+                assert not files and not increments, "이미 반영된 아카이브를 다시 집계함"
+                assert asyncio.run(fetch_stats(args.dsn)) == expected, "다시 실행 후 player_stats 값이 바뀜"
+                print("rerun   : ok (no archives backfilled twice)")
+            else:
+                print(f"db      : {pool.queries} queries {pool.by_statement}")
+        finally:
+            if args.dsn:
+                asyncio.run(reset_schema(args.dsn, create=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--files-per-day", type=int, default=2)
+    parser.add_argument("--lines", type=int, default=20000, help="아카이브 하나의 라인 수")
+    parser.add_argument("--players", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--dsn", help="실제 Postgres DSN (bench_backfill 스키마를 만들고 삭제합니다)")
+    args = parser.parse_args()
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+!chart 직접 렌더링 벤치마크 (Prometheus query_range + numpy + matplotlib, 로컬 가짜 Prometheus).
+
+구간(1h / 24h / 7d)별로 조회, 파싱, 다운샘플링, 그리기 단계의 지연 시간과 메모리(RSS, 파싱/다운샘플링 tracemalloc 최대)를 측정하고,
+- native      : 수집 주기 해상도로 조회 + 픽셀 폭 기준 최소/최대 다운샘플링 (core.prom_chart)
+- raw         : 같은 데이터를 다운샘플링 없이 모두 그림
+- step        : 그라파나처럼 step = 구간 / 폭 으로 건너뛰어 조회 (짧은 TPS 급락이 보이는지 확인)
+을 비교합니다. --grafana-url 과 --grafana-token, --panel-id 를 주면 실제 헤드리스 렌더러 지연 시간도 함께 측정합니다.
+(렌더러 메모리는 `docker stats grafana-renderer` 로 확인)
+실행: cd bot && python -m benchmarks.bench_chart_render [--repeat 5] [--width 1000]
+"""
+import argparse
+import asyncio
+import json
+import re
+import resource
+import statistics
+import threading
+import time
+import tracemalloc
+
+import aiohttp
+import numpy as np
+from aiohttp import web
+
+# 테스트용 지표: 이름 -> 시리즈 수
+METRICS = {"mc_tps": 1, "mc_players_online_total": 1, "mc_jvm_memory": 3, "mc_entities_total": 6}
+RANGES = ["now-1h", "now-24h", "now-7d"]
+SCRAPE_INTERVAL = 15
+# 10시간 주기로 한 번씩, 한 수집 주기 동안만 TPS가 급락
+DIP_EVERY = 36000
+DIP_VALUE = 3.0
+METRIC_NAME = re.compile(r"mc_\w+")
+
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+class FakePrometheus:
+    """query_range만 흉내내는 가짜 Prometheus (별도 스레드의 이벤트 루프에서 실행)."""
+
+    def __init__(self, host="127.0.0.1"):
+        self.host = host
+        self.port = None
+        self.requests = 0
+        self._loop = None
+        self._runner = None
+        self._thread = None
+
+    def series(self, name, start, end, step):
+        ts = np.arange(start, end + step / 2, step)
+        result = []
+        for i in range(METRICS.get(name, 1)):
+            values = 18 + 2 * np.sin(ts / 900 + i) + i * 5
+            if name == "mc_tps":
+                values[ts % DIP_EVERY < SCRAPE_INTERVAL] = DIP_VALUE
+            result.append({
+                "metric": {"__name__": name, "instance": "mc-server:9225", "area": f"area{i}"},
+                "values": [[float(t), f"{v:.4f}"] for t, v in zip(ts.tolist(), values.tolist())],
+            })
+        return result
+
+    async def query_range(self, request):
+        self.requests += 1
+        q = request.query
+        start, end, step = float(q["start"]), float(q["end"]), float(q["step"])
+        start -= start % step
+        name = METRIC_NAME.search(q["query"]).group()
+        body = {"status": "success", "data": {"resultType": "matrix", "result": self.series(name, start, end, step)}}
+        return web.Response(body=json.dumps(body).encode(), content_type="application/json")
+
+    def start_in_thread(self):
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            app = web.Application()
+            app.router.add_get("/api/v1/query_range", self.query_range)
+            self._runner = web.AppRunner(app)
+            self._loop.run_until_complete(self._runner.setup())
+            site = web.TCPSite(self._runner, self.host, 0)
+            self._loop.run_until_complete(site.start())
+            self.port = site._server.sockets[0].getsockname()[1]
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop_thread(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+
+def make_spec(name):
+    return {
+        "title": name, "unit": "bytes" if name == "mc_jvm_memory" else "", "min": None, "max": None,
+        "queries": [(name, "{{area}}")],
+    }
+
+
+async def staged_render(prom_chart, session, url, spec, time_from, width, height, mode):
+    """render_panel과 같은 과정을 단계별로 시간을 재며 실행합니다."""
+    timings = {}
+    now = time.time()
+    start, end = prom_chart.parse_time(time_from, now), now
+    if mode == "step":
+        step = max(1, int((end - start) / width))
+    else:
+        step = prom_chart.query_step(start, end, SCRAPE_INTERVAL)
+
+    t = time.perf_counter()
+    results = [
+        await prom_chart.query_range(session, url, prom_chart.expand_expr(expr, step, end - start, SCRAPE_INTERVAL),
+                                     start, end, step)
+        for expr, _ in spec["queries"]
+    ]
+    timings["fetch"] = time.perf_counter() - t
+
+    tracemalloc.start()
+    t = time.perf_counter()
+    parsed = [prom_chart.parse_matrix(result) for result in results]
+    timings["parse"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    series = []
+    points = 0
+    lowest = float("inf")
+    for (expr, legend_format), items in zip(spec["queries"], parsed):
+        for metric, ts, values in items:
+            ts, values = prom_chart.insert_gaps(ts, values, step)
+            if mode == "native":
+                ts, values = prom_chart.downsample(ts, values, width)
+            points += len(ts)
+            lowest = min(lowest, float(np.nanmin(values)))
+            series.append((prom_chart.format_legend(legend_format, metric, expr), ts, values))
+    timings["downsample"] = time.perf_counter() - t
+
+    _, peak = tracemalloc.get_traced_memory()
+    # tracemalloc은 matplotlib을 크게 느리게 하므로 그리기 전에 끔 (그리기 메모리는 RSS로 확인)
+    tracemalloc.stop()
+
+    t = time.perf_counter()
+    png = prom_chart.draw_png(spec, series, start, end, width, height)
+    timings["draw"] = time.perf_counter() - t
+    return timings, points, lowest, len(png), peak
+
+
+async def renderer_latency(args, repeat):
+    """실제 grafana-image-renderer 경유 렌더링 지연 시간 (선택)."""
+    url = (f"{args.grafana_url}/render/d-solo/{args.dashboard}/dashboard?panelId={args.panel_id}"
+           f"&from=now-1h&to=now&width={args.width}&height={args.height}&tz=Asia%2FSeoul")
+    headers = {"Authorization": f"Bearer {args.grafana_token}"}
+    latencies = []
+    async with aiohttp.ClientSession() as session:
+        for _ in range(repeat):
+            t = time.perf_counter()
+            async with session.get(url, headers=headers) as resp:
+                await resp.read()
+            latencies.append(time.perf_counter() - t)
+    return latencies
+
+
+async def run(args):
+    rss_before = rss_mb()
+    from core import prom_chart
+    # 글꼴 캐시 등 첫 그리기 초기화 비용은 측정에서 제외
+    prom_chart.draw_png(make_spec("warmup"), [], 0, 3600, args.width, args.height)
+    rss_loaded = rss_mb()
+
+    server = FakePrometheus().start_in_thread()
+    rows = []
+    try:
+        async with aiohttp.ClientSession() as session:
+            for time_from in RANGES:
+                for mode in ("native", "raw", "step"):
+                    totals, stages, peaks = [], {}, []
+                    for _ in range(args.repeat):
+                        for name in METRICS:
+                            timings, points, lowest, size, peak = await staged_render(
+                                prom_chart, session, server.url, make_spec(name), time_from,
+                                args.width, args.height, mode,
+                            )
+                            totals.append(sum(timings.values()))
+                            peaks.append(peak)
+                            for stage, elapsed in timings.items():
+                                stages.setdefault(stage, []).append(elapsed)
+                            if name == "mc_tps":
+                                dip_visible = lowest <= DIP_VALUE
+                                tps_points = points
+                    rows.append((time_from, mode, totals, stages, max(peaks), dip_visible, tps_points))
+
+            # 실제 코그 경로 (render_panel, 스레드에서 그리기) 종단 지연 시간
+            end_to_end = []
+            for _ in range(args.repeat):
+                t = time.perf_counter()
+                await prom_chart.render_panel(session, server.url, make_spec("mc_tps"), "now-24h", "now",
+                                              args.width, args.height, scrape_interval=SCRAPE_INTERVAL)
+                end_to_end.append(time.perf_counter() - t)
+    finally:
+        server.stop_thread()
+
+    print(f"{len(METRICS)} panels x {args.repeat} repeats, {args.width}x{args.height}px, scrape {SCRAPE_INTERVAL}s")
+    print(f"{'range':<8} {'mode':<7} {'p50 ms':>7} {'max ms':>7} {'fetch':>6} {'parse':>6} {'ds':>5} {'draw':>6} "
+          f"{'tps pts':>8} {'dip':>4} {'peak MB':>8}")
+    for time_from, mode, totals, stages, peak, dip_visible, tps_points in rows:
+        med = {stage: statistics.median(values) * 1000 for stage, values in stages.items()}
+        print(f"{time_from:<8} {mode:<7} {statistics.median(totals) * 1000:>7.1f} {max(totals) * 1000:>7.1f} "
+              f"{med['fetch']:>6.1f} {med['parse']:>6.1f} {med['downsample']:>5.1f} {med['draw']:>6.1f} "
+              f"{tps_points:>8,} {'yes' if dip_visible else 'no':>4} {peak / 1024 / 1024:>8.1f}")
+    print(f"render_panel (24h, end to end): p50 {statistics.median(end_to_end) * 1000:.1f} ms")
+    print(f"process RSS: {rss_before:.0f} MB before import, {rss_loaded:.0f} MB after numpy/matplotlib, "
+          f"peak {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+    if args.grafana_url and args.grafana_token and args.panel_id:
+        latencies = await renderer_latency(args, args.repeat)
+        print(f"grafana-image-renderer (1h): p50 {statistics.median(latencies) * 1000:.1f} ms, "
+              f"max {max(latencies) * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--width", type=int, default=1000)
+    parser.add_argument("--height", type=int, default=500)
+    parser.add_argument("--grafana-url", help="비교할 실제 그라파나 주소 (예: http://localhost:3000)")
+    parser.add_argument("--grafana-token")
+    parser.add_argument("--dashboard", default="minecraft-server")
+    parser.add_argument("--panel-id", type=int)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
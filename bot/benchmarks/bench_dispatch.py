@@ -0,0 +1,108 @@
+"""
+LogParser.process_line 디스패처 벤치마크.
+
+기존 방식(패턴 4개를 순서대로 search)과 사전 필터 기반 단일 스캔 방식의 처리량(lines/s)을
+현실적인 혼합 로그 코퍼스로 비교하고, 두 방식이 같은 이벤트를 만드는지 검증합니다.
+실행: cd bot && python -m benchmarks.bench_dispatch
+"""
+import argparse
+import contextlib
+import os
+import time
+
+from core.log_parser import LogParser, PATTERNS
+from benchmarks.corpus import generate_log_lines
+
+
+class LegacyLogParser(LogParser):
+    """사전 필터 도입 이전의 process_line (비교 기준)."""
+
+    def process_line(self, line):
+        parts = line.split(']: ', 1)
+        if len(parts) < 2:
+            return
+        message = ": " + parts[1].strip()
+
+        match = PATTERNS['login'].search(message)
+        if match:
+            player = match.group(1)
+            self.known_players.add(player)
+            self.event_callback("login", {"player": player})
+            return
+
+        match = PATTERNS['logout'].search(message)
+        if match:
+            player = match.group(1)
+            self.event_callback("logout", {"player": player, "mined_stats": self.stats_reader.get_mined_counts(player)})
+            return
+
+        match = PATTERNS['advancement'].search(message)
+        if match:
+            self.event_callback("advancement", {"player": match.group(1), "advancement": match.group(2)})
+            return
+
+        match = PATTERNS['death'].search(message)
+        if match:
+            victim, reason_part, killer_part = match.group(1), match.group(2), match.group(3)
+            is_pvp = False
+            killer = None
+            if "was slain by" in reason_part and killer_part:
+                clean_killer_part = killer_part.strip()
+                for player in self.known_players:
+                    if clean_killer_part == player or clean_killer_part.startswith(f"{player} "):
+                        is_pvp = True
+                        killer = player
+                        break
+            self.event_callback("death", {
+                "victim": victim, "killer": killer, "is_pvp": is_pvp,
+                "reason": f"{reason_part} {killer_part}".strip()
+            })
+
+
+def make_parser(cls, events, players):
+    parser = cls(event_callback=lambda event_type, data: events.append((event_type, data)))
+    # 통계 파일 I/O는 측정 대상이 아니므로 제외
+    parser.stats_reader.get_mined_counts = lambda player: {}
+    parser.known_players.update(players)
+    return parser
+
+
+def measure(cls, lines, players, repeat):
+    best = float("inf")
+    events = []
+    for _ in range(repeat):
+        events = []
+        parser = make_parser(cls, events, players)
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            for line in lines:
+                parser.process_line(line)
+            elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+    return len(lines) / best, events
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=200_000)
+    parser.add_argument("--players", type=int, default=50)
+    parser.add_argument("--event-ratio", type=float, default=0.05)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    lines = generate_log_lines(args.lines, args.players, args.event_ratio)
+    players = {line.split(": ", 1)[1].split(" ")[0] for line in lines if line.endswith("joined the game")}
+
+    legacy_rate, legacy_events = measure(LegacyLogParser, lines, players, args.repeat)
+    new_rate, new_events = measure(LogParser, lines, players, args.repeat)
+
+    print(f"corpus: {args.lines:,} lines, {len(new_events):,} events")
+    print(f"legacy  : {legacy_rate:>12,.0f} lines/s")
+    print(f"prefilter: {new_rate:>11,.0f} lines/s  (x{new_rate / legacy_rate:.2f})")
+    # 현재 파서는 접속/퇴장에 라인 시각(at)을 붙이므로 그 밖의 내용을 비교
+    new_events = [(event_type, {k: v for k, v in data.items() if k != "at"}) for event_type, data in new_events]
+    print(f"identical events: {legacy_events == new_events}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+로그 이벤트 전달 벤치마크 (파서 스레드 -> 이벤트 루프).
+
+파서 스레드가 사망/접속/퇴장 이벤트를 몰아서 내보낼 때
+- legacy: 이벤트마다 run_coroutine_threadsafe (개수 제한 없음, 디스코드 미연결 시 버림)
+- bus   : EventBus (크기 제한 + 고정 작업자 + 플레이어별 순서 보장, 미연결 동안 보관)
+의 동시 실행 코루틴 수, DB 풀 대기자 수, 플레이어별 순서 위반 수, 버려진 이벤트 수, 지연 시간을 비교합니다.
+처리기는 DB 풀(크기 --pool)을 잡고 --db-ms 동안 쓰고, 디스코드로 --send-ms 동안 보냅니다.
+실행: cd bot && python -m benchmarks.bench_event_bus [--events 5000] [--rate 1000] [--players 50] [--offline-ms 300]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import threading
+import time
+
+from core.event_bus import EventBus
+
+
+def make_events(count, players, seed=0):
+    rng = random.Random(seed)
+    names = [f"Player{i}" for i in range(players)]
+    events = []
+    for i in range(count):
+        kind = rng.choices(["death", "login", "logout"], [6, 2, 2])[0]
+        if kind == "death":
+            victim = rng.choice(names)
+            killer = rng.choice(names) if rng.random() < 0.5 else None
+            events.append(("death", {"seq": i, "victim": victim, "killer": killer if killer != victim else None}))
+        else:
+            events.append((kind, {"seq": i, "player": rng.choice(names)}))
+    return events
+
+
+def event_keys(event_type, data):
+    if event_type == 'death':
+        return (data['victim'], data['killer']) if data['killer'] else (data['victim'],)
+    return (data['player'],)
+
+
+class Sink:
+    """handle_log_event 대용: DB 기록 후 알림 전송, 플레이어별 처리 순서와 동시 실행 수를 기록합니다."""
+
+    def __init__(self, pool_size, db_time, send_time, online):
+        self.pool = asyncio.Semaphore(pool_size)
+        self.db_time = db_time
+        self.send_time = send_time
+        self.online = online
+        self.active = 0
+        self.peak_active = 0
+        self.pool_waiters = 0
+        self.peak_pool_waiters = 0
+        self.last_seq = {}
+        self.violations = 0
+        self.handled = 0
+        self.lags = []
+        self.published_at = {}
+        self.rng = random.Random(1)
+
+    async def handle(self, event_type, data):
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        try:
+            self.lags.append(time.monotonic() - self.published_at[data["seq"]])
+            self.pool_waiters += 1
+            self.peak_pool_waiters = max(self.peak_pool_waiters, self.pool_waiters)
+            async with self.pool:
+                self.pool_waiters -= 1
+                # 쿼리마다 걸리는 시간이 다름 (0.5 ~ 1.5배)
+                await asyncio.sleep(self.db_time * self.rng.uniform(0.5, 1.5))
+            # DB 반영이 끝난 순서가 플레이어별 발생 순서와 다르면 위반 (킬 스트릭, 알림 순서가 뒤바뀜)
+            for player in event_keys(event_type, data):
+                if self.last_seq.get(player, -1) > data["seq"]:
+                    self.violations += 1
+                self.last_seq[player] = max(self.last_seq.get(player, -1), data["seq"])
+            await self.online.wait()
+            await asyncio.sleep(self.send_time)
+            self.handled += 1
+        finally:
+            self.active -= 1
+
+
+async def run_mode(mode, events, args):
+    loop = asyncio.get_running_loop()
+    online = asyncio.Event()
+    sink = Sink(args.pool, args.db_ms / 1000, args.send_ms / 1000, online)
+    dropped = 0
+    bus = None
+    if mode == "bus":
+        bus = EventBus(sink.handle, keys=event_keys, workers=args.workers, maxsize=args.size)
+        bus.start()
+
+    def parser_thread():
+        nonlocal dropped
+        begin = time.monotonic()
+        for i, (event_type, data) in enumerate(events):
+            # --rate events/s 로 내보내되, 밀려 있으면 쉬지 않고 몰아서 보냄 (버스트)
+            delay = begin + i / args.rate - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            sink.published_at[data["seq"]] = time.monotonic()
+            if bus:
+                bus.publish(event_type, data)
+            elif online.is_set():
+                asyncio.run_coroutine_threadsafe(sink.handle(event_type, data), loop)
+            else:
+                # 기존 코드: bot.is_ready()가 아니면 이벤트를 버림
+                dropped += 1
+
+    start = time.perf_counter()
+    # 처음 --offline-ms 동안은 디스코드 미연결 상태
+    loop.call_later(args.offline_ms / 1000, online.set)
+    thread = threading.Thread(target=parser_thread)
+    thread.start()
+    await loop.run_in_executor(None, thread.join)
+    parse_time = time.perf_counter() - start
+    while sink.handled + dropped < len(events):
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    if bus:
+        await bus.stop()
+    return sink, dropped, parse_time, elapsed, bus
+
+
+async def run(args):
+    events = make_events(args.events, args.players)
+    print(f"{args.events} events at {args.rate:g}/s, {args.players} players, db pool {args.pool} x {args.db_ms}ms, "
+          f"send {args.send_ms}ms, discord offline first {args.offline_ms}ms")
+    print(f"{'mode':<7} {'total s':>8} {'parser s':>9} {'peak coro':>10} {'peak pool wait':>15} "
+          f"{'order viol':>11} {'dropped':>8} {'lag p50 ms':>11} {'lag p99 ms':>11}")
+    for mode in ("legacy", "bus"):
+        sink, dropped, parse_time, elapsed, bus = await run_mode(mode, events, args)
+        lags = sorted(sink.lags)
+        p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))] if lags else 0
+        print(f"{mode:<7} {elapsed:>8.2f} {parse_time:>9.2f} {sink.peak_active:>10} {sink.peak_pool_waiters:>15} "
+              f"{sink.violations:>11} {dropped:>8} {statistics.median(lags) * 1000 if lags else 0:>11.1f} "
+              f"{p99 * 1000:>11.1f}")
+        if bus:
+            print(f"bus stats: {bus.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--players", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=1000, help="파서가 이벤트를 내보내는 속도 (events/s)")
+    parser.add_argument("--pool", type=int, default=10, help="DB 연결 풀 크기")
+    parser.add_argument("--db-ms", type=float, default=2.0)
+    parser.add_argument("--send-ms", type=float, default=1.0)
+    parser.add_argument("--offline-ms", type=float, default=300, help="시작 후 디스코드가 연결되기까지의 시간")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+PvP 킬러 판별 벤치마크.
+
+"was slain by" 사망 메시지의 킬러 부분에서 플레이어를 찾을 때, 기존의 known_players 전체 순회와
+PlayerIndex 조회의 처리 속도를 캐시된 이름 수(10k / 100k)별로 비교합니다.
+실행: cd bot && python -m benchmarks.bench_killer
+"""
+import argparse
+import random
+import time
+
+from core.player_index import PlayerIndex
+from benchmarks.corpus import make_players, MOBS
+
+
+def legacy_match(known_players, clean_killer_part):
+    for player in known_players:
+        if clean_killer_part == player or clean_killer_part.startswith(f"{player} "):
+            return player
+    return None
+
+
+def make_queries(names, count, seed=0):
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.4:
+            queries.append(rng.choice(names))
+        elif roll < 0.7:
+            queries.append(f"{rng.choice(names)} using [Diamond Sword]")
+        else:
+            queries.append(rng.choice(MOBS))
+    return queries
+
+
+def rate(func, queries):
+    start = time.perf_counter()
+    results = [func(q) for q in queries]
+    return len(queries) / (time.perf_counter() - start), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'names':>8} {'legacy deaths/s':>16} {'index deaths/s':>16} {'speedup':>9}")
+    for size in args.sizes:
+        names = make_players(size)
+        known_set = set(names)
+        index = PlayerIndex(names)
+        queries = make_queries(names, args.queries)
+
+        legacy_rate, legacy_results = rate(lambda q: legacy_match(known_set, q), queries)
+        index_rate, index_results = rate(index.match_prefix, queries)
+        assert legacy_results == index_results, "결과 불일치"
+        print(f"{size:>8,} {legacy_rate:>16,.0f} {index_rate:>16,.0f} {index_rate / legacy_rate:>8,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+로그 파싱 루프의 로깅 비용 벤치마크.
+
+퇴장 이벤트가 섞인 로그 코퍼스를 LogParser.process_line으로 처리하면서
+- print  : 기존 방식 (퇴장마다 [DEBUG] print 2번, PYTHONUNBUFFERED처럼 print마다 write 호출)
+- DEBUG  : 큐 기반 로깅, 디버그 로그 출력 (text / json)
+- INFO   : 큐 기반 로깅, 디버그 로그 끔 (운영 기본값, text / json)
+의 처리량(lines/s), 파서 스레드가 로그 출력에 쓴 시간, 출력 바이트 수를 비교합니다.
+출력은 파이프로 보내고 별도 스레드가 읽어 버립니다 (docker 로그 수집 흉내).
+--drain-kbps를 주면 읽는 쪽을 그 속도로 제한하여, 로그 수집이 밀려 파이프가 가득 찬 상황을 재현합니다.
+실행: cd bot && python -m benchmarks.bench_logging [--lines 200000] [--event-ratio 0.08] [--drain-kbps 512]
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from core.log_parser import LogParser
+from core.logger import setup_logging, stop_logging
+from core.metrics import LOG_MATCH_SECONDS, MATCH_SAMPLE_EVERY
+from core.stats_reader import StatsReader
+from benchmarks.corpus import generate_log_lines, make_stats_file, make_usercache, player_uuid
+
+MODES = ("print", "debug-text", "debug-json", "info-text", "info-json")
+
+
+class PrintLogParser(LogParser):
+    """로깅 도입 이전의 process_line (퇴장마다 print 2번). 그 밖의 처리는 LogParser와 같음."""
+
+    def process_line(self, line):
+        self.lines_processed += 1
+        if self.lines_processed % MATCH_SAMPLE_EVERY:
+            event = self.parse_line(line)
+        else:
+            start = time.perf_counter()
+            event = self.parse_line(line)
+            LOG_MATCH_SECONDS.observe(time.perf_counter() - start)
+        if not event:
+            return
+        event_type, data = event
+        if event_type == "logout":
+            player = data["player"]
+            print(f"[DEBUG] Logout detected for {player}. Fetching stats...")
+            mined_stats = self.stats_reader.get_mined_counts(player)
+            print(f"[DEBUG] Stats for {player}: {mined_stats}")
+            data["mined_stats"] = mined_stats
+        self._emit(event_type, data)
+
+
+class Sink:
+    """파이프의 쓰기 쪽 (write_through: 쓸 때마다 write 시스템 호출). 읽기 쪽은 스레드가 비웁니다."""
+
+    def __init__(self, drain_kbps=0):
+        self.drain_kbps = drain_kbps
+        read_fd, write_fd = os.pipe()
+        self.stream = io.TextIOWrapper(io.FileIO(write_fd, "w"), encoding="utf-8", write_through=True)
+        self.bytes = 0
+        self._reader = os.fdopen(read_fd, "rb", buffering=0)
+        self._thread = threading.Thread(target=self._drain)
+        self._thread.start()
+
+    def _drain(self):
+        while True:
+            chunk = self._reader.read(65536)
+            if not chunk:
+                break
+            self.bytes += len(chunk)
+            if self.drain_kbps:
+                time.sleep(len(chunk) / (self.drain_kbps * 1024))
+
+    def close(self):
+        self.stream.close()
+        self._thread.join()
+        self._reader.close()
+
+
+def make_parser(cls, root, players):
+    stats_reader = StatsReader(
+        stats_dir=os.path.join(root, "stats"),
+        usercache_path=os.path.join(root, "usercache.json"),
+    )
+    parser = cls(event_callback=lambda event_type, data: None)
+    parser.stats_reader = stats_reader
+    stats_reader.load_usercache()
+    parser.known_players.update(players)
+    # 통계 파일은 미리 한 번 읽어 캐시해 둠 (파일 I/O는 측정 대상이 아님)
+    for player in players:
+        stats_reader.get_mined_counts(player)
+    return parser
+
+
+def run_mode(mode, lines, root, players, drain_kbps):
+    level, fmt = {"print": (None, None), "debug-text": ("DEBUG", "text"), "debug-json": ("DEBUG", "json"),
+                  "info-text": ("INFO", "text"), "info-json": ("INFO", "json")}[mode]
+    sink = Sink(drain_kbps)
+    if mode == "print":
+        parser = make_parser(PrintLogParser, root, players)
+        redirect = contextlib.redirect_stdout(sink.stream)
+    else:
+        parser = make_parser(LogParser, root, players)
+        setup_logging(level=level, fmt=fmt, stream=sink.stream)
+        redirect = contextlib.nullcontext()
+
+    with redirect:
+        start = time.perf_counter()
+        for line in lines:
+            parser.process_line(line)
+        elapsed = time.perf_counter() - start
+    # 큐에 남은 로그를 모두 출력할 때까지 (리스너 스레드)
+    flush_start = time.perf_counter()
+    stop_logging()
+    flush = time.perf_counter() - flush_start
+    sink.close()
+    return elapsed, flush, sink.bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=200_000)
+    parser.add_argument("--players", type=int, default=50)
+    parser.add_argument("--event-ratio", type=float, default=0.08)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--drain-kbps", type=float, default=0, help="로그 수집 속도 제한 (KB/s, 0이면 제한 없음)")
+    args = parser.parse_args()
+
+    lines = generate_log_lines(args.lines, args.players, args.event_ratio)
+    players = sorted({line.split(": ", 1)[1].split(" ")[0] for line in lines if line.endswith("joined the game")})
+    logouts = sum(1 for line in lines if line.endswith("left the game"))
+
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, "stats"))
+        with open(os.path.join(root, "usercache.json"), "w") as f:
+            json.dump(make_usercache(players), f)
+        for i, player in enumerate(players):
+            with open(os.path.join(root, "stats", f"{player_uuid(player)}.json"), "w") as f:
+                json.dump(make_stats_file(mined_entries=300, seed=i), f)
+
+        # 비교 대상 외의 로그(usercache 로드 등)는 출력하지 않음
+        logging.getLogger("core.usercache").setLevel(logging.ERROR)
+
+        drain = f"{args.drain_kbps:g} KB/s" if args.drain_kbps else "unlimited"
+        print(f"corpus: {args.lines:,} lines, {logouts:,} logouts, log drain {drain}, best of {args.repeat}")
+        print(f"{'mode':<11} {'lines/s':>12} {'parse s':>8} {'flush s':>8} {'output KB':>10}")
+        # 실행 순서에 따른 편차를 줄이기 위해 방식을 번갈아 반복 실행
+        results = {mode: [] for mode in MODES}
+        for _ in range(args.repeat):
+            for mode in MODES:
+                gc.collect()
+                results[mode].append(run_mode(mode, lines, root, players, args.drain_kbps))
+        baseline = None
+        for mode in MODES:
+            elapsed, flush, size = min(results[mode])
+            rate = len(lines) / elapsed
+            baseline = baseline or rate
+            print(f"{mode:<11} {rate:>12,.0f} {elapsed:>8.3f} {flush:>8.3f} {size / 1024:>10.1f}  (x{rate / baseline:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+디스코드 알림 발송 벤치마크 (가짜 채널, 디스코드 채널 전송 제한 5회 / 5초 흉내).
+
+레이드(PvP 연속 킬)와 서버 재시작 직전의 대량 퇴장이 몰려올 때
+- inline  : 이벤트 처리 코루틴이 channel.send를 직접 기다림 (기존 방식)
+- notifier: Notifier 큐에 넣고 채널별로 합쳐서 전송 예산에 맞춰 보냄
+의 전송 횟수, 429(제한 초과) 횟수, DB 기록까지의 지연, 마지막 알림이 도착하기까지의 시간을 비교합니다.
+두 방식 모두 EventBus(작업자 8개)로 이벤트를 처리합니다. 시간은 --scale 배로 축소해 실행합니다.
+실행: cd bot && python -m benchmarks.bench_notifier [--logouts 30] [--kills 40] [--scale 10]
+"""
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+
+from core.event_bus import EventBus
+from core.notifier import Notifier
+
+
+class FakeChannel:
+    """per초에 rate번을 넘으면 discord.py처럼 429를 받고 제한이 풀릴 때까지 기다렸다가 보내는 채널."""
+
+    def __init__(self, rate, per, latency):
+        self.rate = rate
+        self.per = per
+        self.latency = latency
+        self.sent_at = []
+        self.messages = []
+        self.rate_limited = 0
+
+    async def send(self, content):
+        await asyncio.sleep(self.latency)
+        now = time.monotonic()
+        recent = [t for t in self.sent_at if now - t < self.per]
+        if len(recent) >= self.rate:
+            self.rate_limited += 1
+            await asyncio.sleep(self.per - (now - recent[0]))
+        self.sent_at.append(time.monotonic())
+        self.messages.append(content)
+
+
+class FakeBot:
+    def __init__(self, channel):
+        self.channel = channel
+
+    def get_channel(self, channel_id):
+        return self.channel
+
+
+def make_events(logouts, kills, span):
+    """(발생 시각, 이벤트 종류, 데이터): 연속 킬이 span초 동안 이어지고, 끝날 무렵 대량 퇴장."""
+    events = []
+    for i in range(kills):
+        killer = f"Raider{i % 3}"
+        events.append((span * i / kills, "death", {"victim": f"Player{i}", "killer": killer}))
+    for i in range(logouts):
+        events.append((span * 0.8 + 0.01 * i, "logout", {"player": f"Player{i}"}))
+    return sorted(events, key=lambda e: e[0])
+
+
+def event_keys(event_type, data):
+    if event_type == "death":
+        return (data["victim"], data["killer"])
+    return (data["player"],)
+
+
+async def run_mode(mode, events, args):
+    scale = args.scale
+    channel = FakeChannel(5, 5.0 / scale, args.send_ms / 1000 / scale)
+    notifier = Notifier(FakeBot(channel), window=0.5 / scale, rate=5, per=5.0 / scale)
+    notifier.add_group("logout", lambda players: f"🚪 **{len(players)}명**이 서버에서 나갔습니다: " + ", ".join(players))
+    notifier.set_online(True)
+    streaks = {}
+    db_delays = []
+
+    async def handle(event_type, data):
+        # DB 기록 (쓰기 버퍼에 넣는 정도의 비용)
+        await asyncio.sleep(0)
+        db_delays.append(time.monotonic() - data["at"])
+        if event_type == "death":
+            killer = data["killer"]
+            streaks[killer] = streaks.get(killer, 0) + 1
+            texts = [f"⚔️ **{data['victim']}**님이 **{killer}**님에게 살해당했습니다."]
+            if streaks[killer] in (3, 5) or streaks[killer] >= 10:
+                texts.insert(0, f"🔥 **{killer}**님 {streaks[killer]}킬!")
+            for text in texts:
+                if mode == "inline":
+                    await channel.send(text)
+                else:
+                    notifier.notify(1, text)
+        else:
+            text = f"🚪 **{data['player']}**님이 서버에서 나갔습니다."
+            if mode == "inline":
+                await channel.send(text)
+            else:
+                notifier.notify(1, text, group="logout", item=data["player"])
+
+    bus = EventBus(handle, keys=event_keys, workers=8, maxsize=1000)
+    bus.start()
+    loop = asyncio.get_running_loop()
+
+    def parser_thread():
+        begin = time.monotonic()
+        for at, event_type, data in events:
+            delay = begin + at / scale - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            bus.publish(event_type, dict(data, at=time.monotonic()))
+
+    start = time.monotonic()
+    thread = threading.Thread(target=parser_thread)
+    thread.start()
+    await loop.run_in_executor(None, thread.join)
+    await bus.stop(timeout=600)
+    await notifier.stop(timeout=600)
+    delivered = (channel.sent_at[-1] - start) * scale if channel.sent_at else 0
+    return channel, db_delays, delivered
+
+
+async def run(args):
+    events = make_events(args.logouts, args.kills, args.span)
+    messages = sum(1 for _, event_type, _ in events if event_type == "logout") + args.kills
+    print(f"{args.kills} kills over {args.span}s + {args.logouts} logouts in {args.logouts * 0.01:.1f}s "
+          f"(>= {messages} messages), channel limit 5 / 5s, time scaled 1/{args.scale:g}")
+    print(f"{'mode':<9} {'sends':>6} {'429s':>5} {'db p50 ms':>10} {'db p99 ms':>10} {'last delivered s':>17}")
+    for mode in ("inline", "notifier"):
+        channel, db_delays, delivered = await run_mode(mode, events, args)
+        delays = sorted(d * args.scale * 1000 for d in db_delays)
+        p99 = delays[min(len(delays) - 1, int(len(delays) * 0.99))]
+        print(f"{mode:<9} {len(channel.messages):>6} {channel.rate_limited:>5} {statistics.median(delays):>10.1f} "
+              f"{p99:>10.1f} {delivered:>17.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logouts", type=int, default=30)
+    parser.add_argument("--kills", type=int, default=40)
+    parser.add_argument("--span", type=float, default=20, help="연속 킬이 이어지는 시간 (초)")
+    parser.add_argument("--send-ms", type=float, default=150, help="메시지 전송 1회 왕복 시간")
+    parser.add_argument("--scale", type=float, default=10, help="시간 축소 배율")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
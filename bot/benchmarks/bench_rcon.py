@@ -0,0 +1,159 @@
+"""
+RCON 클라이언트 검증 및 벤치마크 (로컬 가짜 RCON 서버 사용).
+
+1) 동작 검증: 여러 패킷 응답 재조립, 동시 명령의 요청 ID 매칭, 명령별 시간 초과,
+   서버 재시작 후 재연결, 서버가 내려가 있을 때 backoff로 바로 실패하는지,
+   그리고 클라이언트가 서버에 패킷을 한 번에 하나씩만 보내는지 확인합니다.
+2) 성능: 기존 방식(명령마다 블로킹 TCP 연결 + 인증, mcrcon과 동일)과
+   연결 풀(RconClient)의 명령당 지연 시간과 그동안 이벤트 루프가 막힌 최대 시간을 비교합니다.
+실행: cd bot && python -m benchmarks.bench_rcon [--commands 200] [--latency 2]
+"""
+import argparse
+import asyncio
+import socket
+import statistics
+import struct
+import time
+
+from core.rcon_client import RconClient, SERVERDATA_AUTH, SERVERDATA_EXECCOMMAND, encode_packet
+from benchmarks.fake_rcon import FakeRconServer
+
+PASSWORD = "password"
+
+
+def legacy_send_command(host, port, command):
+    """기존 방식: 블로킹 소켓으로 연결, 인증, 명령 1회 후 종료."""
+    with socket.create_connection((host, port)) as sock:
+        def read():
+            length = struct.unpack("<i", sock.recv(4, socket.MSG_WAITALL))[0]
+            data = sock.recv(length, socket.MSG_WAITALL)
+            return struct.unpack_from("<ii", data) + (data[8:-2],)
+
+        sock.sendall(encode_packet(1, SERVERDATA_AUTH, PASSWORD))
+        read()
+        sock.sendall(encode_packet(2, SERVERDATA_EXECCOMMAND, command))
+        return read()[2].decode()
+
+
+async def measure_lag(stop, samples, interval=0.002):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - start - interval)
+
+
+async def timed(send, commands):
+    stop = asyncio.Event()
+    lags = []
+    ticker = asyncio.create_task(measure_lag(stop, lags))
+    await asyncio.sleep(0)
+    latencies = []
+    start = time.perf_counter()
+    for command in commands:
+        t = time.perf_counter()
+        await send(command)
+        latencies.append((time.perf_counter() - t) * 1000)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+    return elapsed, latencies, max(lags, default=0) * 1000
+
+
+async def check_coalesced_packets_dropped(port):
+    """가짜 서버도 바닐라처럼 한 번에 도착한 두 패킷을 처리하지 않고 연결을 끊는지 확인합니다."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(encode_packet(1, SERVERDATA_AUTH, PASSWORD) + encode_packet(2, SERVERDATA_EXECCOMMAND, "list"))
+        await writer.drain()
+        assert await reader.read() == b"", "한 번에 보낸 두 패킷을 가짜 서버가 처리함"
+    finally:
+        writer.close()
+
+
+async def check_behaviour():
+    server = await FakeRconServer(PASSWORD).start()
+    client = RconClient("127.0.0.1", server.port, PASSWORD, pool_size=2, timeout=1.0, backoff_min=0.2)
+    try:
+        await check_coalesced_packets_dropped(server.port)
+        assert server.malformed == 1
+        server.malformed = 0
+
+        # 여러 패킷으로 나뉜 응답 (최대 조각 크기와 같은 응답 포함)
+        response = await client.send_command("echo 20000")
+        assert len(response) == 20000 and response.startswith("abc"), "multi-packet 응답 재조립 실패"
+        for size in (4095, 4096, 4097, 8192):
+            assert len(await client.send_command(f"echo {size}")) == size, f"{size}바이트 응답 재조립 실패"
+
+        # 동시에 보낸 명령이 각자의 응답을 받는지 (요청 ID 매칭)
+        sizes = list(range(1, 9000, 97))
+        responses = await asyncio.gather(*(client.send_command(f"echo {n}") for n in sizes))
+        assert [len(r) for r in responses] == sizes, "요청 ID 매칭 실패"
+
+        # 명령별 시간 초과 후에도 다음 명령은 정상 처리
+        response = await client.send_command("sleep 2", timeout=0.2)
+        assert "시간 초과" in response, response
+        assert (await client.send_command("list")).startswith("There are"), "시간 초과 후 복구 실패"
+
+        # 서버 재시작(연결 끊김) 후 재연결
+        server.drop_clients()
+        await asyncio.sleep(0.05)
+        assert (await client.send_command("list")).startswith("There are"), "재연결 실패"
+
+        # 서버가 내려가 있으면 backoff 동안 연결을 시도하지 않고 바로 실패
+        port = server.port
+        await server.stop()
+        await asyncio.sleep(0.05)
+        start = time.perf_counter()
+        failures = [await client.send_command("list") for _ in range(20)]
+        fail_fast_ms = (time.perf_counter() - start) * 1000
+        assert all(r.startswith("RCON 연결 오류") for r in failures)
+
+        server = await FakeRconServer(PASSWORD, port=port).start()
+        await asyncio.sleep(max(0.0, client._retry_at - time.monotonic()) + 0.01)
+        assert (await client.send_command("list")).startswith("There are"), "서버 복구 후 재연결 실패"
+        assert server.malformed == 0, "클라이언트가 한 번에 여러 패킷을 보냄"
+        print(f"behaviour: ok (20 commands while server down failed in {fail_fast_ms:.1f} ms total)")
+    finally:
+        await client.close()
+        await server.stop()
+
+
+async def benchmark(args):
+    server = FakeRconServer(PASSWORD, latency=args.latency / 1000).start_in_thread()
+    commands = [f"whitelist add Player{i}" for i in range(args.commands)]
+    loop = asyncio.get_running_loop()
+    try:
+        # 기존 방식: 코그에서 바로 호출하므로 이벤트 루프를 막음
+        legacy = await timed(lambda c: asyncio.sleep(0, legacy_send_command("127.0.0.1", server.port, c)), commands)
+        legacy_connections = server.connections
+
+        client = RconClient("127.0.0.1", server.port, PASSWORD, pool_size=2, timeout=5)
+        try:
+            pooled = await timed(client.send_command, commands)
+        finally:
+            await client.close()
+        pooled_connections = server.connections - legacy_connections
+    finally:
+        await loop.run_in_executor(None, server.stop_thread)
+
+    print(f"{args.commands} commands, simulated server latency {args.latency}ms")
+    print(f"{'mode':<8} {'total s':>8} {'p50 ms':>8} {'p99 ms':>8} {'loop blocked ms':>16} {'connects':>9}")
+    for name, (elapsed, latencies, lag), connections in (
+        ("legacy", legacy, legacy_connections), ("pooled", pooled, pooled_connections)
+    ):
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"{name:<8} {elapsed:>8.3f} {statistics.median(latencies):>8.2f} {p99:>8.2f} {lag:>16.1f} {connections:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--commands", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=2.0, help="명령당 서버 처리 지연 (ms)")
+    args = parser.parse_args()
+    asyncio.run(check_behaviour())
+    asyncio.run(benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
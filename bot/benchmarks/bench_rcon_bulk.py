@@ -0,0 +1,74 @@
+"""
+대량 RCON 명령 처리량 벤치마크 (commands/s, 로컬 가짜 RCON 서버).
+
+같은 whitelist add 명령 N개를 다음 방식으로 보내 비교합니다.
+- legacy   : 명령마다 블로킹 연결 + 인증 (기존 mcrcon 방식)
+- serial   : 연결 풀(RconClient.send_command)로 하나씩 응답을 기다리며 전송
+- pooled   : RconClient.send_commands로 풀의 연결들에 나누어 전송 (연결마다 하나씩 응답을 기다림)
+응답이 요청 순서대로 짝지어졌는지, 가짜 서버가 한 번에 여러 패킷을 받아 연결을 끊은 적이 없는지도 확인합니다.
+실행: cd bot && python -m benchmarks.bench_rcon_bulk [--commands 2000] [--rtt 1] [--latency 0.05] [--pool-size 4]
+"""
+import argparse
+import asyncio
+import time
+
+from core.rcon_client import RconClient
+from benchmarks.bench_rcon import legacy_send_command, PASSWORD
+from benchmarks.fake_rcon import FakeRconServer
+
+
+async def run(args):
+    server = FakeRconServer(PASSWORD, latency=args.latency / 1000, rtt=args.rtt / 1000).start_in_thread()
+    loop = asyncio.get_running_loop()
+    rows = []
+    try:
+        def commands(mode):
+            return [f"whitelist add {mode}_{i}" for i in range(args.commands)]
+
+        # 기존 방식은 느리므로 일부만 측정
+        legacy_commands = commands("legacy")[:args.legacy_commands]
+        start = time.perf_counter()
+        for command in legacy_commands:
+            legacy_send_command("127.0.0.1", server.port, command)
+        rows.append(("legacy", len(legacy_commands), time.perf_counter() - start))
+
+        client = RconClient("127.0.0.1", server.port, PASSWORD, pool_size=args.pool_size, timeout=30)
+        try:
+            serial_commands = commands("serial")
+            start = time.perf_counter()
+            for command in serial_commands:
+                await client.send_command(command)
+            rows.append(("serial", len(serial_commands), time.perf_counter() - start))
+
+            pooled_commands = commands("pooled")
+            start = time.perf_counter()
+            responses = await client.send_commands(pooled_commands)
+            rows.append(("pooled", len(pooled_commands), time.perf_counter() - start))
+            assert responses == [f"Added pooled_{i} to the whitelist" for i in range(args.commands)], "응답 순서 불일치"
+            assert server.malformed == 0, f"한 번에 여러 패킷 전송: {server.malformed}개 연결 끊김"
+        finally:
+            await client.close()
+    finally:
+        await loop.run_in_executor(None, server.stop_thread)
+
+    print(f"simulated rtt {args.rtt}ms, server latency {args.latency}ms per command, pool size {args.pool_size}")
+    print(f"{'mode':<10} {'commands':>9} {'total s':>8} {'cmd/s':>10} {'speedup':>8}")
+    legacy_rate = rows[0][1] / rows[0][2]
+    for name, count, elapsed in rows:
+        rate = count / elapsed
+        print(f"{name:<10} {count:>9,} {elapsed:>8.3f} {rate:>10,.0f} {rate / legacy_rate:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--commands", type=int, default=2000)
+    parser.add_argument("--legacy-commands", type=int, default=200, help="legacy 방식으로 측정할 명령 수")
+    parser.add_argument("--rtt", type=float, default=1.0, help="네트워크 왕복 지연 (ms)")
+    parser.add_argument("--latency", type=float, default=0.05, help="명령당 서버 처리 시간 (ms)")
+    parser.add_argument("--pool-size", type=int, default=4, help="RconClient 연결 수")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
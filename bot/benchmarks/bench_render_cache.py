@@ -0,0 +1,143 @@
+"""
+!chart 렌더 캐시 벤치마크 (RenderCache, 가짜 렌더러).
+
+관리자 여러 명이 인기 패널 몇 개를 몰아서 요청하는 상황을 흉내내어
+캐시 없이(매번 렌더링) / 캐시 사용(TTL + 진행 중 렌더링 합치기) / 캐시 + 인기 패널 미리 렌더링 시의
+렌더 횟수, 최대 동시 렌더 수, 응답 지연, 적중률을 비교합니다. 시간은 --scale 배로 축소해 실행합니다.
+실행: cd bot && python -m benchmarks.bench_render_cache [--requests 300] [--render-ms 3000] [--ttl 60]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from core.render_cache import RenderCache, RenderError
+
+PANELS = [(1, 0.4), (2, 0.25), (3, 0.15), (4, 0.1), (5, 0.05), (6, 0.05)]
+
+
+class FakeRenderer:
+    """grafana-image-renderer 대용: 렌더링마다 일정 시간이 걸리고 동시 렌더 수를 기록합니다."""
+
+    def __init__(self, render_time, fail_ratio=0.0, seed=0):
+        self.render_time = render_time
+        self.fail_ratio = fail_ratio
+        self.rng = random.Random(seed)
+        self.renders = 0
+        self.active = 0
+        self.peak_active = 0
+
+    async def render(self, panel_id):
+        self.renders += 1
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        try:
+            await asyncio.sleep(self.render_time)
+            if self.rng.random() < self.fail_ratio:
+                raise RenderError(500)
+            return bytes(150_000)
+        finally:
+            self.active -= 1
+
+
+def make_requests(count, duration, seed=0):
+    """(요청 시각, 패널) 목록. 몇 명이 비슷한 시각에 같은 차트를 요청하는 버스트를 포함합니다."""
+    rng = random.Random(seed)
+    panels, weights = zip(*PANELS)
+    requests = []
+    while len(requests) < count:
+        at = rng.uniform(0, duration)
+        panel = rng.choices(panels, weights)[0]
+        # 한 명이 요청하면 몇 초 안에 다른 관리자들도 같은 차트를 요청
+        for _ in range(rng.choice([1, 1, 2, 3, 5])):
+            requests.append((at + rng.uniform(0, duration / 60), panel))
+    return sorted(requests[:count])
+
+
+def cache_key(panel):
+    return ("minecraft-server", panel, "now-1h", "now", 1000, 500)
+
+
+async def prerender_loop(cache, renderer, panels, interval, limit):
+    """Grafana 코그의 미리 렌더링 루프와 같은 방식 (동시 수 제한)."""
+    async def one(panel):
+        async with limit:
+            try:
+                await cache.refresh(cache_key(panel), lambda: renderer.render(panel))
+            except RenderError:
+                pass
+
+    while True:
+        await asyncio.gather(*(one(panel) for panel in panels))
+        await asyncio.sleep(interval)
+
+
+async def replay(requests, renderer, cache):
+    latencies = []
+    start = time.perf_counter()
+
+    async def one(at, panel):
+        await asyncio.sleep(max(0.0, at - (time.perf_counter() - start)))
+        t = time.perf_counter()
+        try:
+            if cache:
+                await cache.get(cache_key(panel), lambda: renderer.render(panel))
+            else:
+                await renderer.render(panel)
+        except RenderError:
+            pass
+        latencies.append(time.perf_counter() - t)
+
+    await asyncio.gather(*(one(at, panel) for at, panel in requests))
+    return latencies
+
+
+async def run(args):
+    scale = args.scale
+    duration = args.duration / scale
+    requests = make_requests(args.requests, duration)
+    rows = []
+    hot_panels = [panel for panel, _ in PANELS[:args.hot_panels]]
+    for name, use_cache, prerender in (("no cache", False, False), ("cache", True, False), ("prerender", True, True)):
+        renderer = FakeRenderer(args.render_ms / 1000 / scale, fail_ratio=args.fail_ratio)
+        cache = RenderCache(ttl=args.ttl / scale, max_entries=8) if use_cache else None
+        task = None
+        if prerender:
+            interval = (args.ttl - args.render_ms / 1000) * 0.8 / scale
+            task = asyncio.create_task(prerender_loop(cache, renderer, hot_panels, interval, asyncio.Semaphore(1)))
+            # 첫 미리 렌더링이 끝난 뒤부터 요청 시작
+            await asyncio.sleep(args.render_ms / 1000 / scale * (len(hot_panels) + 1))
+        latencies = await replay(requests, renderer, cache)
+        if task:
+            task.cancel()
+        rows.append((name, renderer, latencies, cache))
+
+    print(f"{args.requests} requests over {args.duration}s, render {args.render_ms}ms, ttl {args.ttl}s "
+          f"(time scaled 1/{scale:g})")
+    print(f"{'mode':<9} {'renders':>8} {'peak conc':>10} {'p50 s':>8} {'p99 s':>8} {'hit ratio':>10}")
+    for name, renderer, latencies, cache in rows:
+        latencies = sorted(l * scale for l in latencies)
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        ratio = f"{cache.stats()['hit_ratio']:.1%}" if cache else "-"
+        print(f"{name:<9} {renderer.renders:>8} {renderer.peak_active:>10} {statistics.median(latencies):>8.2f} "
+              f"{p99:>8.2f} {ratio:>10}")
+    for name, _, _, cache in rows[1:]:
+        print(f"{name} stats: {cache.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--duration", type=float, default=3600, help="요청이 퍼져 있는 시간 (초)")
+    parser.add_argument("--render-ms", type=float, default=3000, help="렌더링 1회 소요 시간")
+    parser.add_argument("--ttl", type=float, default=60)
+    parser.add_argument("--hot-panels", type=int, default=3, help="미리 렌더링할 인기 패널 수")
+    parser.add_argument("--fail-ratio", type=float, default=0.02, help="렌더링 실패 비율")
+    parser.add_argument("--scale", type=float, default=200, help="시간 축소 배율")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
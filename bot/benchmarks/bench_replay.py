@@ -0,0 +1,264 @@
+"""
+로그 재생 종단간 벤치마크 (마인크래프트 서버와 디스코드 토큰 없이 실행).
+
+임시 디렉토리에 마인크래프트 데이터(usercache.json, world/stats/*.json, logs/latest.log)를 만들고,
+작성 스레드가 합성 로그(채팅, 플러그인 잡음, 접속/퇴장/업적, 모든 사망 메시지)를 --rate lines/s로 latest.log에 씁니다.
+퇴장 직전에는 서버처럼 그 플레이어의 통계 파일을 다시 저장하고, --autosave초마다 전체 통계 파일을 다시 씁니다.
+봇과 같은 경로(LogParser 추적 스레드 -> EventBus -> record_event -> StatWriteBuffer -> Database)로 처리하며
+처리량, 라인이 쓰인 뒤 이벤트 처리가 끝나기까지의 지연 백분위수, CPU, 메모리, DB 쿼리 수를 출력합니다.
+--dsn을 주면 실제 Postgres에, 없으면 쿼리 수를 세는 대용 풀(왕복 --rtt ms)에 기록합니다.
+실행: cd bot && python -m benchmarks.bench_replay [--lines 200000] [--rate 20000] [--players 100] [--dsn postgresql://...]
+"""
+import argparse
+import asyncio
+import os
+import random
+import resource
+import statistics
+import tempfile
+import threading
+import time
+
+import asyncpg
+
+from core.db import db
+from core.event_bus import EventBus
+from core.events import record_event
+from core.log_parser import DEATH_REASONS, LogParser
+from core.stats_reader import StatsReader
+from benchmarks.corpus import (
+    death_line, generate_log_lines, make_players, player_uuid, timestamp, write_mc_root,
+)
+from benchmarks.fake_db import CountingPool
+
+# 작성 스레드가 한 번에 쓰는 간격 (초)
+WRITE_TICK = 0.01
+
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+def event_keys(event_type, data):
+    if event_type == "death":
+        return (data["victim"], data["killer"]) if data["killer"] else (data["victim"],)
+    return (data["player"],)
+
+
+def make_stream(args):
+    """재생할 라인 목록. 앞부분에 사망 메시지 종류마다 한 줄씩 넣어 모든 사망 패턴을 거치게 합니다."""
+    players = make_players(args.players)
+    java_players = [p for p in players if not p.startswith(".")]
+    rng = random.Random(1)
+    lines = [
+        death_line(rng, timestamp(0), rng.choice(java_players), players, reason=reason)
+        for reason in dict.fromkeys(DEATH_REASONS)
+    ]
+    lines += generate_log_lines(args.lines - len(lines), args.players, args.event_ratio)
+    return players, lines
+
+
+class LogWriter(threading.Thread):
+    """마인크래프트 서버 대신 latest.log와 통계 파일을 씁니다."""
+
+    def __init__(self, lines, event_lines, log_path, stats_dir, players, rate, autosave):
+        super().__init__(daemon=True)
+        self.lines = lines
+        # 라인 번호 -> 퇴장하는 플레이어 (퇴장 직전에 통계 파일 저장)
+        self.event_lines = event_lines
+        self.log_path = log_path
+        self.rate = rate
+        self.autosave = autosave
+        self.stats_paths = {player: os.path.join(stats_dir, f"{player_uuid(player)}.json") for player in players}
+        self.stats_content = {}
+        for player, path in self.stats_paths.items():
+            with open(path, "rb") as f:
+                self.stats_content[player] = f.read()
+        # 이벤트 라인 번호 -> 파일에 쓰인 시각
+        self.written_at = {}
+        self.stats_saves = 0
+        self.finished_at = None
+
+    def save_stats(self, player):
+        path = self.stats_paths.get(player)
+        if path:
+            # 읽는 도중 잘린 파일을 보지 않도록 임시 파일에 쓴 뒤 교체
+            with open(path + ".tmp", "wb") as f:
+                f.write(self.stats_content[player])
+            os.replace(path + ".tmp", path)
+            self.stats_saves += 1
+
+    def run(self):
+        per_tick = max(1, int(self.rate * WRITE_TICK))
+        begin = time.monotonic()
+        next_autosave = begin + self.autosave if self.autosave else None
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            for start in range(0, len(self.lines), per_tick):
+                delay = begin + start / self.rate - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                if next_autosave and time.monotonic() >= next_autosave:
+                    for player in self.stats_paths:
+                        self.save_stats(player)
+                    next_autosave += self.autosave
+                chunk = range(start, min(start + per_tick, len(self.lines)))
+                for index in chunk:
+                    kind, player = self.event_lines.get(index, (None, None))
+                    if kind == "logout":
+                        self.save_stats(player)
+                # 파서가 쓰기 직후 바로 읽을 수 있으므로 시각을 먼저 기록
+                now = time.monotonic()
+                for index in chunk:
+                    if index in self.event_lines:
+                        self.written_at[index] = now
+                f.write("".join(self.lines[index] + "\n" for index in chunk))
+                f.flush()
+        self.finished_at = time.monotonic()
+
+
+async def run(args):
+    players, lines = make_stream(args)
+    # 라인 번호 -> (이벤트 종류, 플레이어): 파서가 내보낸 n번째 이벤트를 n번째 이벤트 라인과 짝지음
+    scanner = LogParser()
+    event_indices = []
+    event_lines = {}
+    death_reasons = set()
+    for index, line in enumerate(lines):
+        event = scanner.parse_line(line)
+        if event:
+            event_type, data = event
+            event_indices.append(index)
+            event_lines[index] = (event_type, data.get("player"))
+    expected = len(event_indices)
+
+    if args.dsn:
+        db.pool = await asyncpg.create_pool(args.dsn)
+        await db.init_db()
+        backend = "postgres"
+    else:
+        db.pool = CountingPool(rtt=args.rtt / 1000)
+        backend = f"stand-in rtt={args.rtt}ms"
+    db.writer.start()
+
+    latencies = {}
+    handled = 0
+    all_handled = asyncio.Event()
+
+    async def handle(event_type, data):
+        nonlocal handled
+        seq = data.pop("seq")
+        if event_type == "death":
+            death_reasons.add(next(r for r in DEATH_REASONS if data["reason"].startswith(r)))
+        await record_event(event_type, data)
+        index = event_indices[seq]
+        latencies.setdefault(event_type, []).append(time.monotonic() - writer.written_at[index])
+        handled += 1
+        if handled == expected:
+            all_handled.set()
+
+    bus = EventBus(handle, keys=event_keys, workers=args.workers, maxsize=args.bus_size)
+    bus.start()
+
+    with tempfile.TemporaryDirectory() as root:
+        log_path, stats_dir, usercache_path = write_mc_root(root, players, args.mined_entries)
+        published = 0
+
+        def publish(event_type, data):
+            nonlocal published
+            data["seq"] = published
+            published += 1
+            bus.publish(event_type, data)
+
+        parser = LogParser(log_path=log_path, event_callback=publish, tail_mode=args.tail)
+        parser.stats_reader = StatsReader(stats_dir=stats_dir, usercache_path=usercache_path)
+        parser.stats_reader.usercache.add_listener(parser.known_players.update)
+        writer = LogWriter(lines, event_lines, log_path, stats_dir, players, args.rate, args.autosave)
+
+        rss_start = rss_mb()
+        parser_thread = threading.Thread(target=parser.start, daemon=True)
+        parser_thread.start()
+        # 파서가 파일 끝에서 추적을 시작한 뒤 쓰기 시작
+        while parser._fd is None:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.2)
+
+        cpu_start = os.times()
+        start = time.monotonic()
+        writer.start()
+        try:
+            await asyncio.wait_for(all_handled.wait(), timeout=len(lines) / args.rate + args.timeout)
+        except asyncio.TimeoutError:
+            print(f"[WARN] timed out: {handled:,}/{expected:,} events handled")
+        end = time.monotonic()
+        await db.writer.stop()
+        flushed = time.monotonic()
+        cpu_end = os.times()
+
+        parser.stop()
+        parser_thread.join(timeout=5)
+        await bus.stop()
+        rss_end = rss_mb()
+
+    if args.dsn:
+        await db.pool.close()
+
+    cpu = (cpu_end.user - cpu_start.user) + (cpu_end.system - cpu_start.system)
+    elapsed = end - start
+    write_elapsed = (writer.finished_at or end) - start
+    print(f"stream : {len(lines):,} lines ({expected:,} events, {len(players)} players) written at "
+          f"{args.rate:,.0f} lines/s in {write_elapsed:.2f}s, tail={args.tail}, backend={backend}")
+    print(f"handled: {handled:,} events in {elapsed:.2f}s -> {parser.lines_processed / elapsed:,.0f} lines/s, "
+          f"{handled / elapsed:,.0f} events/s (drain after last write {end - (writer.finished_at or end):.3f}s)")
+    print(f"cpu    : {cpu:.2f}s ({cpu / elapsed * 100:.0f}% of one core)  "
+          f"memory: RSS {rss_start:.0f} -> {rss_end:.0f} MB, peak {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+    print(f"stats  : {writer.stats_saves:,} stats file saves, reader cache {parser.stats_reader.cache_hits:,} hits / "
+          f"{parser.stats_reader.cache_misses:,} misses, death reasons {len(death_reasons)}/{len(set(DEATH_REASONS))}")
+    if not args.dsn:
+        print(f"db     : {db.pool.queries:,} queries ({db.pool.queries / max(handled, 1):.3f}/event), "
+              f"{db.writer.flushes:,} flushes, final flush {flushed - end:.3f}s")
+    else:
+        print(f"db     : {db.writer.flushes:,} flushes, final flush {flushed - end:.3f}s")
+    bus_stats = bus.stats()
+    print(f"bus    : max depth {bus_stats['max_depth']}, blocked publishes {bus_stats['blocked_publishes']} "
+          f"({bus_stats['blocked_seconds']}s)")
+
+    print(f"{'latency ms':<12} {'count':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for event_type in ("login", "logout", "advancement", "death", "all"):
+        if event_type == "all":
+            values = sorted(v for values in latencies.values() for v in values)
+        else:
+            values = sorted(latencies.get(event_type, []))
+        if not values:
+            continue
+        print(f"{event_type:<12} {len(values):>7,} {statistics.median(values) * 1000:>8.2f} "
+              f"{percentile(values, 0.95) * 1000:>8.2f} {percentile(values, 0.99) * 1000:>8.2f} {values[-1] * 1000:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=200_000)
+    parser.add_argument("--rate", type=float, default=20_000, help="latest.log에 쓰는 속도 (lines/s)")
+    parser.add_argument("--players", type=int, default=100)
+    parser.add_argument("--event-ratio", type=float, default=0.08)
+    parser.add_argument("--mined-entries", type=int, default=300, help="통계 파일의 채굴 블록 종류 수 (파일 크기)")
+    parser.add_argument("--autosave", type=float, default=5, help="전체 통계 파일을 다시 쓰는 주기 (초, 0이면 끔)")
+    parser.add_argument("--tail", choices=["auto", "poll"], default="auto")
+    parser.add_argument("--workers", type=int, default=8, help="이벤트 버스 작업자 수")
+    parser.add_argument("--bus-size", type=int, default=1000)
+    parser.add_argument("--rtt", type=float, default=0.5, help="대용 풀의 쿼리 왕복 지연 (ms)")
+    parser.add_argument("--dsn", help="실제 Postgres DSN")
+    parser.add_argument("--timeout", type=float, default=30, help="쓰기가 끝난 뒤 처리 완료를 기다리는 최대 시간 (초)")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
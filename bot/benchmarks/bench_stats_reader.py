@@ -0,0 +1,119 @@
+"""
+퇴장 시 통계 파일 읽기 벤치마크 (StatsReader.get_mined_counts).
+
+큰 합성 통계 파일(기본: 플레이어 100명, 채굴 항목 3,000개)을 만들어 두고
+기존 방식(매번 json.load + 광물별 get_count 8회 + 전체 합산)과
+현재 방식(단일 순회 집계, orjson / 표준 json, 변경 없는 파일은 캐시)을 비교합니다.
+실행: cd bot && python -m benchmarks.bench_stats_reader [--players 100] [--entries 3000]
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import tempfile
+import time
+
+from core import stats_reader as stats_reader_module
+from core.stats_reader import StatsReader
+from benchmarks.corpus import make_players, make_usercache, make_stats_file, player_uuid
+
+
+def legacy_get_mined_counts(stats_file):
+    """기존 get_mined_counts의 파일 읽기/집계 부분."""
+    with open(stats_file, 'r') as f:
+        data = json.load(f)
+        stats = data.get('stats', {})
+        mined = stats.get('minecraft:mined', {})
+
+        def get_count(items):
+            return sum(mined.get(item, 0) for item in items)
+
+        total_blocks_broken = sum(mined.values())
+        custom_stats = stats.get('minecraft:custom', {})
+        play_time_ticks = custom_stats.get('minecraft:play_time', 0)
+
+        return {
+            "diamonds_mined": get_count(['minecraft:diamond_ore', 'minecraft:deepslate_diamond_ore']),
+            "coal_mined": get_count(['minecraft:coal_ore', 'minecraft:deepslate_coal_ore']),
+            "iron_mined": get_count(['minecraft:iron_ore', 'minecraft:deepslate_iron_ore']),
+            "gold_mined": get_count(['minecraft:gold_ore', 'minecraft:deepslate_gold_ore', 'minecraft:nether_gold_ore']),
+            "emerald_mined": get_count(['minecraft:emerald_ore', 'minecraft:deepslate_emerald_ore']),
+            "lapis_mined": get_count(['minecraft:lapis_ore', 'minecraft:deepslate_lapis_ore']),
+            "redstone_mined": get_count(['minecraft:redstone_ore', 'minecraft:deepslate_redstone_ore']),
+            "netherite_mined": get_count(['minecraft:ancient_debris']),
+            "blocks_broken": total_blocks_broken,
+            "playtime": play_time_ticks
+        }
+
+
+def measure(func, calls):
+    start = time.perf_counter()
+    results = [func(player) for player in calls]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, default=100)
+    parser.add_argument("--entries", type=int, default=3000, help="플레이어별 minecraft:mined 항목 수")
+    parser.add_argument("--logouts", type=int, default=1000, help="퇴장 이벤트 수")
+    args = parser.parse_args()
+
+    players = [p for p in make_players(args.players) if not p.startswith(".")]
+    rng = random.Random(0)
+    # 같은 플레이어가 여러 번 퇴장 (재접속, 짧은 세션)
+    calls = [rng.choice(players) for _ in range(args.logouts)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stats_dir = os.path.join(tmp, "stats")
+        os.makedirs(stats_dir)
+        usercache_path = os.path.join(tmp, "usercache.json")
+        with open(usercache_path, "w") as f:
+            json.dump(make_usercache(players), f)
+        for i, player in enumerate(players):
+            with open(os.path.join(stats_dir, f"{player_uuid(player)}.json"), "w") as f:
+                json.dump(make_stats_file(args.entries, seed=i), f)
+        file_size = os.path.getsize(os.path.join(stats_dir, f"{player_uuid(players[0])}.json"))
+
+        def new_reader(cache_size):
+            reader = StatsReader(stats_dir=stats_dir, usercache_path=usercache_path, cache_size=cache_size)
+            reader.load_usercache()
+            return reader
+
+        legacy_reader = new_reader(0)
+        legacy_time, expected = measure(
+            lambda p: legacy_get_mined_counts(os.path.join(stats_dir, f"{legacy_reader.uuid_map[p]}.json")), calls
+        )
+
+        rows = [("legacy", legacy_time, None)]
+        decoders = [("json", None)]
+        if stats_reader_module.orjson:
+            decoders.append(("orjson", stats_reader_module.orjson))
+        original = stats_reader_module.orjson
+        try:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                for name, decoder in decoders:
+                    stats_reader_module.orjson = decoder
+                    # 캐시 없음: 매번 파싱 (단일 순회 집계 + 디코더 효과)
+                    reader = new_reader(0)
+                    elapsed, results = measure(reader.get_mined_counts, calls)
+                    assert results == expected, f"{name}: 집계 결과 불일치"
+                    rows.append((f"{name} uncached", elapsed, None))
+                    # 캐시 사용: 파일이 바뀌지 않은 재퇴장은 stat만 수행
+                    reader = new_reader(256)
+                    elapsed, results = measure(reader.get_mined_counts, calls)
+                    assert results == expected, f"{name}: 캐시 결과 불일치"
+                    rows.append((f"{name} cached", elapsed, reader.cache_hits / len(calls)))
+        finally:
+            stats_reader_module.orjson = original
+
+    print(f"{len(players)} stats files ({file_size / 1024:.0f} KB each, {args.entries:,} mined entries), {len(calls):,} logouts")
+    print(f"{'mode':<16} {'total s':>8} {'ms/call':>8} {'speedup':>8} {'hit rate':>9}")
+    for name, elapsed, hit_rate in rows:
+        hits = f"{hit_rate:>9.1%}" if hit_rate is not None else f"{'-':>9}"
+        print(f"{name:<16} {elapsed:>8.3f} {elapsed / len(calls) * 1000:>8.3f} {legacy_time / elapsed:>7.1f}x {hits}")
+
+
+if __name__ == "__main__":
+    main()
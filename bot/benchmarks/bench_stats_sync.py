@@ -0,0 +1,101 @@
+"""
+world/stats 전체 동기화(StatsSync) 벤치마크.
+
+합성 통계 파일 수천 개를 만들어 두고 다음 세 가지 주기를 측정합니다.
+- full   : 첫 주기 (모든 파일 파싱 + 일괄 기록)
+- idle   : 변경 없음 (scandir + stat만 수행)
+- partial: 일부(--touch 비율) 파일만 변경
+주기마다 소요 시간, 메인/워커 CPU, 쿼리 수, 이벤트 루프 최대 지연을 출력합니다.
+DB는 쿼리 수를 세는 대용 풀(core.db와 같은 쿼리 형태)을 사용합니다.
+실행: cd bot && python -m benchmarks.bench_stats_sync [--files 3000] [--entries 1000] [--workers 2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+
+from core.db import Database
+from core.stats_reader import StatsReader
+from core.stats_sync import StatsSync
+from benchmarks.corpus import make_players, make_usercache, make_stats_file, player_uuid
+from benchmarks.fake_db import CountingPool
+
+
+async def measure_lag(stop, samples, interval=0.005):
+    """이벤트 루프가 막힌 시간을 잽니다 (예정보다 늦게 깨어난 만큼)."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - start - interval)
+
+
+async def timed_pass(sync, pool):
+    pool.reset()
+    stop = asyncio.Event()
+    lags = []
+    ticker = asyncio.create_task(measure_lag(stop, lags))
+    result = await sync.run_once()
+    stop.set()
+    await ticker
+    result["queries"] = pool.queries
+    result["max_lag_ms"] = max(lags, default=0) * 1000
+    return result
+
+
+async def run(args, tmp):
+    stats_dir = os.path.join(tmp, "stats")
+    os.makedirs(stats_dir)
+    players = make_players(args.files)
+    usercache_path = os.path.join(tmp, "usercache.json")
+    with open(usercache_path, "w") as f:
+        json.dump(make_usercache(players), f)
+    paths = []
+    for i, player in enumerate(players):
+        path = os.path.join(stats_dir, f"{player_uuid(player)}.json")
+        with open(path, "w") as f:
+            json.dump(make_stats_file(args.entries, seed=i), f)
+        paths.append(path)
+    total_mb = sum(os.path.getsize(p) for p in paths) / 1e6
+
+    database = Database()
+    pool = CountingPool(rtt=0.0005)
+    database.pool = pool
+    reader = StatsReader(stats_dir=stats_dir, usercache_path=usercache_path)
+    sync = StatsSync(reader, database, interval=0, workers=args.workers)
+
+    rows = []
+    try:
+        # 워커 프로세스 기동 비용은 첫 주기에 포함됨
+        rows.append(("full", await timed_pass(sync, pool)))
+        rows.append(("idle", await timed_pass(sync, pool)))
+        rng = random.Random(0)
+        future = time.time() + 10
+        for path in rng.sample(paths, int(len(paths) * args.touch)):
+            os.utime(path, (future, future))
+        rows.append(("partial", await timed_pass(sync, pool)))
+    finally:
+        await sync.stop()
+
+    print(f"{args.files:,} stats files ({total_mb:.0f} MB, {args.entries:,} mined entries each), {args.workers} workers")
+    print(f"{'pass':<8} {'changed':>8} {'written':>8} {'wall s':>8} {'cpu main':>9} {'cpu wrk':>8} {'queries':>8} {'max lag ms':>11}")
+    for name, r in rows:
+        print(f"{name:<8} {r['changed']:>8,} {r['written']:>8,} {r['duration_s']:>8.2f} {r['cpu_main_s']:>9.2f} "
+              f"{r['cpu_workers_s']:>8.2f} {r['queries']:>8} {r['max_lag_ms']:>11.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=3000, help="통계 파일(플레이어) 수")
+    parser.add_argument("--entries", type=int, default=1000, help="파일별 minecraft:mined 항목 수")
+    parser.add_argument("--workers", type=int, default=2, help="파싱 프로세스 수")
+    parser.add_argument("--touch", type=float, default=0.05, help="partial 주기에서 변경할 파일 비율")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run(args, tmp))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+LogParser 로그 추적 방식(inotify / polling) 벤치마크.
+
+유휴 상태의 CPU 사용량과, 로그 한 줄이 기록된 뒤 콜백이 호출되기까지의 지연 시간을 측정합니다.
+실행: cd bot && python -m benchmarks.bench_tail
+"""
+import argparse
+import os
+import random
+import resource
+import statistics
+import tempfile
+import threading
+import time
+
+from core.log_parser import LogParser
+
+
+def cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run(mode, idle_seconds, samples):
+    with tempfile.TemporaryDirectory() as tmp:
+        log_dir = os.path.join(tmp, "logs")
+        os.makedirs(log_dir)
+        log_path = os.path.join(log_dir, "latest.log")
+        open(log_path, "w").close()
+
+        received = threading.Event()
+        received_at = [0.0]
+
+        def callback(event_type, data):
+            received_at[0] = time.perf_counter()
+            received.set()
+
+        parser = LogParser(log_path=log_path, event_callback=callback, tail_mode=mode)
+        parser.stats_reader.usercache.path = os.path.join(tmp, "usercache.json")
+        thread = threading.Thread(target=parser.start, daemon=True)
+        thread.start()
+        time.sleep(0.5)  # 추적 시작 대기
+
+        # 1. 유휴 CPU 사용량
+        cpu_before = cpu_seconds()
+        time.sleep(idle_seconds)
+        idle_cpu = cpu_seconds() - cpu_before
+
+        # 2. 기록 → 콜백 지연 시간
+        latencies = []
+        with open(log_path, "a") as f:
+            for i in range(samples):
+                time.sleep(random.uniform(0.01, 0.05))
+                received.clear()
+                sent_at = time.perf_counter()
+                f.write(f"[12:00:00] [Server thread/INFO]: Player{i} joined the game\n")
+                f.flush()
+                if received.wait(timeout=5):
+                    latencies.append((received_at[0] - sent_at) * 1000)
+
+        parser.stop()
+        thread.join(timeout=5)
+
+    return idle_cpu, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--idle", type=float, default=10.0, help="유휴 CPU 측정 시간 (초)")
+    parser.add_argument("--samples", type=int, default=200, help="지연 시간 측정 횟수")
+    args = parser.parse_args()
+
+    print(f"{'mode':<8} {'idle CPU':>10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'lost':>5}")
+    for mode in ("poll", "auto"):
+        idle_cpu, latencies = run(mode, args.idle, args.samples)
+        cpu_pct = idle_cpu / args.idle * 100
+        latencies.sort()
+        p50 = statistics.median(latencies) if latencies else float("nan")
+        p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else float("nan")
+        worst = latencies[-1] if latencies else float("nan")
+        name = "inotify" if mode == "auto" else mode
+        print(f"{name:<8} {cpu_pct:>9.3f}% {p50:>8.2f} {p99:>8.2f} {worst:>8.2f} {args.samples - len(latencies):>5}")
+
+
+if __name__ == "__main__":
+    main()
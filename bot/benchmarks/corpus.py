@@ -0,0 +1,148 @@
+"""
+벤치마크용 합성 마인크래프트(Paper) 로그 생성기.
+
+채팅, 플러그인/Geyser 로그, 청크 경고 같은 잡음 사이에 접속/퇴장/업적/사망 이벤트를 섞어
+실제 latest.log와 비슷한 분포의 라인을 만듭니다.
+통계 파일(world/stats/<uuid>.json)과 usercache.json도 같은 플레이어 목록으로 만들 수 있습니다.
+"""
+import json
+import os
+import random
+import uuid
+
+from core.log_parser import DEATH_REASONS, ADVANCEMENT_VERBS
+from core.stats_reader import ORE_BUCKETS
+
+NOISE_TEMPLATES = [
+    "[{time}] [Server thread/INFO]: <{player}> {chat}",
+    "[{time}] [Server thread/INFO]: [Geyser-Spigot] Player connected with username {player}",
+    "[{time}] [Server thread/INFO]: [floodgate] Floodgate player logged in as .{player} joined (UUID: 00000000-0000-0000-0009-01f4b5c0a3e1)",
+    "[{time}] [Server thread/WARN]: Can't keep up! Is the server overloaded? Running 2043ms or 40 ticks behind",
+    "[{time}] [Server thread/INFO]: {player}[/172.18.0.1:53422] logged in with entity id 1234 at ([world]10.5, 64.0, -20.3)",
+    "[{time}] [Server thread/INFO]: {player} lost connection: Disconnected",
+    "[{time}] [Worker-Main-12/INFO]: Preparing spawn area: 84%",
+    "[{time}] [Server thread/INFO]: [PrometheusExporter] Collected 42 metrics in 3ms",
+    "[{time}] [Netty Epoll Server IO #2/INFO]: [Geyser-Spigot] /192.168.0.12:19132 tried to connect!",
+    "[{time}] [Server thread/INFO]: [ViaVersion] Player {player} is using protocol 767",
+    "[{time}] [Paper Async Chunk Task Thread #3/INFO]: Saving chunks for level 'ServerLevel[world]'/minecraft:overworld",
+    "[{time}] [Server thread/INFO]: Named entity Villager['Librarian'/321, l='ServerLevel[world]', x=1.5, y=64.0, z=2.5] died: Villager was slain by Zombie",
+]
+
+CHAT_MESSAGES = [
+    "ㅋㅋㅋㅋ", "다이아 찾았다!", "누가 내 집 부쉈어", "gg", "anyone want to trade iron?",
+    "I almost died lol", "lag again?", "어디야", "나 네더 간다", "brb",
+]
+
+ADVANCEMENTS = ["Stone Age", "Diamonds!", "We Need to Go Deeper", "Hot Stuff", "Monster Hunter", "Free the End"]
+MOBS = ["Zombie", "Skeleton", "Creeper", "Spider", "Enderman", "Pillager", "Blaze"]
+
+
+def make_players(count, seed=0):
+    rng = random.Random(seed)
+    names = []
+    for i in range(count):
+        name = f"Player{i}_{rng.randint(0, 9999)}"
+        # Floodgate(Bedrock) 플레이어는 '.' 접두사
+        if rng.random() < 0.2:
+            name = "." + name
+        names.append(name)
+    return names
+
+
+def timestamp(second):
+    return f"{(second // 3600) % 24:02d}:{(second // 60) % 60:02d}:{second % 60:02d}"
+
+
+def death_line(rng, time_str, victim, players, reason=None):
+    reason = reason or rng.choice(DEATH_REASONS)
+    if reason == "was slain by":
+        if rng.random() < 0.5:
+            killer = rng.choice(players)
+            suffix = f" {killer} using [Netherite Sword]" if rng.random() < 0.5 else f" {killer}"
+        else:
+            suffix = f" {rng.choice(MOBS)}"
+    elif reason in ("was shot by", "was killed by", "blew up", "was impaled"):
+        suffix = f" {rng.choice(MOBS)}" if not reason == "blew up" else ""
+    else:
+        suffix = ""
+    return f"[{time_str}] [Server thread/INFO]: {victim} {reason}{suffix}"
+
+
+def generate_log_lines(count, player_count=50, event_ratio=0.08, seed=0):
+    """event_ratio 비율만큼 이벤트 라인이 섞인 로그 라인 목록을 생성합니다."""
+    rng = random.Random(seed)
+    players = make_players(player_count, seed)
+    # \w+ 패턴에 맞는 Java 플레이어만 접속/업적 이벤트를 발생시킴
+    java_players = [p for p in players if not p.startswith(".")] or players
+
+    lines = []
+    for i in range(count):
+        time_str = timestamp(i // 20)
+        player = rng.choice(java_players)
+        if rng.random() < event_ratio:
+            kind = rng.random()
+            if kind < 0.25:
+                lines.append(f"[{time_str}] [Server thread/INFO]: {player} joined the game")
+            elif kind < 0.5:
+                lines.append(f"[{time_str}] [Server thread/INFO]: {player} left the game")
+            elif kind < 0.65:
+                verb = rng.choice(ADVANCEMENT_VERBS)
+                lines.append(f"[{time_str}] [Server thread/INFO]: {player} has {verb} [{rng.choice(ADVANCEMENTS)}]")
+            else:
+                lines.append(death_line(rng, time_str, player, players))
+        else:
+            template = rng.choice(NOISE_TEMPLATES)
+            lines.append(template.format(time=time_str, player=player, chat=rng.choice(CHAT_MESSAGES)))
+    return lines
+
+
+STAT_CATEGORIES = ["minecraft:used", "minecraft:picked_up", "minecraft:crafted", "minecraft:dropped", "minecraft:broken"]
+
+
+def player_uuid(name):
+    return str(uuid.uuid5(uuid.NAMESPACE_OID, name))
+
+
+def make_usercache(players):
+    """usercache.json 형식의 목록을 만듭니다."""
+    return [{"name": name, "uuid": player_uuid(name), "expiresOn": "2026-12-01 00:00:00 +0000"} for name in players]
+
+
+def make_stats_file(mined_entries=3000, seed=0):
+    """
+    오래 플레이한 플레이어 수준의 통계 파일 내용(dict)을 만듭니다.
+    minecraft:mined에는 광물 블록과 함께 mined_entries개의 블록 항목이 들어갑니다.
+    """
+    rng = random.Random(seed)
+    blocks = list(ORE_BUCKETS) + [f"minecraft:block_{i}" for i in range(max(0, mined_entries - len(ORE_BUCKETS)))]
+    stats = {
+        "minecraft:mined": {block: rng.randint(1, 5000) for block in blocks},
+        "minecraft:custom": {
+            "minecraft:play_time": rng.randint(20 * 3600, 20 * 3600 * 500),
+            "minecraft:walk_one_cm": rng.randint(0, 10 ** 8),
+            "minecraft:jump": rng.randint(0, 10 ** 5),
+        },
+    }
+    for category in STAT_CATEGORIES:
+        stats[category] = {f"minecraft:item_{i}": rng.randint(1, 1000) for i in range(mined_entries // 2)}
+    return {"stats": stats, "DataVersion": 3953}
+
+
+def write_mc_root(root, players, mined_entries=300):
+    """
+    root 아래에 마인크래프트 데이터 디렉토리(usercache.json, world/stats/<uuid>.json, 빈 logs/latest.log)를 만듭니다.
+    반환: (latest.log 경로, 통계 디렉토리, usercache.json 경로)
+    """
+    stats_dir = os.path.join(root, "world", "stats")
+    logs_dir = os.path.join(root, "logs")
+    os.makedirs(stats_dir, exist_ok=True)
+    os.makedirs(logs_dir, exist_ok=True)
+    usercache_path = os.path.join(root, "usercache.json")
+    with open(usercache_path, "w") as f:
+        json.dump(make_usercache(players), f)
+    for i, player in enumerate(players):
+        with open(os.path.join(stats_dir, f"{player_uuid(player)}.json"), "w") as f:
+            json.dump(make_stats_file(mined_entries, seed=i), f)
+    log_path = os.path.join(logs_dir, "latest.log")
+    open(log_path, "w").close()
+    return log_path, stats_dir, usercache_path
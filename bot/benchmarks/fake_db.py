@@ -0,0 +1,70 @@
+"""
+asyncpg 풀 대용 (Postgres 없이 DB 계층을 벤치마크하기 위함).
+
+쿼리 수와 커넥션 획득 횟수를 세고, 쿼리마다 왕복 지연(rtt)을 흉내냅니다.
+"""
+import asyncio
+import contextlib
+
+
+class CountingConnection:
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def _query(self, query):
+        self.pool.queries += 1
+        statement = query.split()[0].upper()
+        self.pool.by_statement[statement] = self.pool.by_statement.get(statement, 0) + 1
+        if self.pool.rtt:
+            await asyncio.sleep(self.pool.rtt)
+
+    async def execute(self, query, *args):
+        await self._query(query)
+        return "OK"
+
+    async def executemany(self, query, args):
+        await self._query(query)
+
+    async def fetch(self, query, *args):
+        await self._query(query)
+        return []
+
+    async def fetchrow(self, query, *args):
+        await self._query(query)
+        return None
+
+    async def fetchval(self, query, *args):
+        await self._query(query)
+        return None
+
+    def transaction(self):
+        return _NullAsyncContext()
+
+
+class _NullAsyncContext:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class CountingPool:
+    def __init__(self, rtt=0.0005):
+        self.rtt = rtt
+        self.queries = 0
+        self.acquires = 0
+        self.by_statement = {}
+
+    @contextlib.asynccontextmanager
+    async def acquire(self):
+        self.acquires += 1
+        yield CountingConnection(self)
+
+    def reset(self):
+        self.queries = 0
+        self.acquires = 0
+        self.by_statement = {}
+
+    async def close(self):
+        pass
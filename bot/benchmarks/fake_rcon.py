@@ -0,0 +1,170 @@
+"""
+로컬 가짜 RCON 서버 (마인크래프트 서버 없이 RCON 클라이언트를 검증/벤치마크하기 위함).
+
+마인크래프트와 같이 연결마다 요청을 순서대로 처리하고, 4096바이트를 넘는 응답은 여러 패킷으로 나누며,
+알 수 없는 패킷 종류에는 "Unknown request <type>"으로 응답합니다.
+바닐라 RconClient처럼 소켓에서 한 번 읽은 데이터(최대 4096바이트)를 패킷 하나로만 처리하므로,
+여러 패킷이 한 번에 도착하면(예: 응답을 기다리지 않고 이어 보낸 명령) 연결을 끊습니다.
+지원 명령:
+- list            : 접속자 목록
+- echo <n>        : n바이트 응답 (여러 패킷 응답 검증용)
+- sleep <초>      : 지연 후 응답 (시간 초과 검증용)
+- whitelist add <p> / 그 밖의 명령: 짧은 응답
+latency는 명령마다의 서버 처리 시간(연결별로 순서대로 누적), rtt는 응답이 클라이언트에 도착하기까지의
+네트워크 왕복 지연(요청끼리 겹칠 수 있음)을 흉내냅니다.
+"""
+import asyncio
+import struct
+import threading
+
+from core.rcon_client import (
+    SERVERDATA_AUTH, SERVERDATA_AUTH_RESPONSE, SERVERDATA_EXECCOMMAND, SERVERDATA_RESPONSE_VALUE,
+    MAX_RESPONSE_CHUNK, encode_packet,
+)
+
+# 바닐라 RconClient의 읽기 버퍼 크기
+READ_BUFFER_SIZE = 4096
+
+
+class MalformedRead(ConnectionError):
+    """한 번 읽은 데이터가 패킷 정확히 하나가 아님 (바닐라 서버는 이때 연결을 끊음)."""
+
+
+async def read_single_packet(reader):
+    """바닐라와 같이 한 번 읽은 데이터를 패킷 하나로 해석합니다."""
+    data = await reader.read(READ_BUFFER_SIZE)
+    if not data:
+        raise asyncio.IncompleteReadError(data, 4)
+    if len(data) < 14:
+        raise MalformedRead(f"short read ({len(data)} bytes)")
+    length, request_id, packet_type = struct.unpack_from("<iii", data)
+    if length != len(data) - 4:
+        raise MalformedRead(f"packet length {length} != {len(data) - 4} bytes read")
+    return request_id, packet_type, data[12:-2]
+
+
+class FakeRconServer:
+    def __init__(self, password="password", latency=0.0, rtt=0.0, host="127.0.0.1", port=0):
+        self.password = password
+        self.latency = latency
+        self.rtt = rtt
+        self.host = host
+        self.port = port
+        self.connections = 0
+        self.auths = 0
+        self.commands = 0
+        # 여러 패킷이 한 번에 도착해 끊은 연결 수
+        self.malformed = 0
+        self.whitelist = set()
+        self._server = None
+        self._writers = set()
+        self._loop = None
+        self._thread = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        """서버를 내리고 모든 클라이언트 연결을 끊습니다 (서버 재시작 흉내)."""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self.drop_clients()
+
+    def drop_clients(self):
+        for writer in list(self._writers):
+            writer.close()
+        self._writers.clear()
+
+    def start_in_thread(self):
+        """별도 스레드의 이벤트 루프에서 서버를 실행합니다 (블로킹 클라이언트 측정용)."""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop_thread(self):
+        if self._loop:
+            asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+
+    async def _execute(self, command):
+        self.commands += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        name, _, arg = command.partition(" ")
+        if name == "echo":
+            size = int(arg)
+            return "".join(chr(ord("a") + i % 26) for i in range(size))
+        if name == "sleep":
+            await asyncio.sleep(float(arg))
+            return f"slept {arg}"
+        if name == "list":
+            return "There are 2 of a max of 20 players online: Alex, Steve"
+        if name == "whitelist":
+            action, _, player = arg.partition(" ")
+            if action == "add":
+                if player in self.whitelist:
+                    return "Player is already whitelisted"
+                self.whitelist.add(player)
+                return f"Added {player} to the whitelist"
+            if action == "list":
+                return f"There are {len(self.whitelist)} whitelisted player(s): {', '.join(sorted(self.whitelist))}"
+        return f"Executed: {command}"
+
+    def _write(self, writer, data):
+        if self.rtt:
+            asyncio.get_running_loop().call_later(self.rtt, self._deliver, writer, data)
+        else:
+            writer.write(data)
+
+    @staticmethod
+    def _deliver(writer, data):
+        if not writer.is_closing():
+            writer.write(data)
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        self._writers.add(writer)
+        authed = False
+        try:
+            while True:
+                request_id, packet_type, payload = await read_single_packet(reader)
+                if packet_type == SERVERDATA_AUTH:
+                    authed = payload.decode() == self.password
+                    self.auths += 1
+                    self._write(writer, encode_packet(request_id if authed else -1, SERVERDATA_AUTH_RESPONSE, ""))
+                elif not authed:
+                    self._write(writer, encode_packet(-1, SERVERDATA_AUTH_RESPONSE, ""))
+                elif packet_type == SERVERDATA_EXECCOMMAND:
+                    response = await self._execute(payload.decode())
+                    data = response.encode()
+                    chunks = [data[i:i + MAX_RESPONSE_CHUNK] for i in range(0, len(data), MAX_RESPONSE_CHUNK)] or [b""]
+                    packets = b""
+                    for chunk in chunks:
+                        body = struct.pack("<ii", request_id, SERVERDATA_RESPONSE_VALUE) + chunk + b"\x00\x00"
+                        packets += struct.pack("<i", len(body)) + body
+                    self._write(writer, packets)
+                else:
+                    self._write(writer, encode_packet(request_id, SERVERDATA_RESPONSE_VALUE, f"Unknown request {packet_type:x}"))
+                await writer.drain()
+        except MalformedRead:
+            self.malformed += 1
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            # 클라이언트 종료 또는 서버 종료 (처리 중이던 명령은 버림)
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
@@ -1,6 +1,44 @@
 import discord
 from discord.ext import commands
-from core.rcon_client import rcon
+import logging
+import re
+from collections import Counter
+from core.rcon_client import rcon, is_rcon_error
+
+# 마인크래프트 이름 (Floodgate 플레이어는 '.' 접두사). 명령 인자에 그대로 들어가므로 엄격히 검사합니다.
+PLAYER_NAME_PATTERN = re.compile(r'^\.?[A-Za-z0-9_]{1,16}$')
+MAX_ATTACHMENT_SIZE = 256 * 1024
+# list 응답: "There are N of a max of M players online: A, B" (서버 종류에 따라 "N/M" 형식도 있음)
+LIST_RESPONSE_PATTERN = re.compile(r'^There are (\d+)\D.*?players online:(.*)$', re.DOTALL)
+WHITELIST_USAGE = "사용법: !whitelist add <플레이어...> | remove <플레이어...> | list | bulk [add|remove] <플레이어...>"
+
+log = logging.getLogger(__name__)
+
+
+def split_player_names(names):
+    """(중복을 제거한 유효한 이름 목록, 유효하지 않은 이름 목록)을 반환합니다."""
+    valid = []
+    invalid = []
+    seen = set()
+    for name in names:
+        if PLAYER_NAME_PATTERN.match(name):
+            if name not in seen:
+                seen.add(name)
+                valid.append(name)
+        else:
+            invalid.append(name)
+    return valid, invalid
+
+
+def summarize_responses(title, responses, names, invalid=()):
+    """같은 응답끼리 묶어(플레이어 이름은 <player>로 치환) 디스코드 메시지 길이에 맞게 요약합니다."""
+    lines = [f"**{title}**"]
+    grouped = Counter(response.replace(name, "<player>") for response, name in zip(responses, names))
+    for response, count in grouped.most_common(5):
+        lines.append(f"`{response[:80] or '(응답 없음)'}` × {count}")
+    if invalid:
+        lines.append(f"⚠️ 잘못된 이름 {len(invalid)}개 제외: `{', '.join(invalid[:10])[:200]}`")
+    return "\n".join(lines)
 
 class Admin(commands.Cog):
     def __init__(self, bot):
@@ -14,8 +52,7 @@ class Admin(commands.Cog):
 
         user_roles = [role.name.lower().strip() for role in ctx.author.roles]
         
-        print(f"[DEBUG][AdminCog] Check for {ctx.author} (ID: {ctx.author.id})")
-        print(f"[DEBUG][AdminCog] Roles: {user_roles}")
+        log.debug("Check for %s (ID: %s), roles: %s", ctx.author, ctx.author.id, user_roles)
 
         # 1. 관리자 권한(Administrator) 확인 -> [Strict Mode] 비활성화
         # if ctx.author.guild_permissions.administrator:
@@ -25,52 +62,112 @@ class Admin(commands.Cog):
         allowed_roles = ["admin", "minecraft admin", "operator", "op", "관리자", "운영자"]
         
         if any(role in allowed_roles for role in user_roles):
-            print("[DEBUG][AdminCog] Access Granted (Role Match)")
+            log.debug("Access granted (role match)")
             return True
 
-        print("[DEBUG][AdminCog] Access Denied")
+        log.debug("Access denied for %s", ctx.author)
         await ctx.send("⛔ **권한이 없습니다.** 'Admin' 또는 '관리자' 역할이 필요합니다.")
         return False
 
     @commands.command(name="say")
     async def say(self, ctx, *, message: str):
         """마인크래프트 서버에 메시지를 방송합니다."""
-        print(f"[DEBUG] Executing SAY command for {ctx.author}")
-        response = rcon.send_command(f"say {message}")
+        log.debug("Executing SAY command for %s", ctx.author)
+        response = await rcon.send_command(f"say {message}")
         await ctx.send(f"서버 응답: `{response}`")
 
     @commands.command(name="kick")
     async def kick(self, ctx, player: str, *, reason: str = "관리자에 의해 추방됨"):
         """서버에서 플레이어를 추방합니다."""
-        print(f"[DEBUG] Executing KICK command for {ctx.author}")
-        response = rcon.send_command(f"kick {player} {reason}")
+        log.debug("Executing KICK command for %s", ctx.author)
+        response = await rcon.send_command(f"kick {player} {reason}")
         await ctx.send(f"서버 응답: `{response}`")
 
     @commands.command(name="whitelist")
-    async def whitelist(self, ctx, action: str, player: str = None):
-        """화이트리스트 관리. 사용법: !whitelist add <플레이어> 또는 !whitelist list"""
-        print(f"[DEBUG] Executing WHITELIST command for {ctx.author}")
-        if action.lower() == "list":
-            response = rcon.send_command("whitelist list")
-        elif player:
-            response = rcon.send_command(f"whitelist {action} {player}")
+    async def whitelist(self, ctx, action: str, *players: str):
+        """화이트리스트 관리. 사용법: !whitelist add <플레이어...> | list | bulk [add|remove] <플레이어...> (또는 .txt 첨부)"""
+        log.debug("Executing WHITELIST command for %s", ctx.author)
+        action = action.lower()
+        if action == "bulk":
+            await self.whitelist_bulk(ctx, list(players))
+            return
+        if action in ("add", "remove") and len(players) > 1:
+            # 여러 명은 bulk와 같이 한 번에 처리하고 결과를 요약
+            await self.whitelist_bulk(ctx, [action, *players])
+            return
+
+        if action == "list" and not players:
+            response = await rcon.send_command("whitelist list")
+        elif action in ("add", "remove") and players:
+            response = await rcon.send_command(f"whitelist {action} {players[0]}")
         else:
-            response = "사용법: !whitelist add <플레이어> | remove <플레이어> | list"
+            response = WHITELIST_USAGE
         
         await ctx.send(f"서버 응답: `{response}`")
 
+    async def whitelist_bulk(self, ctx, args):
+        """여러 플레이어를 한 번에 화이트리스트에 추가/제거합니다. 이름은 인자 또는 첨부 파일로 받습니다."""
+        action = "add"
+        if args and args[0].lower() in ("add", "remove"):
+            action = args.pop(0).lower()
+
+        names = list(args)
+        for attachment in ctx.message.attachments:
+            if attachment.size > MAX_ATTACHMENT_SIZE:
+                await ctx.send(f"❌ 첨부 파일이 너무 큽니다: `{attachment.filename}`")
+                return
+            content = await attachment.read()
+            names.extend(content.decode("utf-8", errors="ignore").replace(",", " ").split())
+
+        valid, invalid = split_player_names(names)
+        if not valid:
+            message = "사용법: !whitelist bulk [add|remove] <플레이어...> 또는 플레이어 목록(.txt) 첨부"
+            if invalid:
+                message += f"\n⚠️ 잘못된 이름: `{', '.join(invalid[:10])[:200]}`"
+            await ctx.send(message)
+            return
+
+        responses = await rcon.send_commands([f"whitelist {action} {name}" for name in valid])
+        await ctx.send(summarize_responses(f"📋 화이트리스트 {action}: {len(valid)}명", responses, valid, invalid))
+
+    @commands.command(name="kickall")
+    async def kickall(self, ctx, *, reason: str = "서버 재시작"):
+        """접속 중인 모든 플레이어를 추방합니다."""
+        log.debug("Executing KICKALL command for %s", ctx.author)
+        response = await rcon.send_command("list")
+        if is_rcon_error(response):
+            await ctx.send(f"❌ 접속자 목록을 가져오지 못했습니다.\n`{response}`")
+            return
+        match = LIST_RESPONSE_PATTERN.match(response.strip())
+        if not match:
+            await ctx.send(f"❌ 예상하지 못한 접속자 목록 응답입니다. 추방하지 않았습니다.\n서버 응답: `{response[:200]}`")
+            return
+
+        count = int(match.group(1))
+        valid, invalid = split_player_names(match.group(2).replace(",", " ").split())
+        if count == 0:
+            await ctx.send(f"접속 중인 플레이어가 없습니다.\n서버 응답: `{response}`")
+            return
+        if not valid or invalid:
+            # 이름을 제대로 읽지 못했으면 일부만 추방하지 않음
+            await ctx.send(f"❌ 접속자 이름을 읽지 못했습니다. 추방하지 않았습니다.\n서버 응답: `{response[:200]}`")
+            return
+
+        responses = await rcon.send_commands([f"kick {name} {reason}" for name in valid])
+        await ctx.send(summarize_responses(f"👢 전체 추방: {len(valid)}명", responses, valid))
+
     @commands.command(name="ban")
     async def ban(self, ctx, player: str, *, reason: str = "관리자에 의해 차단됨"):
         """플레이어를 영구 차단합니다."""
-        print(f"[DEBUG] Executing BAN command for {ctx.author}")
-        response = rcon.send_command(f"ban {player} {reason}")
+        log.debug("Executing BAN command for %s", ctx.author)
+        response = await rcon.send_command(f"ban {player} {reason}")
         await ctx.send(f"🔨 **{player}**님을 차단했습니다.\n서버 응답: `{response}`")
 
     @commands.command(name="unban")
     async def unban(self, ctx, player: str):
         """플레이어 차단을 해제합니다."""
-        print(f"[DEBUG] Executing UNBAN command for {ctx.author}")
-        response = rcon.send_command(f"pardon {player}")
+        log.debug("Executing UNBAN command for %s", ctx.author)
+        response = await rcon.send_command(f"pardon {player}")
         await ctx.send(f"🔓 **{player}**님의 차단을 해제했습니다.\n서버 응답: `{response}`")
 
 async def setup(bot):
@@ -1,9 +1,18 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 import aiohttp
+import asyncio
 import io
+import logging
 import os
 import json
+import time
+from core.config import Config
+from core.metrics import CHART_RENDER_SECONDS
+from core.render_cache import chart_cache, RenderError
+from core import prom_chart
+
+log = logging.getLogger(__name__)
 
 class Grafana(commands.Cog):
     def __init__(self, bot):
@@ -13,6 +22,28 @@ class Grafana(commands.Cog):
         # Default Dashboard UID
         self.dashboard_uid = "minecraft-server" 
         self.charts = {} # Name -> ID mapping
+        # 패널 ID -> 직접 그리기 정보 (PromQL 시계열 패널이 아니면 None, 렌더러 사용)
+        self.panels = {}
+        # 코그가 살아 있는 동안 재사용하는 HTTP 세션 (keep-alive 연결 풀, DNS 캐시)
+        self.session = None
+        # 렌더러 컨테이너 보호: 전체 동시 렌더 수와 미리 렌더링 동시 수 제한
+        self.render_limit = asyncio.Semaphore(Config.CHART_RENDER_CONCURRENCY)
+        self.prerender_limit = asyncio.Semaphore(Config.CHART_PRERENDER_CONCURRENCY)
+
+    async def cog_load(self):
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=Config.CHART_RENDER_CONCURRENCY + 2, ttl_dns_cache=300, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=60),
+        )
+        if Config.CHART_PRERENDER_PANELS and Config.CHART_PRERENDER_INTERVAL > 0:
+            self.prerender.change_interval(seconds=Config.CHART_PRERENDER_INTERVAL)
+            self.prerender.start()
+
+    async def cog_unload(self):
+        self.prerender.cancel()
+        if self.session:
+            await self.session.close()
+            self.session = None
 
     async def cog_check(self, ctx):
         # DM Check
@@ -22,8 +53,7 @@ class Grafana(commands.Cog):
 
         user_roles = [role.name.lower().strip() for role in ctx.author.roles]
         
-        print(f"[DEBUG][GrafanaCog] Check for {ctx.author} (ID: {ctx.author.id})")
-        print(f"[DEBUG][GrafanaCog] Roles: {user_roles}")
+        log.debug("Check for %s (ID: %s), roles: %s", ctx.author, ctx.author.id, user_roles)
 
         # 1. 관리자 권한(Administrator) 확인 -> [Strict Mode] 비활성화
         # if ctx.author.guild_permissions.administrator:
@@ -33,10 +63,10 @@ class Grafana(commands.Cog):
         allowed_roles = ["admin", "minecraft admin", "operator", "op", "관리자", "운영자"]
         
         if any(role in allowed_roles for role in user_roles):
-            print("[DEBUG][GrafanaCog] Access Granted (Role Match)")
+            log.debug("Access granted (role match)")
             return True
 
-        print("[DEBUG][GrafanaCog] Access Denied")
+        log.debug("Access denied for %s", ctx.author)
         await ctx.send("⛔ **권한이 없습니다.** 'Admin' 또는 '관리자' 역할이 필요합니다.")
         return False
 
@@ -45,7 +75,7 @@ class Grafana(commands.Cog):
         Fetches the dashboard definition from Grafana and updates the chart mapping.
         """
         if not self.grafana_token:
-            print("WARNING: GRAFANA_TOKEN not set. Cannot sync charts.")
+            log.warning("GRAFANA_TOKEN not set. Cannot sync charts.")
             return False
 
         api_url = f"{self.grafana_url}/api/dashboards/uid/{self.dashboard_uid}"
@@ -54,35 +84,109 @@ class Grafana(commands.Cog):
             "Content-Type": "application/json"
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(api_url, headers=headers) as resp:
-                if resp.status != 200:
-                    text = await resp.text()
-                    print(f"Failed to fetch dashboard: {resp.status} | URL: {api_url}")
-                    print(f"Response: {text}")
-                    return False
-
-                data = await resp.json()
-                dashboard = data.get("dashboard", {})
-                panels = dashboard.get("panels", [])
-
-                new_charts = {}
-                for panel in panels:
-                    # Handle Row panels which might contain other panels (if nested)
-                    # But usually top-level panels are what we want.
-                    # We use the panel 'title' as the key.
-                    title = panel.get("title")
-                    p_id = panel.get("id")
-
-                    if title and p_id is not None:
-                        # Normalize title: lowercase, remove spaces for easier typing?
-                        # Let's keep it simple: lowercase.
-                        key = title.lower()
-                        new_charts[key] = p_id
-
-                self.charts = new_charts
-                print(f"Synced {len(self.charts)} charts from Grafana: {list(self.charts.keys())}")
-                return True
+        async with self.session.get(api_url, headers=headers) as resp:
+            if resp.status != 200:
+                text = await resp.text()
+                log.error("Failed to fetch dashboard: %s | URL: %s | Response: %s", resp.status, api_url, text)
+                return False
+
+            data = await resp.json()
+            dashboard = data.get("dashboard", {})
+            panels = dashboard.get("panels", [])
+
+            new_charts = {}
+            new_panels = {}
+            for panel in panels:
+                # Handle Row panels which might contain other panels (if nested)
+                # But usually top-level panels are what we want.
+                # We use the panel 'title' as the key.
+                title = panel.get("title")
+                p_id = panel.get("id")
+
+                if title and p_id is not None:
+                    # Normalize title: lowercase, remove spaces for easier typing?
+                    # Let's keep it simple: lowercase.
+                    key = title.lower()
+                    new_charts[key] = p_id
+                    new_panels[p_id] = prom_chart.panel_spec(panel)
+
+            self.charts = new_charts
+            self.panels = new_panels
+            native = sum(1 for spec in new_panels.values() if spec)
+            log.info("Synced %d charts from Grafana (%d native): %s", len(self.charts), native, list(self.charts))
+            return True
+
+    def chart_request(self, panel_id):
+        """패널의 (캐시 키, 렌더 코루틴 함수)를 반환합니다."""
+        # 렌더 결과를 결정하는 값들 (캐시 키)
+        time_from, time_to, width, height = "now-1h", "now", 1000, 500
+        cache_key = (self.dashboard_uid, panel_id, time_from, time_to, width, height)
+
+        # Construct Render URL
+        render_url = (
+            f"{self.grafana_url}/render/d-solo/{self.dashboard_uid}/dashboard"
+            f"?panelId={panel_id}&from={time_from}&to={time_to}&width={width}&height={height}&tz=Asia%2FSeoul"
+        )
+
+        headers = {
+            "Authorization": f"Bearer {self.grafana_token}"
+        }
+
+        spec = self.panels.get(panel_id)
+        native = spec is not None and Config.CHART_RENDER_MODE == "auto" and prom_chart.available()
+
+        async def render():
+            async with self.render_limit:
+                if native:
+                    # Prometheus에서 직접 조회하여 그림 (실패하면 렌더러로 대체)
+                    start = time.perf_counter()
+                    try:
+                        data = await prom_chart.render_panel(
+                            self.session, Config.PROMETHEUS_URL, spec, time_from, time_to, width, height,
+                            scrape_interval=Config.PROMETHEUS_SCRAPE_INTERVAL,
+                        )
+                        CHART_RENDER_SECONDS.labels("native").observe(time.perf_counter() - start)
+                        return data
+                    except Exception as e:
+                        log.warning("Native chart render failed (panel %s), falling back to renderer: %s", panel_id, e)
+                start = time.perf_counter()
+                async with self.session.get(render_url, headers=headers) as resp:
+                    if resp.status != 200:
+                        raise RenderError(resp.status)
+                    data = await resp.read()
+                CHART_RENDER_SECONDS.labels("renderer").observe(time.perf_counter() - start)
+                return data
+
+        return cache_key, render
+
+    @tasks.loop(seconds=50)
+    async def prerender(self):
+        """자주 보는 차트를 주기적으로 미리 렌더링하여 !chart가 캐시에서 바로 응답하도록 합니다."""
+        if not self.grafana_token:
+            return
+        if not self.charts:
+            try:
+                await self.sync_dashboard_panels()
+            except Exception as e:
+                # 그라파나가 아직 뜨지 않았으면 다음 주기에 다시 시도
+                log.warning("Chart prerender skipped: %s", e)
+                return
+
+        async def one(name):
+            panel_id = self.charts.get(name)
+            if panel_id is None:
+                return
+            async with self.prerender_limit:
+                try:
+                    await chart_cache.refresh(*self.chart_request(panel_id))
+                except Exception as e:
+                    log.warning("Chart prerender failed (%s): %s", name, e)
+
+        await asyncio.gather(*(one(name) for name in Config.CHART_PRERENDER_PANELS))
+
+    @prerender.before_loop
+    async def before_prerender(self):
+        await self.bot.wait_until_ready()
 
     @commands.Cog.listener()
     async def on_ready(self):
@@ -95,7 +199,7 @@ class Grafana(commands.Cog):
         Manually triggers a sync with Grafana Dashboard.
         Use this if you added new panels to Grafana.
         """
-        print(f"[DEBUG] Executing SYNC command for {ctx.author}")
+        log.debug("Executing SYNC command for %s", ctx.author)
         success = await self.sync_dashboard_panels()
         if success:
             available = ", ".join(self.charts.keys())
@@ -108,7 +212,7 @@ class Grafana(commands.Cog):
         """
         Sets the Grafana Dashboard UID and re-syncs.
         """
-        print(f"[DEBUG] Executing SET_DASHBOARD command for {ctx.author}")
+        log.debug("Executing SET_DASHBOARD command for %s", ctx.author)
         self.dashboard_uid = uid
         await self.sync_dashboard_panels()
         await ctx.send(f"✅ Dashboard UID set to `{uid}` and synced.")
@@ -119,7 +223,7 @@ class Grafana(commands.Cog):
         Fetches a chart from Grafana.
         Usage: !chart <name> (e.g., !chart players)
         """
-        print(f"[DEBUG] Executing CHART command for {ctx.author}")
+        log.debug("Executing CHART command for %s", ctx.author)
         if not self.grafana_token:
             await ctx.send("⚠️ **Configuration Error**: `GRAFANA_TOKEN` is not set.")
             return
@@ -140,27 +244,15 @@ class Grafana(commands.Cog):
             await ctx.send(f"⚠️ **Unknown Chart**: `{chart_name}`\nAvailable: {', '.join(self.charts.keys())}\nTry `!sync` if you just added it.")
             return
 
-        # Construct Render URL
-        render_url = (
-            f"{self.grafana_url}/render/d-solo/{self.dashboard_uid}/dashboard"
-            f"?panelId={target_id}&from=now-1h&to=now&width=1000&height=500&tz=Asia%2FSeoul"
-        )
-
-        headers = {
-            "Authorization": f"Bearer {self.grafana_token}"
-        }
+        cache_key, render = self.chart_request(target_id)
 
         async with ctx.typing():
             try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(render_url, headers=headers) as resp:
-                        if resp.status != 200:
-                            await ctx.send(f"❌ **Grafana Error** ({resp.status})")
-                            return
-
-                        data = await resp.read()
-                        file = discord.File(io.BytesIO(data), filename=f"{chart_name}.png")
-                        await ctx.send(f"📊 **{chart_name.upper()}**", file=file)
+                data, _ = await chart_cache.get(cache_key, render)
+                file = discord.File(io.BytesIO(data), filename=f"{chart_name}.png")
+                await ctx.send(f"📊 **{chart_name.upper()}**", file=file)
+            except RenderError as e:
+                await ctx.send(f"❌ **Grafana Error** ({e.status})")
             except Exception as e:
                 await ctx.send(f"❌ **System Error**: {str(e)}")
 
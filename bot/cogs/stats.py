@@ -1,77 +1,214 @@
+import re
+
 import discord
 from discord.ext import commands
 from core.db import db
+from core.sessions import sessions
+
+# 별칭 매핑 (사용자가 요청한 목록으로 한정)
+STAT_ALIASES = {
+    "다이아": "diamonds_mined", "diamonds": "diamonds_mined", "다이아몬드": "diamonds_mined",
+    "석탄": "coal_mined", "coal": "coal_mined",
+    "철": "iron_mined", "iron": "iron_mined",
+    "금": "gold_mined", "gold": "gold_mined",
+    "네더라이트": "netherite_mined", "netherite": "netherite_mined",
+    "킬": "kills", "kills": "kills",
+    "데스": "deaths", "deaths": "deaths",
+    "블럭": "blocks_broken", "blocks": "blocks_broken", "blocks_broken": "blocks_broken",
+    "플레이타임": "playtime", "playtime": "playtime", "접속시간": "playtime"
+}
+
+AVAILABLE_KOREAN = ["플레이타임", "킬", "데스", "다이아", "석탄", "철", "금", "네더라이트", "블럭"]
+
+# 타이틀 정리
+TITLE_MAP = {
+    "diamonds_mined": "💎 다이아몬드 채굴 랭킹",
+    "coal_mined": "⚫ 석탄 채굴 랭킹",
+    "iron_mined": "⚪ 철 채굴 랭킹",
+    "gold_mined": "🟡 금 채굴 랭킹",
+    "netherite_mined": "🟣 네더라이트 채굴 랭킹",
+    "kills": "⚔️ 최다 킬 랭킹",
+    "deaths": "☠️ 최다 사망 랭킹",
+    "blocks_broken": "⛏️ 총 채굴량 랭킹",
+    "playtime": "⏱️ 플레이 타임 랭킹"
+}
+
+PAGE_SIZE = 10
+
+# 기간 랭킹 별칭 -> 집계 기간
+PERIOD_ALIASES = {
+    "week": "week", "weekly": "week", "주간": "week", "이번주": "week",
+    "day": "day", "today": "day", "daily": "day", "일간": "day", "오늘": "day",
+}
+PERIOD_TITLES = {"week": "이번 주", "day": "오늘"}
+
+# 다음 페이지 명령에 붙는 앞 페이지 마지막 행 (after:<값>:<이름>). 그 행 다음부터 키셋으로 읽습니다.
+CURSOR_PATTERN = re.compile(r'^after:(-?\d+):(\S+)$')
+
+# !sessions 최대 표시 개수
+MAX_SESSIONS = 25
+
+# 접속 기록 종료 사유
+END_REASONS = {
+    "logout": "",
+    "server_stop": " (서버 종료)",
+    "missed": " (퇴장 기록 없음)",
+    "crash": " (서버 비정상 종료)",
+}
+
+
+def format_cursor(row, stat):
+    """다음 페이지 명령에 붙일 커서. 공백이 든 이름은 명령 인자로 나뉘므로 커서 없이 페이지 번호만 씁니다."""
+    name = row['player_name']
+    if any(c.isspace() for c in name):
+        return None
+    return f"after:{row[stat]}:{name}"
+
+
+def resolve_stat(stat_type):
+    """별칭을 컬럼명으로 바꿉니다. 지원하지 않는 통계면 None."""
+    target_stat = STAT_ALIASES.get(stat_type.lower(), stat_type.lower())
+    return target_stat if target_stat in TITLE_MAP else None
+
+
+def format_value(stat, raw_value):
+    # 값 포맷팅
+    if stat == "playtime":
+        # Ticks -> Time String (1sec = 20ticks)
+        total_seconds = raw_value / 20
+        hours = int(total_seconds // 3600)
+        minutes = int((total_seconds % 3600) // 60)
+        return f"{hours}시간 {minutes}분"
+    return f"{raw_value:,}" # 천단위 콤마
+
+
+def format_duration(delta):
+    minutes = int(delta.total_seconds() // 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}시간 {minutes}분" if hours else f"{minutes}분"
+
 
 class Stats(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
     @commands.command(name="leaderboard", aliases=["lb", "랭킹"])
-    async def leaderboard(self, ctx, stat_type: str = "playtime"):
-        """랭킹을 보여줍니다. 지원: playtime, kills, deaths, diamonds, coal, iron, gold, netherite, blocks"""
-        
-        # 별칭 매핑 (사용자가 요청한 목록으로 한정)
-        aliases = {
-            "다이아": "diamonds_mined", "diamonds": "diamonds_mined", "다이아몬드": "diamonds_mined",
-            "석탄": "coal_mined", "coal": "coal_mined",
-            "철": "iron_mined", "iron": "iron_mined",
-            "금": "gold_mined", "gold": "gold_mined",
-            "네더라이트": "netherite_mined", "netherite": "netherite_mined",
-            "킬": "kills", "kills": "kills",
-            "데스": "deaths", "deaths": "deaths",
-            "블럭": "blocks_broken", "blocks": "blocks_broken", "blocks_broken": "blocks_broken",
-            "플레이타임": "playtime", "playtime": "playtime", "접속시간": "playtime"
-        }
-        
-        target_stat = aliases.get(stat_type.lower(), stat_type.lower())
-        
-        # 유효성 검사
-        valid_columns = list(set(aliases.values()))
-        if target_stat not in valid_columns:
-            available_korean = ["플레이타임", "킬", "데스", "다이아", "석탄", "철", "금", "네더라이트", "블럭"]
-            await ctx.send(f"❌ **지원하지 않는 통계입니다.**\n사용 가능: `{', '.join(available_korean)}`")
+    async def leaderboard(self, ctx, stat_type: str = "playtime", *args: str):
+        """
+        랭킹을 보여줍니다. 지원: playtime, kills, deaths, diamonds, coal, iron, gold, netherite, blocks
+        기간(week/day)을 주면 이번 주 / 오늘 증가량 랭킹입니다. (예: !lb 다이아 2, !lb 킬 week, !lb 다이아 오늘 2)
+        """
+        target_stat = resolve_stat(stat_type)
+        if target_stat is None:
+            await ctx.send(f"❌ **지원하지 않는 통계입니다.**\n사용 가능: `{', '.join(AVAILABLE_KOREAN)}`")
+            return
+        period, page, after = None, 1, None
+        for arg in args:
+            cursor = CURSOR_PATTERN.match(arg)
+            if cursor:
+                # 다음 페이지 안내에 붙은 커서 (앞 페이지 마지막 행)
+                after = (int(cursor.group(1)), cursor.group(2))
+            elif arg.lstrip("-").isdigit():
+                page = int(arg)
+            else:
+                period = PERIOD_ALIASES.get(arg.lower())
+                if period is None:
+                    await ctx.send("❌ **지원하지 않는 기간입니다.**\n사용 가능: `week`(주간), `day`(오늘)")
+                    return
+        if page < 1:
+            await ctx.send("❌ **페이지는 1 이상이어야 합니다.**")
             return
 
-        data = await db.get_top_players(target_stat)
+        if period:
+            data = await db.get_period_leaderboard(target_stat, period, page, PAGE_SIZE)
+        elif page == 1:
+            data = await db.leaderboard.get_top(target_stat, PAGE_SIZE)
+        elif after is None and page * PAGE_SIZE <= db.leaderboard.depth:
+            # 커서 없이 페이지 번호로 건너뛴 경우 캐시된 상위권 안이면 메모리에서 (그보다 깊으면 OFFSET)
+            data = await db.leaderboard.get_page(target_stat, page, PAGE_SIZE)
+        else:
+            data = await db.get_leaderboard_page(target_stat, page, PAGE_SIZE, after=after)
         
         if not data:
-            await ctx.send("📊 **아직 기록된 데이터가 없습니다.**")
+            if page == 1:
+                await ctx.send("📊 **아직 기록된 데이터가 없습니다.**")
+            else:
+                await ctx.send(f"📊 **{page}페이지에는 데이터가 없습니다.**")
             return
 
-        # 타이틀 정리
-        title_map = {
-            "diamonds_mined": "💎 다이아몬드 채굴 랭킹",
-            "coal_mined": "⚫ 석탄 채굴 랭킹",
-            "iron_mined": "⚪ 철 채굴 랭킹",
-            "gold_mined": "🟡 금 채굴 랭킹",
-            "netherite_mined": "🟣 네더라이트 채굴 랭킹",
-            "kills": "⚔️ 최다 킬 랭킹",
-            "deaths": "☠️ 최다 사망 랭킹",
-            "blocks_broken": "⛏️ 총 채굴량 랭킹",
-            "playtime": "⏱️ 플레이 타임 랭킹"
-        }
-        
-        embed = discord.Embed(title=title_map.get(target_stat, f"Ranking: {target_stat}"), color=discord.Color.gold())
+        title = TITLE_MAP[target_stat]
+        if period:
+            title += f" ({PERIOD_TITLES[period]})"
+        if page > 1:
+            title += f" ({page}페이지)"
+        embed = discord.Embed(title=title, color=discord.Color.gold())
         
         description = ""
-        for i, row in enumerate(data, 1):
+        for i, row in enumerate(data, (page - 1) * PAGE_SIZE + 1):
             player = row['player_name']
-            raw_value = row[target_stat]
-            
-            # 값 포맷팅
-            if target_stat == "playtime":
-                # Ticks -> Time String (1sec = 20ticks)
-                total_seconds = raw_value / 20
-                hours = int(total_seconds // 3600)
-                minutes = int((total_seconds % 3600) // 60)
-                value_str = f"{hours}시간 {minutes}분"
-            else:
-                value_str = f"{raw_value:,}" # 천단위 콤마
-
+            value_str = format_value(target_stat, row[target_stat])
             medal = {1: "🥇", 2: "🥈", 3: "🥉"}.get(i, f"**{i}.**")
             description += f"{medal} **{player}**: {value_str}\n"
         
         embed.description = description
+        if len(data) == PAGE_SIZE:
+            if period:
+                next_args = f"{stat_type} {period} {page + 1}"
+            else:
+                cursor = format_cursor(data[-1], target_stat)
+                next_args = f"{stat_type} {page + 1} {cursor}" if cursor else f"{stat_type} {page + 1}"
+            embed.set_footer(text=f"다음 페이지: !lb {next_args}")
+        await ctx.send(embed=embed)
+
+    @commands.command(name="rank", aliases=["순위"])
+    async def rank(self, ctx, player: str, stat_type: str = None):
+        """플레이어의 순위를 보여줍니다. 통계를 생략하면 모든 랭킹의 순위를 보여줍니다."""
+        if stat_type is None:
+            stats = list(TITLE_MAP)
+        else:
+            target_stat = resolve_stat(stat_type)
+            if target_stat is None:
+                await ctx.send(f"❌ **지원하지 않는 통계입니다.**\n사용 가능: `{', '.join(AVAILABLE_KOREAN)}`")
+                return
+            stats = [target_stat]
+
+        lines = []
+        for stat in stats:
+            result = await db.get_player_rank(player, stat)
+            if result is None:
+                await ctx.send(f"❌ **{player}** 님의 기록이 없습니다.")
+                return
+            rank, value = result
+            lines.append(f"{TITLE_MAP[stat]}: **{rank:,}위** ({format_value(stat, value)})")
+
+        embed = discord.Embed(title=f"🏅 {player} 님의 순위", color=discord.Color.gold())
+        embed.description = "\n".join(lines)
+        await ctx.send(embed=embed)
+
+    @commands.command(name="sessions", aliases=["세션", "접속기록"])
+    async def session_history(self, ctx, player: str, count: int = 10):
+        """플레이어의 최근 접속 기록을 보여줍니다. (예: !세션 Steve 5)"""
+        count = max(1, min(count, MAX_SESSIONS))
+        rows = await sessions.history(player, count)
+        if not rows:
+            await ctx.send(f"❌ **{player}** 님의 접속 기록이 없습니다.")
+            return
+
+        lines = []
+        for row in rows:
+            started = row['started_at'].strftime("%m/%d %H:%M")
+            if row['ended_at'] is None:
+                lines.append(f"🟢 {started} ~ **접속 중**")
+            else:
+                duration = format_duration(row['ended_at'] - row['started_at'])
+                lines.append(
+                    f"⚪ {started} ~ {row['ended_at'].strftime('%H:%M')} "
+                    f"({duration}){END_REASONS.get(row['end_reason'], '')}"
+                )
+
+        embed = discord.Embed(title=f"🕒 {player} 님의 접속 기록", color=discord.Color.blue())
+        embed.description = "\n".join(lines)
+        embed.set_footer(text=f"최근 {len(rows)}개 / 전체 {rows[0]['total']:,}회")
         await ctx.send(embed=embed)
 
 async def setup(bot):
@@ -10,6 +10,9 @@ class Config:
     RCON_HOST = os.getenv("RCON_HOST", "mc-server")
     RCON_PORT = int(os.getenv("RCON_PORT", 25575))
     RCON_PASSWORD = os.getenv("RCON_PASSWORD", "password")
+    # 유지할 RCON 연결 수와 명령별 응답 대기 시간 (초)
+    RCON_POOL_SIZE = int(os.getenv("RCON_POOL_SIZE", 2))
+    RCON_TIMEOUT = float(os.getenv("RCON_TIMEOUT", 5))
     
     # 데이터베이스 설정
     DB_HOST = os.getenv("DB_HOST", "postgres")
@@ -17,3 +20,59 @@ class Config:
     DB_USER = os.getenv("DB_USER", "user")
     DB_PASSWORD = os.getenv("DB_PASSWORD", "password")
     DB_NAME = os.getenv("DB_NAME", "mc_stats")
+
+    # 봇 자체 로그 레벨 (DEBUG / INFO / WARNING / ERROR)과 출력 형식 ("text" 또는 한 줄에 JSON 하나인 "json")
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+
+    # 로그 추적 방식 ("auto": inotify 우선, "poll": 폴링 전용)
+    LOG_TAIL_MODE = os.getenv("LOG_TAIL_MODE", "auto")
+
+    # 로그 이벤트 알림 채널과 발송 설정 (합치는 시간 창, 채널별 전송 예산 NOTIFY_RATE회 / NOTIFY_RATE_PERIOD초)
+    NOTIFY_CHANNEL_ID = int(os.getenv("NOTIFY_CHANNEL_ID", 1445330465530576938))
+    NOTIFY_COALESCE_SECONDS = float(os.getenv("NOTIFY_COALESCE_SECONDS", 0.5))
+    NOTIFY_RATE = int(os.getenv("NOTIFY_RATE", 5))
+    NOTIFY_RATE_PERIOD = float(os.getenv("NOTIFY_RATE_PERIOD", 5))
+    # 디스코드 연결이 끊겨 있는 동안 보관할 최대 알림 수
+    NOTIFY_MAX_PENDING = int(os.getenv("NOTIFY_MAX_PENDING", 500))
+
+    # 로그 이벤트 버스: 대기 가능한 최대 이벤트 수 (가득 차면 로그 파서가 기다림)와 처리 작업자 수
+    EVENT_BUS_SIZE = int(os.getenv("EVENT_BUS_SIZE", 1000))
+    EVENT_BUS_WORKERS = int(os.getenv("EVENT_BUS_WORKERS", 8))
+
+    # Floodgate(Bedrock) 플레이어 이름 접두사 (Floodgate 설정의 username-prefix와 맞춤)
+    FLOODGATE_PREFIX = os.getenv("FLOODGATE_PREFIX", ".")
+
+    # 로그 파서 체크포인트 저장 위치 (재시작 시 놓친 로그 재생용, 쓰기 가능한 경로여야 함)
+    LOG_CHECKPOINT_PATH = os.getenv("LOG_CHECKPOINT_PATH", "/bot-data/log_checkpoint.json")
+
+    # !leaderboard 캐시를 DB와 다시 맞추는 주기 (초)
+    LEADERBOARD_CACHE_TTL = int(os.getenv("LEADERBOARD_CACHE_TTL", 300))
+
+    # 접속 중인 플레이어의 playtime 반영과 접속 기록(player_sessions) 저장 주기 (초)
+    SESSION_FLUSH_INTERVAL = int(os.getenv("SESSION_FLUSH_INTERVAL", 60))
+
+    # 통계 변화량 기록(player_stat_history 월 파티션)과 일별 집계 보관 기간 (개월, 0이면 계속 보관)
+    STAT_HISTORY_MONTHS = int(os.getenv("STAT_HISTORY_MONTHS", 12))
+
+    # world/stats 전체 동기화 주기 (초, 0이면 사용 안 함)와 파싱 프로세스 수
+    STATS_SYNC_INTERVAL = int(os.getenv("STATS_SYNC_INTERVAL", 300))
+    STATS_SYNC_WORKERS = int(os.getenv("STATS_SYNC_WORKERS", 2))
+
+    # !chart 렌더 이미지 캐시 (TTL 초, 최대 개수, 최대 용량 MB)
+    CHART_CACHE_TTL = int(os.getenv("CHART_CACHE_TTL", 60))
+    CHART_CACHE_MAX_ENTRIES = int(os.getenv("CHART_CACHE_MAX_ENTRIES", 32))
+    CHART_CACHE_MAX_MB = int(os.getenv("CHART_CACHE_MAX_MB", 32))
+
+    # 백그라운드 차트 미리 렌더링: 차트 이름(쉼표 구분), 주기(초, 0이면 끔, CHART_CACHE_TTL보다 짧게)
+    CHART_PRERENDER_PANELS = [name.strip().lower() for name in os.getenv("CHART_PRERENDER_PANELS", "").split(",") if name.strip()]
+    CHART_PRERENDER_INTERVAL = int(os.getenv("CHART_PRERENDER_INTERVAL", 50))
+    # 렌더러 동시 요청 수 (전체 / 미리 렌더링)
+    CHART_RENDER_CONCURRENCY = int(os.getenv("CHART_RENDER_CONCURRENCY", 2))
+    CHART_PRERENDER_CONCURRENCY = int(os.getenv("CHART_PRERENDER_CONCURRENCY", 1))
+
+    # !chart 렌더링 방식 ("auto": PromQL 시계열 패널은 Prometheus 데이터로 직접 그리고 나머지만 렌더러 사용, "renderer": 항상 렌더러)
+    CHART_RENDER_MODE = os.getenv("CHART_RENDER_MODE", "auto")
+    PROMETHEUS_URL = os.getenv("PROMETHEUS_URL", "http://prometheus:9090")
+    # Prometheus 수집 주기 (초, prometheus.yml의 scrape_interval과 맞춤)
+    PROMETHEUS_SCRAPE_INTERVAL = int(os.getenv("PROMETHEUS_SCRAPE_INTERVAL", 15))
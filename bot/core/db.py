@@ -1,120 +1,786 @@
+import asyncio
 import asyncpg
+import datetime
+import logging
 import os
+import time
+from contextlib import asynccontextmanager
 from .config import Config
+from .metrics import DB_POOL_WAIT_SECONDS, DB_QUERY_SECONDS
+from .leaderboard import LeaderboardCache
+from .player_index import is_player_name
+
+log = logging.getLogger(__name__)
+
+# player_stats 스키마 (컬럼, 타입). CREATE TABLE과 컬럼 레지스트리가 모두 여기서 만들어집니다.
+PLAYER_STATS_SCHEMA = (
+    ("player_name", "VARCHAR(50) PRIMARY KEY"),
+    ("kills", "INT DEFAULT 0"),
+    ("deaths", "INT DEFAULT 0"),
+    ("blocks_broken", "INT DEFAULT 0"),
+    ("playtime", "BIGINT DEFAULT 0"),
+    ("last_login", "TIMESTAMP"),
+    ("last_logout", "TIMESTAMP"),
+    ("advancements", "INT DEFAULT 0"),
+    ("diamonds_mined", "INT DEFAULT 0"),
+    ("coal_mined", "INT DEFAULT 0"),
+    ("iron_mined", "INT DEFAULT 0"),
+    ("gold_mined", "INT DEFAULT 0"),
+    ("emerald_mined", "INT DEFAULT 0"),
+    ("lapis_mined", "INT DEFAULT 0"),
+    ("redstone_mined", "INT DEFAULT 0"),
+    ("netherite_mined", "INT DEFAULT 0"),
+    ("last_updated", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP"),
+)
+
+# 숫자 통계 컬럼 (증가/절대값 설정/랭킹 대상)
+STAT_COLUMNS = tuple(name for name, sql_type in PLAYER_STATS_SCHEMA if sql_type.startswith(("INT", "BIGINT")))
+# CURRENT_TIMESTAMP로 갱신되는 시각 컬럼
+TIMESTAMP_COLUMNS = tuple(name for name, sql_type in PLAYER_STATS_SCHEMA if sql_type == "TIMESTAMP")
+
+# 랭킹/페이지 조회 대상 컬럼. 컬럼마다 (값 DESC, 이름) 인덱스를 만들므로 쓰기 비용을 고려해 필요한 것만 둡니다.
+LEADERBOARD_COLUMNS = (
+    "playtime", "kills", "deaths", "blocks_broken",
+    "diamonds_mined", "coal_mined", "iron_mined", "gold_mined", "netherite_mined",
+)
+
+_PLAYER_STATS_COLUMNS_SQL = ",\n        ".join(f"{name} {sql_type}" for name, sql_type in PLAYER_STATS_SCHEMA)
+
+SCHEMA_QUERIES = [
+    f"""
+    CREATE TABLE IF NOT EXISTS player_stats (
+        {_PLAYER_STATS_COLUMNS_SQL}
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS log_backfill (
+        file_name VARCHAR(100) PRIMARY KEY,
+        events INT DEFAULT 0,
+        processed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    """,
+    # 봇이 실시간으로 로그를 반영하기 시작한 날 (한 행). 백필은 이 날 이전의 아카이브만 처리합니다.
+    """
+    CREATE TABLE IF NOT EXISTS log_live_ingest (
+        id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+        first_day DATE NOT NULL
+    );
+    """,
+    # 접속 기록 (접속 중인 세션은 ended_at이 NULL). 기본 키가 플레이어별 최근 기록 조회 인덱스를 겸합니다.
+    """
+    CREATE TABLE IF NOT EXISTS player_sessions (
+        player_name VARCHAR(50) NOT NULL,
+        started_at TIMESTAMP NOT NULL,
+        ended_at TIMESTAMP,
+        end_reason VARCHAR(20),
+        PRIMARY KEY (player_name, started_at)
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_player_sessions_open ON player_sessions (player_name) WHERE ended_at IS NULL;",
+    # 통계 변화량 기록 (추가 전용). 월별 파티션은 Database._ensure_history_partitions가 만들고 보관 기간이 지나면 통째로 삭제합니다.
+    """
+    CREATE TABLE IF NOT EXISTS player_stat_history (
+        recorded_at TIMESTAMP NOT NULL,
+        player_name VARCHAR(50) NOT NULL,
+        stat VARCHAR(30) NOT NULL,
+        delta BIGINT NOT NULL
+    ) PARTITION BY RANGE (recorded_at);
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_player_stat_history_player ON player_stat_history (player_name, recorded_at);",
+    # 일/주별 변화량 합계 (변화량을 기록할 때 함께 증분 갱신). 기간 랭킹은 원본 기록을 집계하지 않고 여기서 읽습니다.
+    """
+    CREATE TABLE IF NOT EXISTS player_stat_rollups (
+        period VARCHAR(5) NOT NULL,
+        period_start DATE NOT NULL,
+        stat VARCHAR(30) NOT NULL,
+        player_name VARCHAR(50) NOT NULL,
+        total BIGINT NOT NULL,
+        PRIMARY KEY (period, period_start, stat, player_name)
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_player_stat_rollups_rank ON player_stat_rollups (period, period_start, stat, total DESC, player_name);",
+] + [
+    # 랭킹 정렬 순서(값 내림차순, 동점은 이름순)와 같은 인덱스: 상위 N/키셋 페이지/순위 계산이 인덱스 범위 스캔으로 처리됩니다.
+    f"CREATE INDEX IF NOT EXISTS idx_player_stats_{col}_rank ON player_stats ({col} DESC, player_name);"
+    for col in LEADERBOARD_COLUMNS
+]
+
+
+def _build_statements():
+    """
+    (작업, 컬럼)별 조회 SQL을 미리 만들어 둡니다. 호출 시 문자열 조립이 필요 없고, 문장이 고정되어 있으므로
+    asyncpg가 커넥션마다 처음 실행할 때 한 번 prepare하여 캐시(statement_cache_size)에서 재사용합니다.
+    """
+    statements = {}
+    for col in STAT_COLUMNS:
+        statements[("get_top_players", col)] = f"""
+        SELECT player_name, {col} 
+        FROM player_stats 
+        ORDER BY {col} DESC, player_name
+        LIMIT $1;
+        """
+        statements[("get_player_stat", col)] = f"SELECT {col} FROM player_stats WHERE player_name = $1;"
+    for col in LEADERBOARD_COLUMNS:
+        # 키셋 페이지: ($1, $2) = 이전 페이지 마지막 행. 앞의 {col} <= $1 조건이 인덱스 범위 조건이 됩니다.
+        statements[("get_page_after", col)] = f"""
+        SELECT player_name, {col}
+        FROM player_stats
+        WHERE {col} <= $1 AND ({col} < $1 OR player_name > $2)
+        ORDER BY {col} DESC, player_name
+        LIMIT $3;
+        """
+        # 커서 없이 LeaderboardCache 깊이보다 깊은 페이지 번호로 바로 건너뛴 경우만 사용 (앞 행을 모두 건너뛰므로 깊을수록 느림)
+        statements[("get_page_offset", col)] = f"""
+        SELECT player_name, {col}
+        FROM player_stats
+        ORDER BY {col} DESC, player_name
+        LIMIT $1 OFFSET $2;
+        """
+        # 기간(일/주) 랭킹: ($1, $2) = (기간 종류, 기간 시작일). 값 컬럼 이름을 player_stats 조회와 맞춤
+        statements[("get_period_page", col)] = f"""
+        SELECT player_name, total AS {col}
+        FROM player_stat_rollups
+        WHERE period = $1 AND period_start = $2 AND stat = '{col}' AND total > 0
+        ORDER BY total DESC, player_name
+        LIMIT $3 OFFSET $4;
+        """
+        # 순위 = 정렬 순서상 앞에 있는 행 수 + 1. idx_player_stats_{col}_rank의 앞부분만 인덱스 전용 스캔으로 세므로
+        # 테이블 크기가 아니라 순위에 비례합니다 (상위권은 LeaderboardCache에서 응답하고 여기까지 오지 않음)
+        statements[("get_player_rank", col)] = f"""
+        SELECT p.{col} AS value,
+               (SELECT COUNT(*) FROM player_stats o
+                WHERE o.{col} >= p.{col} AND (o.{col} > p.{col} OR o.player_name < p.player_name)) + 1 AS rank
+        FROM player_stats p
+        WHERE p.player_name = $1;
+        """
+    return statements
+
+STATEMENTS = _build_statements()
+
+
+def _batch_source(first_param):
+    """
+    배치 쓰기의 원본 (unnest로 펼친 플레이어별 행). 모든 통계/시각 컬럼을 고정된 순서로 받으므로
+    바뀌는 컬럼 조합과 관계없이 SQL이 하나뿐이고, 커넥션마다 한 번만 prepare됩니다.
+    반환: (unnest 인자 목록, 원본 컬럼 목록)
+    """
+    casts = [f"${first_param}::varchar[]"]
+    source_cols = ["player_name"]
+    for col in STAT_COLUMNS:
+        casts += [f"${first_param + len(casts)}::bigint[]", f"${first_param + len(casts) + 1}::bigint[]"]
+        source_cols += [f"{col}_inc", f"{col}_set"]
+    for col in TIMESTAMP_COLUMNS:
+        casts += [f"${first_param + len(casts)}::bool[]", f"${first_param + len(casts) + 1}::timestamp[]"]
+        source_cols += [f"{col}_touch", f"{col}_at"]
+    return ", ".join(casts), ", ".join(source_cols)
+
+
+def _build_merge_query():
+    """player_stats 배치 MERGE. $1 = 플레이어, 이후 컬럼마다 (증가량, 설정값) / 시각 컬럼마다 (갱신 여부, 시각) 배열."""
+    casts, source_cols = _batch_source(1)
+    # 바뀌지 않는 컬럼은 증가량 0, 설정값 NULL, 갱신 여부 false로 넘어오므로 현재 값 그대로
+    # 시각 컬럼은 과거 시각(백필)으로 최신 값을 덮어쓰지 않도록 GREATEST 사용
+    new_values = {col: f"COALESCE(t.{col}_set, p.{col}) + t.{col}_inc" for col in STAT_COLUMNS}
+    new_values.update({
+        col: f"CASE WHEN t.{col}_touch THEN GREATEST(p.{col}, COALESCE(t.{col}_at, CURRENT_TIMESTAMP)) ELSE p.{col} END"
+        for col in TIMESTAMP_COLUMNS
+    })
+    update_sets = [f"{col} = {value}" for col, value in new_values.items()]
+    # 새 값이 현재 값과 모두 같으면 행을 다시 쓰지 않음 (last_updated도 그대로)
+    changed = f"({', '.join(new_values.values())}) IS DISTINCT FROM ({', '.join(f'p.{col}' for col in new_values)})"
+    insert_values = [f"COALESCE(t.{col}_set, 0) + t.{col}_inc" for col in STAT_COLUMNS]
+    insert_values += [f"CASE WHEN t.{col}_touch THEN COALESCE(t.{col}_at, CURRENT_TIMESTAMP) END" for col in TIMESTAMP_COLUMNS]
+    return f"""
+    MERGE INTO player_stats AS p
+    USING (SELECT * FROM unnest({casts}) AS t({source_cols})) AS t
+    ON p.player_name = t.player_name
+    WHEN MATCHED AND {changed} THEN UPDATE SET {", ".join(update_sets + ["last_updated = CURRENT_TIMESTAMP"])}
+    WHEN NOT MATCHED THEN INSERT (player_name, {", ".join(STAT_COLUMNS + TIMESTAMP_COLUMNS + ("last_updated",))})
+        VALUES (t.player_name, {", ".join(insert_values + ["CURRENT_TIMESTAMP"])});
+    """
+
+
+def _build_history_query():
+    """
+    apply_batch가 반영할 통계 변화량을 player_stat_history와 일/주 집계(player_stat_rollups)에 기록하는 쿼리.
+    $1 = 기록 시각, $2 이후는 MERGE와 같은 배열. MERGE 직전에 같은 트랜잭션에서 현재 값을 잠그고 읽어
+    (set 이후 값 + 증가량) - 현재 값을 계산하고, 변화가 없는 컬럼은 기록하지 않습니다.
+    처음 기록되는 플레이어의 set 값은 기준값으로 보고 증가량만 변화량으로 기록합니다.
+    """
+    casts, source_cols = _batch_source(2)
+    deltas = [
+        f"('{col}', CASE WHEN p.player_name IS NULL THEN t.{col}_inc "
+        f"ELSE COALESCE(t.{col}_set, p.{col}, 0) + t.{col}_inc - COALESCE(p.{col}, 0) END)"
+        for col in STAT_COLUMNS
+    ]
+    # 잠금 순서를 이름순으로 고정하여 동시에 실행되는 배치끼리 교착되지 않게 함
+    return f"""
+    WITH t AS (
+        SELECT * FROM unnest({casts}) AS t({source_cols})
+    ), p AS (
+        SELECT player_name, {", ".join(STAT_COLUMNS)} FROM player_stats
+        WHERE player_name = ANY($2::varchar[])
+        ORDER BY player_name
+        FOR UPDATE
+    ), d AS (
+        SELECT t.player_name, v.stat, v.delta
+        FROM t LEFT JOIN p ON p.player_name = t.player_name
+        CROSS JOIN LATERAL (VALUES {", ".join(deltas)}) AS v(stat, delta)
+        WHERE v.delta <> 0
+    ), h AS (
+        INSERT INTO player_stat_history (recorded_at, player_name, stat, delta)
+        SELECT $1::timestamp, player_name, stat, delta FROM d
+    )
+    INSERT INTO player_stat_rollups (period, period_start, stat, player_name, total)
+    SELECT r.period, r.period_start, d.stat, d.player_name, d.delta
+    FROM d CROSS JOIN (VALUES
+        ('day', date_trunc('day', $1::timestamp)::date),
+        ('week', date_trunc('week', $1::timestamp)::date)
+    ) AS r(period, period_start)
+    ON CONFLICT (period, period_start, stat, player_name)
+    DO UPDATE SET total = player_stat_rollups.total + EXCLUDED.total;
+    """
+
+MERGE_QUERY = _build_merge_query()
+HISTORY_QUERY = _build_history_query()
+
+# 잠시 뒤 다시 시도하면 성공할 수 있는 오류 (연결 끊김, DB 재시작/과부하, 교착 등).
+# 그 밖의 오류(값이 컬럼에 맞지 않는 등)는 특정 행 때문이므로 다시 시도해도 같은 결과입니다.
+TRANSIENT_DB_ERRORS = (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.InterfaceError,
+    asyncpg.PostgresConnectionError,
+    asyncpg.OperatorInterventionError,
+    asyncpg.InsufficientResourcesError,
+    asyncpg.TransactionRollbackError,
+)
+
+
+# 일/주 집계 기간
+PERIODS = ("day", "week")
+
+
+def period_start(period, now=None):
+    """now(기본: 현재 시각)가 속한 기간의 시작일. 주는 월요일부터 (Postgres date_trunc('week')와 같음)."""
+    day = (now or datetime.datetime.now()).date()
+    if period == "week":
+        return day - datetime.timedelta(days=day.weekday())
+    if period == "day":
+        return day
+    raise ValueError(f"Unknown period: {period}")
+
+
+def _add_months(day, months):
+    """day가 속한 달에서 months개월 뒤(앞) 달의 1일."""
+    month = day.month - 1 + months
+    return datetime.date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def statement_key(operation, column):
+    """허용된 (작업, 컬럼) 조합인지 확인합니다. 컬럼명이 SQL에 그대로 들어가므로 화이트리스트로 제한합니다."""
+    key = (operation, column)
+    if key not in STATEMENTS:
+        raise ValueError(f"Unknown column for {operation}: {column}")
+    return key
+
+
+class StatWriteBuffer:
+    """
+    통계 변경(증가, 절대값 설정, 시각 갱신)을 메모리에서 플레이어별로 합쳐 두었다가
+    일정 주기 또는 일정 개수가 쌓이면 Database.apply_batch 한 번으로 기록합니다.
+    플레이어 이름 형식이 아닌 변경은 받지 않고, DB가 거부하는 행은 배치를 나눠 찾아낸 뒤 버립니다.
+    """
+
+    def __init__(self, database, flush_interval=0.5, max_pending=500):
+        self.db = database
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.increments = {}
+        self.sets = {}
+        self.timestamps = {}
+        self.pending = 0
+        self.flushes = 0
+        # 이름 형식이 아니어서 받지 않은 변경 수 / DB가 거부하여 버린 플레이어 수
+        self.rejected = 0
+        self.dropped = 0
+        # 플레이어별 마지막으로 받은 통계 스냅샷 (Database.set_stats). 그 뒤 값을 바꾸는 변경이 들어오면 지움
+        self.snapshots = {}
+        self._task = None
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+
+    def _accept(self, player):
+        if is_player_name(player):
+            return True
+        self.rejected += 1
+        log.debug("Ignoring stat update for invalid player name %r", player)
+        return False
+
+    def increment(self, player, stat, value=1):
+        if not self._accept(player):
+            return
+        self.forget_snapshots({player: {stat: value}}, {})
+        player_stats = self.increments.setdefault(player, {})
+        player_stats[stat] = player_stats.get(stat, 0) + value
+        self._added()
+
+    def set(self, player, stat, value):
+        if not self._accept(player):
+            return
+        self.forget_snapshots({}, {player: {stat: value}})
+        self.sets.setdefault(player, {})[stat] = value
+        # 설정 이전에 쌓인 증가분은 덮어쓰여 의미가 없음
+        self.increments.get(player, {}).pop(stat, None)
+        self._added()
+
+    def touch(self, player, column):
+        """시각 컬럼을 flush 시점의 CURRENT_TIMESTAMP로 갱신합니다."""
+        if not self._accept(player):
+            return
+        self.timestamps.setdefault(player, set()).add(column)
+        self._added()
+
+    def forget_snapshots(self, increments, sets):
+        """스냅샷과 다른 값이 되는 변경이 생긴 플레이어는 다음 스냅샷을 비교 없이 기록하도록 스냅샷을 지웁니다."""
+        if not self.snapshots:
+            return
+        for player, stats in increments.items():
+            snapshot = self.snapshots.get(player)
+            if snapshot and any(stat in snapshot and value for stat, value in stats.items()):
+                del self.snapshots[player]
+        for player, stats in sets.items():
+            snapshot = self.snapshots.get(player)
+            if snapshot and any(stat in snapshot and snapshot[stat] != value for stat, value in stats.items()):
+                del self.snapshots[player]
+
+    def _added(self):
+        self.pending += 1
+        if self.pending >= self.max_pending:
+            self._wakeup.set()
+
+    def start(self):
+        if not self._task:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        """
+        쌓인 변경을 한 번의 쿼리로 기록합니다.
+        연결 문제 등으로 실패하면 다음 flush에서 다시 시도하고, 그 밖의 오류로 실패하면 _apply가 거부된 행만 버립니다.
+        """
+        async with self._flush_lock:
+            if not self.pending:
+                return
+
+            increments, sets, timestamps = self.increments, self.sets, self.timestamps
+            self.increments, self.sets, self.timestamps = {}, {}, {}
+            self.pending = 0
+
+            failed = await self._apply(increments, sets, timestamps)
+            if failed:
+                self._requeue(*failed)
+
+    async def _apply(self, increments, sets, timestamps):
+        """
+        배치를 기록하고, 다시 시도할 (increments, sets, timestamps)를 반환합니다 (없으면 None).
+        행 때문에 실패하면 배치를 반으로 나눠 다시 기록하여 성공한 부분은 반영하고,
+        플레이어 한 명만 남아도 실패하면 그 플레이어의 변경을 로그에 남기고 버립니다.
+        """
+        players = sorted(set(increments) | set(sets) | set(timestamps))
+        try:
+            await self.db.apply_batch(increments, sets, timestamps)
+            self.flushes += 1
+            return None
+        except TRANSIENT_DB_ERRORS as e:
+            log.error("Failed to flush stat updates (%d players), will retry: %s", len(players), e)
+            return increments, sets, timestamps
+        except Exception as e:
+            if len(players) == 1:
+                self.dropped += 1
+                log.error(
+                    "Dropping stat updates the database rejected for %r: %s (increments=%s, sets=%s, timestamps=%s)",
+                    players[0], e, increments, sets, timestamps,
+                )
+                return None
+            log.warning("Stat batch of %d players rejected, splitting to find the bad rows: %s", len(players), e)
+
+        retry = ({}, {}, {})
+        half = len(players) // 2
+        for part in (players[:half], players[half:]):
+            batch = [{p: m[p] for p in part if p in m} for m in (increments, sets, timestamps)]
+            failed = await self._apply(*batch)
+            if failed:
+                for pending, more in zip(retry, failed):
+                    pending.update(more)
+        return retry if any(retry) else None
+
+    def _requeue(self, increments, sets, timestamps):
+        # 실패한 (더 오래된) 변경 위에 그 사이 새로 들어온 변경을 다시 적용
+        newer_increments, newer_sets, newer_timestamps = self.increments, self.sets, self.timestamps
+        self.increments, self.sets, self.timestamps = increments, sets, timestamps
+        # 그 사이 새 변경이 없어도 다음 flush가 건너뛰지 않도록 다시 넣은 플레이어 수만큼 대기 중으로 셈
+        self.pending = len(set(increments) | set(sets) | set(timestamps))
+        for player, stats in newer_sets.items():
+            for stat, value in stats.items():
+                self.set(player, stat, value)
+        for player, stats in newer_increments.items():
+            for stat, value in stats.items():
+                self.increment(player, stat, value)
+        for player, columns in newer_timestamps.items():
+            for column in columns:
+                self.touch(player, column)
+
+    async def stop(self):
+        """주기 flush를 멈추고 남은 변경을 모두 기록합니다."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
 
 class Database:
     def __init__(self):
         self.pool = None
+        # 이벤트 기반 통계 갱신용 write-behind 버퍼
+        self.writer = StatWriteBuffer(self)
+        # !leaderboard 응답용 상위권 캐시 (아래 쓰기 경로에서 증분 갱신)
+        self.leaderboard = LeaderboardCache(self, ttl=Config.LEADERBOARD_CACHE_TTL)
+        # 만들어 둔 player_stat_history 월 파티션 (달이 바뀔 때만 확인)
+        self._history_months = set()
+        self._history_lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def _acquire(self, operation):
+        """풀에서 연결을 빌려 작업 시간과 연결 대기 시간을 기록합니다."""
+        start = time.perf_counter()
+        async with self.pool.acquire() as conn:
+            acquired = time.perf_counter()
+            DB_POOL_WAIT_SECONDS.observe(acquired - start)
+            try:
+                yield conn
+            finally:
+                DB_QUERY_SECONDS.labels(operation).observe(time.perf_counter() - acquired)
 
     async def connect(self):
         """데이터베이스 연결 풀을 생성합니다."""
         if not self.pool:
+            params = dict(
+                user=Config.DB_USER,
+                password=Config.DB_PASSWORD,
+                database=Config.DB_NAME,
+                host=Config.DB_HOST,
+                port=Config.DB_PORT
+            )
             try:
-                self.pool = await asyncpg.create_pool(
-                    user=Config.DB_USER,
-                    password=Config.DB_PASSWORD,
-                    database=Config.DB_NAME,
-                    host=Config.DB_HOST,
-                    port=Config.DB_PORT
-                )
-                print("Connected to Database (Async)")
+                # 조회/쓰기 SQL은 고정 문장이므로 커넥션마다 처음 쓸 때 한 번만 prepare됨 (접속 시 미리 준비하지 않음)
+                self.pool = await asyncpg.create_pool(**params)
+                log.info("Connected to database (async)")
+                self.writer.start()
             except Exception as e:
-                print(f"Database Connection Error: {e}")
+                log.error("Database connection error: %s", e)
                 raise e
 
     async def close(self):
         """데이터베이스 연결을 종료합니다."""
         if self.pool:
+            await self.writer.stop()
             await self.pool.close()
-            print("Database Connection Closed")
+            log.info("Database connection closed")
+
+    async def _create_schema(self, conn):
+        # 기존 테이블 삭제 및 재생성 방지
+        # queries = ["DROP TABLE IF EXISTS player_stats;"] 
+        for query in SCHEMA_QUERIES:
+            await conn.execute(query)
+        await self._ensure_history_partitions(conn, datetime.datetime.now())
+
+    async def _ensure_history_partitions(self, conn, at):
+        """at이 속한 달과 다음 달의 파티션을 만들고, 보관 기간(STAT_HISTORY_MONTHS)이 지난 기록을 삭제합니다."""
+        month = at.date().replace(day=1)
+        if month in self._history_months:
+            return
+        async with self._history_lock:
+            if month in self._history_months:
+                return
+            for start in (month, _add_months(month, 1)):
+                await conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS player_stat_history_{start:%Y%m} PARTITION OF player_stat_history "
+                    f"FOR VALUES FROM ('{start}') TO ('{_add_months(start, 1)}');"
+                )
+            if Config.STAT_HISTORY_MONTHS > 0:
+                # 오래된 기록은 DELETE 대신 월 파티션을 통째로 삭제 (테이블 팽창/VACUUM 부담 없음)
+                cutoff = f"player_stat_history_{_add_months(month, -Config.STAT_HISTORY_MONTHS):%Y%m}"
+                rows = await conn.fetch(
+                    "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                    "WHERE i.inhparent = 'player_stat_history'::regclass;"
+                )
+                for row in rows:
+                    if row['relname'] < cutoff:
+                        await conn.execute(f'DROP TABLE IF EXISTS "{row["relname"]}";')
+                        log.info("Dropped expired stat history partition %s", row['relname'])
+                await conn.execute(
+                    "DELETE FROM player_stat_rollups WHERE period = 'day' AND period_start < $1;",
+                    _add_months(month, -Config.STAT_HISTORY_MONTHS),
+                )
+            self._history_months.add(month)
 
     async def init_db(self):
         """데이터베이스 테이블을 초기화합니다 (기존 데이터 삭제)."""
         if not self.pool:
             await self.connect()
 
-        # 기존 테이블 삭제 및 재생성 방지
-        # queries = ["DROP TABLE IF EXISTS player_stats;"] 
-        queries = [
-            """
-            CREATE TABLE IF NOT EXISTS player_stats (
-                player_name VARCHAR(50) PRIMARY KEY,
-                kills INT DEFAULT 0,
-                deaths INT DEFAULT 0,
-                blocks_broken INT DEFAULT 0,
-                playtime BIGINT DEFAULT 0,
-                last_login TIMESTAMP,
-                last_logout TIMESTAMP,
-                advancements INT DEFAULT 0,
-                diamonds_mined INT DEFAULT 0,
-                coal_mined INT DEFAULT 0,
-                iron_mined INT DEFAULT 0,
-                gold_mined INT DEFAULT 0,
-                emerald_mined INT DEFAULT 0,
-                lapis_mined INT DEFAULT 0,
-                redstone_mined INT DEFAULT 0,
-                netherite_mined INT DEFAULT 0,
-                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-            """
-        ]
-
-        async with self.pool.acquire() as conn:
-            for query in queries:
-                await conn.execute(query)
+        async with self._acquire("init_db") as conn:
+            await self._create_schema(conn)
         
-        print("Database initialized (Tables recreated)")
+        log.info("Database initialized (tables recreated)")
 
-    async def update_stat(self, player, stat_type, value=1):
-        """플레이어의 통계를 증가시킵니다."""
-        query = f"""
-        INSERT INTO player_stats (player_name, {stat_type}, last_updated)
-        VALUES ($1, $2, CURRENT_TIMESTAMP)
-        ON CONFLICT (player_name)
-        DO UPDATE SET {stat_type} = player_stats.{stat_type} + $2, last_updated = CURRENT_TIMESTAMP;
+    def set_stats(self, player, stats):
         """
-        async with self.pool.acquire() as conn:
-            await conn.execute(query, player, value)
+        통계 스냅샷(여러 컬럼의 절대값, 예: 퇴장 시 StatsReader 값)을 쓰기 버퍼에 설정합니다.
+        다른 변경과 함께 다음 flush의 MERGE 한 번으로 기록됩니다.
+        마지막으로 받은 스냅샷과 같고 그 뒤로 값을 바꾸는 변경이 없었으면 버퍼에 넣지 않습니다 (쿼리 없음).
+        버퍼에 넣었으면 True를 반환합니다.
+        """
+        if not stats or self.writer.snapshots.get(player) == stats:
+            return False
+        for stat, value in stats.items():
+            self.writer.set(player, stat, value)
+        self.writer.snapshots[player] = dict(stats)
+        return True
 
-    async def set_stat(self, player, stat_type, value):
-        """통계의 특정 값을 설정합니다 (절대값 업데이트)."""
-        query = f"""
-        INSERT INTO player_stats (player_name, {stat_type}, last_updated)
-        VALUES ($1, $2, CURRENT_TIMESTAMP)
-        ON CONFLICT (player_name)
-        DO UPDATE SET {stat_type} = $2, last_updated = CURRENT_TIMESTAMP;
+    async def apply_batch(self, increments=None, sets=None, timestamps=None):
         """
-        async with self.pool.acquire() as conn:
-            await conn.execute(query, player, value)
+        여러 플레이어의 통계 변경을 하나의 MERGE 문으로 한 번에 반영합니다.
+        increments: {player: {stat: 증가량}}, sets: {player: {stat: 절대값}},
+        timestamps: {player: {컬럼, ...}} (CURRENT_TIMESTAMP로 설정) 또는 {player: {컬럼: datetime}}
+        같은 컬럼에 set과 increment가 모두 있으면 set 이후 increment를 더합니다.
+        통계 값의 변화량은 같은 트랜잭션에서 player_stat_history와 일/주 집계에 함께 기록됩니다.
+        값이 그대로인 플레이어(예: 퇴장 시 바뀌지 않은 통계 파일 스냅샷)는 행을 다시 쓰지 않고 변화량도 남기지 않습니다.
+        """
+        merge = self._build_merge(increments or {}, sets or {}, timestamps or {})
+        if not merge:
+            return
+
+        query, args = merge
+        recorded_at = datetime.datetime.now()
+        history = self._build_history(increments or {}, sets or {}, recorded_at)
+        # 쓰기 버퍼를 거치지 않은 변경(통계 동기화, 재생)도 set_stats가 비교하는 스냅샷과 값을 다르게 만듦
+        self.writer.forget_snapshots(increments or {}, sets or {})
+        try:
+            async with self._acquire("apply_batch") as conn:
+                if history:
+                    await self._ensure_history_partitions(conn, recorded_at)
+                for attempt in range(2):
+                    try:
+                        async with conn.transaction():
+                            if history:
+                                await conn.execute(history[0], *history[1])
+                            await conn.execute(query, *args)
+                        break
+                    except asyncpg.UniqueViolationError:
+                        # 다른 커넥션이 같은 신규 플레이어를 먼저 INSERT한 경우: 다시 실행하면 MATCHED로 처리됨
+                        if attempt:
+                            raise
+        except Exception:
+            # 기록되지 않았을 수 있는 스냅샷은 다음에 같은 값이 와도 다시 기록
+            for player in sets or ():
+                self.writer.snapshots.pop(player, None)
+            raise
+
+        # set 이후 increment 순서로 캐시에 반영 (MERGE와 동일한 의미)
+        for player, stats in (sets or {}).items():
+            for stat, value in stats.items():
+                self.leaderboard.on_set(player, stat, value)
+        for player, stats in (increments or {}).items():
+            for stat, value in stats.items():
+                self.leaderboard.on_increment(player, stat, value)
+
+    def _build_merge(self, increments, sets, timestamps):
+        """apply_batch/record_backfill의 (MERGE_QUERY, 인자). 바뀌는 플레이어가 없으면 None."""
+        players = sorted(set(increments) | set(sets) | set(timestamps))
+        if not players:
+            return None
+        for changes in (*increments.values(), *sets.values()):
+            for col in changes:
+                if col not in STAT_COLUMNS:
+                    raise ValueError(f"Unknown stat column: {col}")
+        for columns in timestamps.values():
+            for col in columns:
+                if col not in TIMESTAMP_COLUMNS:
+                    raise ValueError(f"Unknown timestamp column: {col}")
+        return MERGE_QUERY, [players, *self._batch_arrays(players, increments, sets, timestamps)]
+
+    def _build_history(self, increments, sets, recorded_at):
+        """apply_batch가 반영할 통계 변화량 기록의 (HISTORY_QUERY, 인자). 통계 변경이 없으면 None."""
+        players = sorted(set(increments) | set(sets))
+        if not players:
+            return None
+        return HISTORY_QUERY, [recorded_at, players, *self._batch_arrays(players, increments, sets, {})]
+
+    def _batch_arrays(self, players, increments, sets, timestamps):
+        """_batch_source 순서의 컬럼별 배열 (플레이어 순서와 같음)."""
+        arrays = []
+        for col in STAT_COLUMNS:
+            arrays.append([increments.get(p, {}).get(col, 0) for p in players])
+            arrays.append([sets.get(p, {}).get(col) for p in players])
+        for col in TIMESTAMP_COLUMNS:
+            touched = [timestamps.get(p, ()) for p in players]
+            arrays.append([col in t for t in touched])
+            arrays.append([t.get(col) if isinstance(t, dict) else None for t in touched])
+        return arrays
 
-    async def update_timestamp(self, player, column):
-        """플레이어의 타임스탬프 컬럼을 업데이트합니다."""
-        query = f"""
-        INSERT INTO player_stats (player_name, {column}, last_updated)
-        VALUES ($1, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-        ON CONFLICT (player_name)
-        DO UPDATE SET {column} = CURRENT_TIMESTAMP, last_updated = CURRENT_TIMESTAMP;
+    async def record_live_ingest_start(self):
         """
-        async with self.pool.acquire() as conn:
-            await conn.execute(query, player)
+        봇이 로그를 실시간으로 반영하기 시작한 날을 처음 한 번만 기록합니다.
+        이 기록 이전부터 운영 중이었다면 가장 이른 접속 기록/변화량 기록(실시간 반영으로만 쓰임)의 날짜를 씁니다.
+        """
+        async with self._acquire("record_live_ingest_start") as conn:
+            await conn.execute(
+                """
+                INSERT INTO log_live_ingest (first_day)
+                SELECT LEAST(
+                    CURRENT_DATE,
+                    (SELECT MIN(started_at)::date FROM player_sessions),
+                    (SELECT MIN(recorded_at)::date FROM player_stat_history)
+                )
+                ON CONFLICT (id) DO NOTHING;
+                """
+            )
+
+    async def get_live_ingest_start(self):
+        """봇이 로그를 실시간으로 반영하기 시작한 날 (date). 기록이 없으면 None."""
+        async with self._acquire("get_live_ingest_start") as conn:
+            return await conn.fetchval("SELECT first_day FROM log_live_ingest;")
+
+    async def get_backfilled_files(self):
+        """이미 백필된 로그 아카이브 파일명 집합을 반환합니다."""
+        async with self._acquire("get_backfilled_files") as conn:
+            rows = await conn.fetch("SELECT file_name FROM log_backfill;")
+            return {row['file_name'] for row in rows}
+
+    async def record_backfill(self, files, increments, timestamps):
+        """
+        백필 결과를 한 트랜잭션으로 반영합니다.
+        files: [(파일명, 이벤트 수)] - 같은 아카이브가 두 번 반영되지 않도록 함께 기록합니다.
+        지난 로그의 변화량이므로 변화량 기록(player_stat_history)과 일/주 집계에는 넣지 않습니다.
+        """
+        merge = self._build_merge(increments, {}, timestamps)
+        self.writer.forget_snapshots(increments, {})
+        async with self._acquire("record_backfill") as conn:
+            async with conn.transaction():
+                if merge:
+                    query, args = merge
+                    await conn.execute(query, *args)
+                await conn.executemany(
+                    "INSERT INTO log_backfill (file_name, events) VALUES ($1, $2) ON CONFLICT (file_name) DO NOTHING;",
+                    files
+                )
+
+    async def save_sessions(self, rows):
+        """
+        접속 기록을 한 번의 upsert로 기록합니다.
+        rows: [(플레이어, 시작 시각, 종료 시각, 종료 사유)] - 접속 중인 세션은 종료 시각/사유가 None이며, 끝나면 같은 행을 갱신합니다.
+        """
+        if not rows:
+            return
+        players, started, ended, reasons = (list(column) for column in zip(*rows))
+        async with self._acquire("save_sessions") as conn:
+            await conn.execute(
+                """
+                INSERT INTO player_sessions (player_name, started_at, ended_at, end_reason)
+                SELECT * FROM unnest($1::varchar[], $2::timestamp[], $3::timestamp[], $4::varchar[])
+                ON CONFLICT (player_name, started_at)
+                DO UPDATE SET ended_at = EXCLUDED.ended_at, end_reason = EXCLUDED.end_reason;
+                """,
+                players, started, ended, reasons,
+            )
+
+    async def get_open_sessions(self):
+        """아직 끝나지 않은 접속 기록 [(플레이어, 시작 시각)]을 반환합니다 (봇 재시작 시 이어서 추적)."""
+        async with self._acquire("get_open_sessions") as conn:
+            rows = await conn.fetch("SELECT player_name, started_at FROM player_sessions WHERE ended_at IS NULL;")
+        return [(row['player_name'], row['started_at']) for row in rows]
+
+    async def get_player_sessions(self, player, limit=10):
+        """플레이어의 최근 접속 기록을 최신순으로 반환합니다. 각 행의 total은 전체 기록 수입니다."""
+        async with self._acquire("get_player_sessions") as conn:
+            rows = await conn.fetch(
+                """
+                SELECT started_at, ended_at, end_reason, COUNT(*) OVER () AS total
+                FROM player_sessions
+                WHERE player_name = $1
+                ORDER BY started_at DESC
+                LIMIT $2;
+                """,
+                player, limit,
+            )
+        return [dict(row) for row in rows]
 
     async def get_top_players(self, stat_type, limit=10):
         """특정 통계의 상위 플레이어 목록을 가져옵니다."""
-        query = f"""
-        SELECT player_name, {stat_type} 
-        FROM player_stats 
-        ORDER BY {stat_type} DESC 
-        LIMIT $1;
-        """
-        async with self.pool.acquire() as conn:
-            rows = await conn.fetch(query, limit)
+        key = statement_key("get_top_players", stat_type)
+        async with self._acquire("get_top_players") as conn:
+            rows = await conn.fetch(STATEMENTS[key], limit)
             return [dict(row) for row in rows]
 
+    async def get_period_leaderboard(self, stat_type, period, page=1, page_size=10):
+        """이번 주 / 오늘(period: "week" / "day")의 증가량 랭킹을 일/주 집계에서 가져옵니다."""
+        key = statement_key("get_period_page", stat_type)
+        async with self._acquire("get_period_leaderboard") as conn:
+            rows = await conn.fetch(STATEMENTS[key], period, period_start(period), page_size, (page - 1) * page_size)
+        return [dict(row) for row in rows]
+
+    async def get_leaderboard_page(self, stat_type, page, page_size=10, after=None):
+        """
+        랭킹의 page번째 페이지(1부터)를 가져옵니다.
+        after=(값, 이름)은 앞 페이지의 마지막 행으로, 주면 그 행 다음부터 키셋으로 page_size행만 읽으므로
+        페이지 깊이와 무관하고 그 사이 순위가 바뀌어도 앞 페이지와 겹치거나 빠지는 행이 없습니다.
+        없으면 OFFSET으로 앞 행을 모두 건너뜁니다. !lb는 커서 없는 페이지 중 LeaderboardCache 깊이 안의 것은
+        캐시에서 응답하므로, OFFSET은 그보다 깊은 페이지로 바로 건너뛸 때만 쓰입니다.
+        """
+        async with self._acquire("get_leaderboard_page") as conn:
+            if after is not None:
+                value, name = after
+                rows = await conn.fetch(STATEMENTS[statement_key("get_page_after", stat_type)], value, name, page_size)
+            else:
+                rows = await conn.fetch(
+                    STATEMENTS[statement_key("get_page_offset", stat_type)], page_size, (page - 1) * page_size
+                )
+        return [dict(row) for row in rows]
+
+    async def get_player_rank(self, player, stat_type):
+        """
+        플레이어의 (순위, 값)을 반환합니다. 기록이 없으면 None.
+        캐시된 상위권(LeaderboardCache) 안이면 메모리에서 응답하고, 아니면 랭킹 인덱스로 앞 행 수를 셉니다 (비용은 순위에 비례).
+        """
+        key = statement_key("get_player_rank", stat_type)
+        cached = await self.leaderboard.get_rank(player, stat_type)
+        if cached is not None:
+            return cached
+        async with self._acquire("get_player_rank") as conn:
+            row = await conn.fetchrow(STATEMENTS[key], player)
+        if row is None:
+            return None
+        return row['rank'], row['value']
+
     async def get_player_stat(self, player, stat_type):
         """특정 플레이어의 특정 통계 값을 가져옵니다."""
-        query = f"SELECT {stat_type} FROM player_stats WHERE player_name = $1;"
-        async with self.pool.acquire() as conn:
-            val = await conn.fetchval(query, player)
+        key = statement_key("get_player_stat", stat_type)
+        async with self._acquire("get_player_stat") as conn:
+            val = await conn.fetchval(STATEMENTS[key], player)
             return val if val is not None else 0
 
 db = Database()
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import threading
+import time
+
+from .metrics import EVENT_BUS_LAG_SECONDS
+
+log = logging.getLogger(__name__)
+
+
+class EventBus:
+    """
+    로그 파서 스레드에서 이벤트 루프로 로그 이벤트를 넘기는 버스입니다.
+    - 대기 중이거나 처리 중인 이벤트가 maxsize개이면 publish()가 자리가 날 때까지 파서 스레드를 멈춥니다 (backpressure).
+    - 고정된 수의 작업자 코루틴이 이벤트를 처리하며, 같은 키(플레이어)의 이벤트는 들어온 순서대로 처리됩니다.
+      PvP 사망처럼 키가 여러 개인 이벤트는 관련된 모든 플레이어의 앞선 이벤트가 끝난 뒤 처리됩니다.
+    """
+
+    def __init__(self, handler, keys=None, workers=8, maxsize=1000):
+        # handler(event_type, data): 이벤트를 처리하는 코루틴 함수
+        self.handler = handler
+        # keys(event_type, data): 순서를 보장할 키 목록 (보통 관련 플레이어 이름)
+        self.keys = keys or (lambda event_type, data: ())
+        self.workers = workers
+        self.maxsize = maxsize
+        self._slots = threading.Semaphore(maxsize)
+        self._closed = False
+        self._loop = None
+        self._queue = None
+        self._tasks = []
+        # 키 -> 그 키의 마지막 이벤트가 끝나면 완료되는 Future
+        self._tails = {}
+        self._pending = 0
+        self.published = 0
+        self.processed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.blocked_publishes = 0
+        self.blocked_seconds = 0.0
+        self.max_depth = 0
+        self.lag_last = None
+        self.lag_max = 0.0
+        self._lag_total = 0.0
+
+    def start(self):
+        """현재 이벤트 루프에서 작업자를 시작합니다."""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    def publish(self, event_type, data):
+        """
+        이벤트를 넣습니다 (파서 스레드에서 호출). 가득 차 있으면 자리가 날 때까지 기다리며,
+        버스가 닫혀서 넣지 못하면 False를 반환합니다.
+        """
+        if not self._slots.acquire(blocking=False):
+            self.blocked_publishes += 1
+            start = time.monotonic()
+            while not self._slots.acquire(timeout=1):
+                if self._closed:
+                    self.dropped += 1
+                    return False
+            self.blocked_seconds += time.monotonic() - start
+        if self._closed:
+            self._slots.release()
+            self.dropped += 1
+            return False
+        self.published += 1
+        self._loop.call_soon_threadsafe(self._enqueue, event_type, data, time.monotonic())
+        return True
+
+    def _enqueue(self, event_type, data, published_at):
+        # 이벤트 루프에서 들어온 순서대로 실행되므로 키별 선후 관계가 여기서 정해짐
+        keys = set(self.keys(event_type, data))
+        waits = {self._tails[key] for key in keys if key in self._tails}
+        done = self._loop.create_future()
+        for key in keys:
+            self._tails[key] = done
+        self._queue.put_nowait((event_type, data, published_at, waits, done, keys))
+        self._pending += 1
+        self.max_depth = max(self.max_depth, self._pending)
+
+    async def _work(self):
+        while True:
+            event_type, data, published_at, waits, done, keys = await self._queue.get()
+            try:
+                if waits:
+                    await asyncio.wait(waits)
+                lag = time.monotonic() - published_at
+                self.lag_last = lag
+                self.lag_max = max(self.lag_max, lag)
+                self._lag_total += lag
+                EVENT_BUS_LAG_SECONDS.observe(lag)
+                await self.handler(event_type, data)
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                log.exception("Event handler failed (%s): %s", event_type, e)
+            finally:
+                done.set_result(None)
+                for key in keys:
+                    if self._tails.get(key) is done:
+                        del self._tails[key]
+                self._pending -= 1
+                self._slots.release()
+                self._queue.task_done()
+
+    async def stop(self, timeout=5):
+        """새 이벤트를 받지 않고, 남은 이벤트를 timeout초 동안 처리한 뒤 작업자를 종료합니다."""
+        self._closed = True
+        if not self._queue:
+            return
+        # 이미 call_soon_threadsafe로 넘어온 이벤트가 큐에 들어가도록 한 번 양보
+        await asyncio.sleep(0)
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            log.warning("Event bus stopped with %d unprocessed events", self._pending)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self):
+        handled = self.processed + self.failed
+        return {
+            "depth": self._pending,
+            "max_depth": self.max_depth,
+            "capacity": self.maxsize,
+            "workers": self.workers,
+            "published": self.published,
+            "processed": self.processed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "blocked_publishes": self.blocked_publishes,
+            "blocked_seconds": round(self.blocked_seconds, 3),
+            "lag_ms_last": round(self.lag_last * 1000, 1) if self.lag_last is not None else None,
+            "lag_ms_avg": round(self._lag_total / handled * 1000, 1) if handled else None,
+            "lag_ms_max": round(self.lag_max * 1000, 1),
+        }
@@ -0,0 +1,36 @@
+import datetime
+
+from .db import db
+from .sessions import sessions
+
+
+async def record_event(event_type, data):
+    """로그 이벤트를 player_stats 변경으로 변환하여 DB 쓰기 버퍼에 넣습니다."""
+    if event_type == 'login':
+        sessions.on_login(data['player'], data.get('at') or datetime.datetime.now())
+        db.writer.touch(data['player'], "last_login")
+
+    elif event_type == 'logout':
+        player = data['player']
+        # 마지막 반영 이후의 접속 시간을 playtime에 더하고 세션을 닫음
+        sessions.on_logout(player, data.get('at') or datetime.datetime.now())
+        db.writer.touch(player, "last_logout")
+
+        # 퇴장 직전에 저장된 통계 파일 스냅샷 (play_time 포함)이 정확한 값:
+        # 쓰기 버퍼에 쌓인 증가분 뒤에 적용되도록 버퍼로 설정하고, 다른 변경과 함께 변화량 기록까지 한 번에 반영
+        # (지난번 스냅샷과 같으면 버퍼에 넣지 않음)
+        db.set_stats(player, data.get('mined_stats'))
+
+    elif event_type == 'advancement':
+        db.writer.increment(data['player'], "advancements")
+
+    elif event_type == 'death':
+        db.writer.increment(data['victim'], "deaths")
+        if data['is_pvp'] and data['killer']:
+            db.writer.increment(data['killer'], "kills")
+
+    elif event_type == 'server_stop':
+        sessions.on_server_stop(data.get('at') or datetime.datetime.now())
+
+    elif event_type == 'server_start':
+        sessions.on_server_start(data.get('at') or datetime.datetime.now())
@@ -0,0 +1,78 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+
+# <sys/inotify.h> 이벤트 마스크
+IN_MODIFY = 0x00000002
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class Inotify:
+    """libc의 inotify를 ctypes로 감싼 최소한의 래퍼입니다 (Linux 전용)."""
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        try:
+            self._libc = ctypes.CDLL(libc_name, use_errno=True)
+            init1 = self._libc.inotify_init1
+        except (OSError, AttributeError) as e:
+            raise OSError(f"inotify를 사용할 수 없습니다: {e}")
+
+        self.fd = init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1 실패: {os.strerror(errno)}")
+
+        self._poller = select.poll()
+        self._poller.register(self.fd, select.POLLIN)
+
+    def add_watch(self, path, mask):
+        """경로에 watch를 추가하고 watch descriptor를 반환합니다."""
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_add_watch 실패 ({path}): {os.strerror(errno)}")
+        return wd
+
+    def rm_watch(self, wd):
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self, timeout=None):
+        """
+        이벤트가 올 때까지 최대 timeout초 대기한 뒤 (wd, mask, name) 목록을 반환합니다.
+        타임아웃이면 빈 목록을 반환합니다.
+        """
+        timeout_ms = None if timeout is None else int(timeout * 1000)
+        if not self._poller.poll(timeout_ms):
+            return []
+
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        pos = 0
+        while pos + _EVENT_HEADER.size <= len(buf):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buf, pos)
+            pos += _EVENT_HEADER.size
+            name = buf[pos:pos + length].rstrip(b"\0").decode("utf-8", errors="ignore")
+            pos += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
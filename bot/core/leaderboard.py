@@ -0,0 +1,134 @@
+import heapq
+import time
+
+
+class _Board:
+    """
+    한 통계의 상위권 스냅샷입니다.
+    values에는 정확한 값을 아는 플레이어만 들어 있고, 그 밖의 플레이어 값은
+    floor + outside[플레이어] 이하임이 보장됩니다.
+    """
+
+    def __init__(self, rows, stat, depth):
+        self.values = {row['player_name']: row[stat] or 0 for row in rows}
+        # 테이블 전체가 depth보다 작으면 모든 플레이어를 알고 있는 상태
+        self.complete = len(rows) < depth
+        self.floor = 0 if self.complete else (rows[-1][stat] or 0)
+        # 불러오지 않은 플레이어 중 값이 floor와 같은 플레이어는 이름이 이보다 뒤 (동점은 이름순)
+        self.floor_name = rows[-1]['player_name'] if rows else ""
+        self.outside = {}
+        self.loaded_at = time.monotonic()
+
+    def increment(self, player, delta):
+        if player in self.values:
+            self.values[player] += delta
+        elif self.complete:
+            # 모든 플레이어를 알고 있으므로 새 플레이어는 0부터 시작
+            self.values[player] = delta
+        else:
+            self.outside[player] = self.outside.get(player, 0) + delta
+
+    def set(self, player, value):
+        if self.complete or value >= self.floor or player in self.values:
+            self.values[player] = value
+            self.outside.pop(player, None)
+        else:
+            # floor 아래의 값은 순위를 확정할 수 없으므로 상한만 기록
+            self.outside[player] = value - self.floor
+
+    def top(self, size):
+        return heapq.nsmallest(size, self.values.items(), key=lambda item: (-item[1], item[0]))
+
+    def is_valid(self, size):
+        """values만으로 상위 size명을 확정할 수 있는지 확인합니다."""
+        top = self.top(size)
+        if self.complete:
+            return True
+        if len(top) < size:
+            return False
+        nth_name, nth_value = top[-1]
+        # 값이 바뀌지 않은 바깥 플레이어는 floor 이하이므로 size번째가 그보다 뒤로 밀렸으면 앞설 수 있음
+        # (values의 플레이어를 floor 아래로 설정한 경우)
+        if (nth_value, self.floor_name) < (self.floor, nth_name):
+            return False
+        # 값이 바뀐 바깥 플레이어의 상한이 size번째 값 이상이면 순위가 바뀌었을 수 있음
+        return not self.outside or self.floor + max(self.outside.values()) < nth_value
+
+
+class LeaderboardCache:
+    """
+    통계별 상위 N명을 메모리에 유지하여 !leaderboard(depth 안의 페이지)와 상위권의 !rank를 DB 조회 없이 응답합니다.
+    Database의 통계 쓰기 경로에서 변경을 증분 반영하고, TTL이 지나면 DB에서 다시 불러와 맞춥니다.
+    """
+
+    def __init__(self, database, size=10, depth=50, ttl=300):
+        self.db = database
+        self.size = size
+        # 순위 변동에 대비해 표시 인원보다 여유 있게 보관
+        self.depth = depth
+        self.ttl = ttl
+        self._boards = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get_top(self, stat, limit=None):
+        """상위 플레이어 목록을 get_top_players와 같은 형식([{player_name, stat}])으로 반환합니다."""
+        limit = limit or self.size
+        board = self._boards.get(stat)
+        if (board is None or limit > self.depth
+                or time.monotonic() - board.loaded_at > self.ttl
+                or not board.is_valid(limit)):
+            self.misses += 1
+            rows = await self.db.get_top_players(stat, max(self.depth, limit))
+            board = _Board(rows, stat, max(self.depth, limit))
+            self._boards[stat] = board
+        else:
+            self.hits += 1
+
+        return [{"player_name": player, stat: value} for player, value in board.top(limit)]
+
+    async def get_page(self, stat, page, page_size=None):
+        """
+        page번째 페이지(1부터)를 반환합니다. page * page_size가 depth 이하인 페이지만 요청하세요
+        (그보다 깊으면 매번 DB에서 다시 불러옵니다).
+        """
+        page_size = page_size or self.size
+        rows = await self.get_top(stat, page * page_size)
+        return rows[(page - 1) * page_size:]
+
+    async def get_rank(self, player, stat):
+        """
+        캐시된 상위권 안에서 확정할 수 있는 플레이어의 (순위, 값)을 반환합니다.
+        상위권 밖이거나 바깥 플레이어가 앞설 수 있어 순위를 확정할 수 없으면 None (DB에서 계산).
+        """
+        await self.get_top(stat)
+        board = self._boards[stat]
+        for rank, (name, value) in enumerate(board.top(len(board.values)), 1):
+            if name == player:
+                return (rank, value) if board.is_valid(rank) else None
+        return None
+
+    def on_increment(self, player, stat, delta):
+        board = self._boards.get(stat)
+        if board:
+            board.increment(player, delta)
+
+    def on_set(self, player, stat, value):
+        board = self._boards.get(stat)
+        if board:
+            board.set(player, value)
+
+    def invalidate(self, stat=None):
+        if stat:
+            self._boards.pop(stat, None)
+        else:
+            self._boards.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else None,
+            "cached_stats": sorted(self._boards),
+        }
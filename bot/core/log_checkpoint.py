@@ -0,0 +1,116 @@
+import datetime
+import hashlib
+import json
+import logging
+import os
+import time
+
+log = logging.getLogger(__name__)
+
+# 로테이션된 아카이브와 대조하기 위해 파일 앞부분을 지문으로 저장
+FINGERPRINT_SIZE = 256
+
+
+def fingerprint(head):
+    """파일 앞부분(최대 FINGERPRINT_SIZE 바이트)의 해시를 반환합니다."""
+    return hashlib.sha1(head[:FINGERPRINT_SIZE]).hexdigest()
+
+
+class LogCheckpoint:
+    """
+    LogParser가 어디까지 처리했는지 (inode, 바이트 오프셋)를 파일에 기록합니다.
+    매 라인마다 쓰지 않고, 일정 라인 수 또는 시간이 지났을 때만 fsync하여 저장합니다.
+    """
+
+    def __init__(self, path, save_every_lines=500, save_every_seconds=5.0):
+        self.path = path
+        self.save_every_lines = save_every_lines
+        self.save_every_seconds = save_every_seconds
+        self.state = None
+        self._dirty = False
+        self._pending_lines = 0
+        self._last_save = time.monotonic()
+
+    def load(self):
+        """저장된 체크포인트를 읽습니다. 없거나 손상되었으면 None을 반환합니다."""
+        try:
+            with open(self.path, "r") as f:
+                state = json.load(f)
+            if not all(k in state for k in ("inode", "offset", "head", "head_size", "saved_at")):
+                raise ValueError("missing keys")
+            self.state = state
+            return state
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log.warning("Ignoring unreadable log checkpoint %s: %s", self.path, e)
+            return None
+
+    def update(self, inode, offset, head, lines=0):
+        """메모리상의 체크포인트를 갱신하고, 주기가 되었으면 디스크에 저장합니다."""
+        self.state = {
+            "inode": inode,
+            "offset": offset,
+            "head": fingerprint(head),
+            "head_size": min(len(head), FINGERPRINT_SIZE),
+            "saved_at": time.time(),
+        }
+        self._dirty = True
+        self._pending_lines += lines
+        self.maybe_save()
+
+    def maybe_save(self):
+        if not self._dirty:
+            return
+        if (self._pending_lines >= self.save_every_lines
+                or time.monotonic() - self._last_save >= self.save_every_seconds):
+            self.save()
+
+    def save(self):
+        """임시 파일에 쓰고 fsync 후 rename하여 원자적으로 저장합니다."""
+        if self.state is None or not self._dirty:
+            return
+
+        tmp_path = f"{self.path}.tmp"
+        try:
+            directory = os.path.dirname(self.path) or "."
+            os.makedirs(directory, exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(self.state, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+            dir_fd = os.open(directory, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError as e:
+            log.error("Failed to save log checkpoint: %s", e)
+        finally:
+            self._dirty = False
+            self._pending_lines = 0
+            self._last_save = time.monotonic()
+
+    def quarantine(self, events):
+        """
+        반영하지 못하고 건너뛰는 재생 이벤트를 체크포인트 옆 파일(<path>.failed.jsonl)에 한 줄씩 덧붙여 보관합니다.
+        나중에 원인을 확인하고 직접 반영할 수 있도록 하며, 저장한 파일 경로(실패하면 None)를 반환합니다.
+        """
+        path = f"{self.path}.failed.jsonl"
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "a") as f:
+                for event_type, data in events:
+                    f.write(json.dumps({"type": event_type, "data": data}, ensure_ascii=False, default=_json_default) + "\n")
+            return path
+        except OSError as e:
+            log.error("Failed to save %d skipped replay events to %s: %s", len(events), path, e)
+            return None
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return str(value)
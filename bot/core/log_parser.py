@@ -1,122 +1,566 @@
+import datetime
+import gzip
+import logging
 import time
 import re
 import os
+from .inotify import (
+    Inotify, IN_MODIFY, IN_CREATE, IN_MOVED_TO, IN_MOVE_SELF, IN_DELETE_SELF, IN_Q_OVERFLOW,
+)
+from .log_checkpoint import FINGERPRINT_SIZE, fingerprint
+from .metrics import LOG_MATCH_SECONDS, MATCH_SAMPLE_EVERY
+from .player_index import PlayerIndex
 from .stats_reader import StatsReader
 
+log = logging.getLogger(__name__)
+
+# 한 번의 read()로 가져올 최대 바이트 수
+READ_CHUNK_SIZE = 64 * 1024
+# 폴링 모드에서 EOF 도달 시 대기 시간 (초)
+POLL_INTERVAL = 0.1
+# inotify 모드에서 이벤트가 없을 때 파일을 직접 점검하는 주기 (초)
+INOTIFY_SAFETY_INTERVAL = 2.0
+# 재생한 이벤트 반영에 실패했을 때 다시 시도하기까지의 대기 시간 (초, 실패할 때마다 두 배)
+REPLAY_RETRY_MIN = 1.0
+REPLAY_RETRY_MAX = 60.0
+# 재생한 이벤트 반영을 시도할 최대 횟수. 모두 실패하면 이벤트를 격리 파일에 남기고 건너뛰어 실시간 추적을 시작합니다.
+REPLAY_MAX_ATTEMPTS = 5
+
+ADVANCEMENT_VERBS = ["made the advancement", "reached the goal", "completed the challenge"]
+DEATH_REASONS = [
+    "was slain by", "was pricked to death", "walked into a cactus", "burned to death", "drowned",
+    "fell from a high place", "tried to swim in lava", "blew up", "was shot by", "withered away",
+    "died", "was killed by", "starved to death", "suffocated in a wall", "was squashed by a falling anvil",
+    "fell out of the world", "fell from a high place", "experienced kinetic energy", "was struck by lightning",
+    "discovered the floor was lava", "was impaled", "froze to death", "was stung to death", "hit the ground too hard",
+]
+
+# Regex Patterns
+PATTERNS = {
+    'login': re.compile(r': (\w+) joined the game'),
+    'logout': re.compile(r': (\w+) left the game'),
+    'advancement': re.compile(r': (\w+) has (?:' + '|'.join(ADVANCEMENT_VERBS) + r') \[(.+?)\]'),
+    'death': re.compile(r': (.+?) (' + '|'.join(DEATH_REASONS) + r') ?(.*)'),
+    # 서버 종료 / 시작 완료 (채팅 등으로 흉내낼 수 없도록 메시지 전체를 고정)
+    'server_stop': re.compile(r'^: Stopping (?:the )?server$'),
+    'server_start': re.compile(r'^: Done \([\d.,]+s\)! For help'),
+}
+
+# 로그 라인 앞의 시각 [HH:MM:SS]
+LINE_TIME_PATTERN = re.compile(r'^\[(\d{2}):(\d{2}):(\d{2})')
+# 접속 시간 계산에 라인 시각이 필요한 이벤트
+TIMED_EVENTS = ("login", "logout", "server_stop", "server_start")
+
+# 사전 필터: 각 패턴이 매치되려면 반드시 포함해야 하는 문구를 한 번의 스캔으로 찾습니다.
+# 대부분의 라인(채팅, 플러그인 로그 등)은 여기서 바로 걸러집니다.
+# 공백을 그룹 밖에 두어야 re 엔진이 리터럴 접두사 스캔을 사용할 수 있습니다.
+TRIGGER_PATTERN = re.compile(
+    r' (?:(?P<login>joined the game)'
+    r'|(?P<logout>left the game)'
+    r'|(?P<advancement>has (?:' + '|'.join(ADVANCEMENT_VERBS) + r') \[)'
+    r'|(?P<death>' + '|'.join(DEATH_REASONS) + r')'
+    r'|(?P<server_stop>Stopping (?:the )?server)'
+    r'|(?P<server_start>Done \())'
+)
+
+# 로테이션된 로그 파일명: YYYY-MM-DD-N.log.gz
+ARCHIVE_NAME_PATTERN = re.compile(r'^(\d{4}-\d{2}-\d{2})-(\d+)\.log\.gz$')
+# 아카이브 재생 중 라인 시각이 이보다 더 거꾸로 가면 자정을 넘긴 것으로 봄 (초 단위 절삭 등의 오차 허용)
+ARCHIVE_CLOCK_TOLERANCE = datetime.timedelta(minutes=1)
+
+
+def line_time(line, now=None, day=None):
+    """
+    로그 라인의 시각(HH:MM:SS)을 datetime으로 바꿉니다. 로그에는 날짜가 없으므로 오늘 날짜를 쓰고,
+    그 결과가 미래이면 (자정 직전 라인을 자정 이후에 재생하는 경우) 전날로 봅니다. 시각이 없으면 now.
+    day(로테이션된 아카이브의 날짜)가 주어지면 그 날의 시각을 그대로 반환하며, 시각이 없으면 None입니다.
+    """
+    match = LINE_TIME_PATTERN.match(line)
+    if day is not None:
+        if not match:
+            return None
+        return datetime.datetime.combine(day, datetime.time(*(int(g) for g in match.groups())))
+    now = now or datetime.datetime.now()
+    if not match:
+        return now
+    hour, minute, second = (int(g) for g in match.groups())
+    at = now.replace(hour=hour, minute=minute, second=second, microsecond=0)
+    if at - now > datetime.timedelta(minutes=1):
+        at -= datetime.timedelta(days=1)
+    return at
+
+
+def archive_day(name):
+    """로테이션된 로그 파일명의 날짜 (date). 형식이 다르면 None."""
+    match = ARCHIVE_NAME_PATTERN.match(os.path.basename(name))
+    if not match:
+        return None
+    return datetime.date.fromisoformat(match.group(1))
+
+
+class ArchiveClock:
+    """
+    로테이션된 아카이브 라인의 날짜를 추적합니다. 로그에는 시각만 있으므로 파일명의 날짜에서 시작하고,
+    라인 시각이 ARCHIVE_CLOCK_TOLERANCE보다 더 거꾸로 가면 자정을 넘긴 것으로 보고 다음 날로 넘깁니다.
+    실시간 재생(LogParser)과 백필(backfill.py)이 같은 이벤트를 같은 시각으로 보도록 함께 씁니다.
+    """
+
+    def __init__(self, day, previous=None):
+        self.day = day
+        self.previous = previous
+
+    def at(self, line):
+        """라인의 시각 (datetime). 시각이 없는 라인은 마지막 라인 시각 (처음이면 None)."""
+        at = line_time(line, day=self.day)
+        if at is None:
+            return self.previous
+        if self.previous is not None and at < self.previous - ARCHIVE_CLOCK_TOLERANCE:
+            self.day += datetime.timedelta(days=1)
+            at += datetime.timedelta(days=1)
+        self.previous = at
+        return at
+
+
+def archive_sort_key(name):
+    """로테이션된 로그 파일을 시간 순으로 정렬하기 위한 키 (2024-01-01-10이 -2보다 뒤)."""
+    match = ARCHIVE_NAME_PATTERN.match(os.path.basename(name))
+    if not match:
+        return (os.path.basename(name), 0)
+    return (match.group(1), int(match.group(2)))
+
+
 class LogParser:
-    def __init__(self, log_path="/mc-logs/logs/latest.log", event_callback=None):
+    def __init__(self, log_path="/mc-logs/logs/latest.log", event_callback=None, tail_mode="auto",
+                 checkpoint=None, replay_callback=None):
         self.log_path = log_path
+        # "auto": inotify 우선, 실패 시 폴링 / "poll": 항상 폴링
+        self.tail_mode = tail_mode
         self._running = False
+        self._fd = None
+        self._inode = None
+        self._buffer = b""
+        # 마지막으로 완성된 라인의 끝 위치 (바이트)
+        self._read_offset = 0
+        self._head = b""
         self.event_callback = event_callback
+        # 재시작 시 놓친 로그를 재생하기 위한 체크포인트 (LogCheckpoint)
+        self.checkpoint = checkpoint
+        # 재생된 이벤트 목록을 한 번에 전달받는 콜백. 없으면 event_callback으로 하나씩 전달
+        self.replay_callback = replay_callback
+        self._replay_events = None
+        # 아카이브 재생 중인 라인의 날짜 (ArchiveClock, latest.log를 읽을 때는 None)
+        self._archive_clock = None
+        # 처리한 라인 수 / 이벤트 종류별 개수 (/metrics에서 읽음)
+        self.lines_processed = 0
+        self.event_counts = {}
+        # 반영에 실패하여 격리하고 건너뛴 재생 이벤트 수
+        self.replay_skipped = 0
         self.stats_reader = StatsReader()
-        self.known_players = set()
+        self.known_players = PlayerIndex()
+        # usercache가 다시 로드될 때마다 새 이름을 인덱스에 반영 (uuid_map과 같은 원본)
+        self.stats_reader.usercache.add_listener(self.known_players.update)
         
         # Regex Patterns
-        self.patterns = {
-            'login': re.compile(r': (\w+) joined the game'),
-            'logout': re.compile(r': (\w+) left the game'),
-            'advancement': re.compile(r': (\w+) has (?:made the advancement|reached the goal|completed the challenge) \[(.+?)\]'),
-            'death': re.compile(r': (.+?) (was slain by|was pricked to death|walked into a cactus|burned to death|drowned|fell from a high place|tried to swim in lava|blew up|was shot by|withered away|died|was killed by|starved to death|suffocated in a wall|was squashed by a falling anvil|fell out of the world|fell from a high place|experienced kinetic energy|was struck by lightning|discovered the floor was lava|was impaled|froze to death|was stung to death|hit the ground too hard) ?(.*)'),
-        }
+        self.patterns = PATTERNS
+        self.trigger_pattern = TRIGGER_PATTERN
 
-    def follow(self):
-        """로그 파일에서 새로운 라인을 생성하는 제너레이터입니다. 파일 로테이션을 처리합니다."""
-        self.log_file.seek(0, os.SEEK_END)
-        
-        # 현재 파일의 inode 저장
+    def _open_log(self):
+        """로그 파일을 바이너리로 열고 inode를 기록합니다."""
+        self._fd = os.open(self.log_path, os.O_RDONLY)
+        self._inode = os.fstat(self._fd).st_ino
+        self._buffer = b""
+        self._read_offset = 0
+        self._head = os.pread(self._fd, FINGERPRINT_SIZE, 0)
+
+    def tail_lag_bytes(self):
+        """latest.log에 쓰였지만 아직 처리하지 않은 바이트 수."""
         try:
-            current_inode = os.fstat(self.log_file.fileno()).st_ino
-        except Exception as e:
-            print(f"[ERROR] Failed to get inode: {e}")
+            return max(0, os.fstat(self._fd).st_size - self._read_offset)
+        except (OSError, TypeError):
+            return 0
+
+    def _close_log(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _read_lines(self):
+        """현재 위치부터 EOF까지 큰 청크 단위로 읽어 완성된 라인 목록을 반환합니다."""
+        # 밀린 로그가 많을 때 bytes를 이어 붙이면 매번 전체를 복사하므로 청크를 모아 한 번에 합침
+        chunks = [self._buffer]
+        while True:
+            chunk = os.read(self._fd, READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        data = b"".join(chunks)
+
+        if not data:
+            return []
+
+        # 마지막 조각은 아직 개행이 쓰이지 않은 미완성 라인일 수 있으므로 보관
+        *complete, self._buffer = data.split(b"\n")
+        self._read_offset += len(data) - len(self._buffer)
+        return [line.decode("utf-8", errors="ignore") for line in complete]
+
+    def _rotated(self):
+        """log_path가 현재 열린 파일과 다른 inode를 가리키면 True (로테이션)."""
+        try:
+            return os.stat(self.log_path).st_ino != self._inode
+        except FileNotFoundError:
+            # 로테이션 도중 새 파일이 아직 생성되지 않음
+            return False
+
+    def _reopen(self):
+        """기존 파일의 남은 내용을 모두 읽은 뒤 새 로그 파일을 처음부터 엽니다."""
+        lines = []
+        if self._fd is not None:
+            lines = self._read_lines()
+            if self._buffer:
+                lines.append(self._buffer.decode("utf-8", errors="ignore"))
+
+        log.info("Log rotation detected. Reopening %s...", self.log_path)
+        self._close_log()
+        try:
+            self._open_log()
+        except FileNotFoundError:
+            # 다음 이벤트/점검에서 다시 시도
+            self._inode = None
+        return lines
+
+    def _reopen_and_commit(self):
+        lines = self._reopen()
+        yield from lines
+        self._commit_offset(len(lines))
+
+    def _commit_offset(self, lines=0):
+        """처리가 끝난 위치까지 체크포인트를 갱신합니다 (디스크 저장은 주기적으로)."""
+        if not self.checkpoint or self._fd is None:
             return
+        if len(self._head) < FINGERPRINT_SIZE:
+            self._head = os.pread(self._fd, FINGERPRINT_SIZE, 0)
+        self.checkpoint.update(self._inode, self._read_offset, self._head, lines)
+
+    def _find_archives_since(self, state):
+        """
+        체크포인트 이후 로테이션된 아카이브(logs/*.log.gz)를 찾아 (경로, 건너뛸 바이트) 목록을 반환합니다.
+        체크포인트 당시 파일은 앞부분 지문으로 찾아 처리한 위치부터, 그 이후 아카이브는 처음부터 재생합니다.
+        """
+        log_dir = os.path.dirname(self.log_path) or "."
+        candidates = []
+        for entry in os.scandir(log_dir):
+            if entry.name.endswith(".log.gz") and entry.stat().st_mtime >= state["saved_at"] - 1:
+                candidates.append(entry.path)
+        candidates.sort(key=archive_sort_key)
+
+        for i, path in enumerate(candidates):
+            try:
+                with gzip.open(path, "rb") as f:
+                    head = f.read(state["head_size"])
+            except (OSError, EOFError) as e:
+                log.warning("Failed to read archive %s: %s", path, e)
+                continue
+            if fingerprint(head) == state["head"]:
+                return [(path, state["offset"])] + [(p, 0) for p in candidates[i + 1:]]
+
+        log.warning("Archived log for the last checkpoint not found. Events before rotation are lost.")
+        return []
+
+    def _read_archive(self, path, skip=0):
+        with gzip.open(path, "rb") as f:
+            if skip:
+                f.seek(skip)
+            for raw in f:
+                yield raw.rstrip(b"\n").decode("utf-8", errors="ignore")
+
+    def _resume(self):
+        """
+        체크포인트 위치부터 봇이 꺼져 있던 동안 쌓인 로그를 재생합니다.
+        체크포인트가 없으면 기존처럼 파일 끝에서 시작합니다.
+        """
+        state = self.checkpoint.load() if self.checkpoint else None
+        if state is None:
+            self._read_offset = os.lseek(self._fd, 0, os.SEEK_END)
+            self._commit_offset()
+            return
+
+        same_file = (
+            state["inode"] == self._inode
+            and fingerprint(self._head[:state["head_size"]]) == state["head"]
+            and state["offset"] <= os.fstat(self._fd).st_size
+        )
+        if same_file:
+            archives = []
+            self._read_offset = os.lseek(self._fd, state["offset"], os.SEEK_SET)
+        else:
+            log.info("%s was rotated while the bot was down. Searching archives...", self.log_path)
+            archives = self._find_archives_since(state)
+
+        events = self._replay_events = []
+        try:
+            for path, skip in archives:
+                log.info("Replaying %s from byte %d...", os.path.basename(path), skip)
+                self._start_archive_clock(path, state["saved_at"] if skip else None)
+                for line in self._read_archive(path, skip):
+                    self.process_line(line)
+            # latest.log는 하루 단위로 로테이션되므로 오늘 날짜 기준 (line_time)
+            self._archive_clock = None
+            for line in self._read_lines():
+                self.process_line(line)
+        finally:
+            self._replay_events = None
+            self._archive_clock = None
+
+        log.info("Replayed %d events missed while the bot was down.", len(events))
+        if events and not self._deliver_replay(events):
+            # 반영 전에 종료됨: 체크포인트를 그대로 두어 다음 시작 때 다시 재생
+            return
+
+        self._commit_offset()
+        self.checkpoint.save()
+
+    def _start_archive_clock(self, path, saved_at=None):
+        """
+        아카이브 라인의 날짜를 파일명의 날짜에서 시작합니다. 중간부터 재생하면(saved_at) 건너뛴 부분에서
+        이미 자정을 넘겼을 수 있으므로 체크포인트를 저장한 시각을 마지막 라인 시각으로 둡니다.
+        """
+        if saved_at is not None:
+            previous = datetime.datetime.fromtimestamp(saved_at).replace(microsecond=0)
+            self._archive_clock = ArchiveClock(previous.date(), previous)
+        else:
+            self._archive_clock = ArchiveClock(archive_day(path) or datetime.date.today())
+
+    def _deliver_replay(self, events):
+        """
+        재생된 이벤트를 전달합니다. replay_callback이 실패하면 체크포인트를 옮기지 않은 채 backoff로
+        REPLAY_MAX_ATTEMPTS번까지 다시 시도합니다. 그래도 실패하면 (같은 이벤트가 재시작할 때마다 다시 실패하여
+        실시간 추적이 막히지 않도록) 이벤트를 체크포인트 옆 파일에 격리하고 건너뜁니다.
+        체크포인트를 옮겨도 되면 True, 반영 전에 파서가 멈추면 False를 반환합니다.
+        """
+        if not self.replay_callback:
+            if self.event_callback:
+                for event_type, data in events:
+                    self.event_callback(event_type, data)
+            return True
+
+        delay = REPLAY_RETRY_MIN
+        for attempt in range(1, REPLAY_MAX_ATTEMPTS + 1):
+            try:
+                self.replay_callback(events)
+                return True
+            except Exception as e:
+                if not self._running:
+                    log.error("Failed to apply %d replayed events before shutdown: %s", len(events), e)
+                    return False
+                if attempt == REPLAY_MAX_ATTEMPTS:
+                    saved_to = self.checkpoint.quarantine(events) if self.checkpoint else None
+                    log.critical(
+                        "Giving up on %d replayed events after %d attempts (%s). They are NOT in the database; "
+                        "skipping them so live tailing can start. Saved to %s",
+                        len(events), attempt, e, saved_to or "nowhere",
+                    )
+                    self.replay_skipped += len(events)
+                    return True
+                log.error("Failed to apply %d replayed events (attempt %d/%d), retrying in %.1fs: %s",
+                          len(events), attempt, REPLAY_MAX_ATTEMPTS, delay, e)
+            time.sleep(delay)
+            delay = min(delay * 2, REPLAY_RETRY_MAX)
 
+    def follow(self):
+        """로그 파일에서 새로운 라인을 생성하는 제너레이터입니다. 파일 로테이션을 처리합니다."""
+        if self.tail_mode != "poll":
+            try:
+                inotify = Inotify()
+            except OSError as e:
+                log.warning("inotify unavailable (%s). Falling back to polling.", e)
+            else:
+                yield from self._follow_inotify(inotify)
+                return
+
+        yield from self._follow_poll()
+
+    def _follow_poll(self):
+        """inotify를 쓸 수 없는 파일시스템을 위한 폴링 방식 추적입니다."""
+        log.info("Tailing log file by polling.")
         while self._running:
-            line = self.log_file.readline()
-            if not line:
-                # EOF 도달 시 파일 로테이션 확인
-                try:
-                    if os.path.exists(self.log_path):
-                        new_inode = os.stat(self.log_path).st_ino
-                        if new_inode != current_inode:
-                            print(f"[INFO] Log rotation detected. Reopening {self.log_path}...")
-                            self.log_file.close()
-                            self.log_file = open(self.log_path, "r", encoding="utf-8", errors='ignore')
-                            current_inode = new_inode
-                            # 새 파일의 처음부터 읽기 시작
-                            continue
-                except Exception as e:
-                    print(f"[ERROR] Error checking for log rotation: {e}")
-                
-                time.sleep(0.1)
+            if self._fd is None:
+                if self._rotated():
+                    yield from self._reopen_and_commit()
+                else:
+                    time.sleep(POLL_INTERVAL)
                 continue
-            yield line
+
+            lines = self._read_lines()
+            if lines:
+                yield from lines
+                self._commit_offset(len(lines))
+                continue
+
+            # EOF 도달 시 파일 로테이션 확인
+            if self._rotated():
+                yield from self._reopen_and_commit()
+                continue
+
+            if self.checkpoint:
+                self.checkpoint.maybe_save()
+            time.sleep(POLL_INTERVAL)
+
+    def _follow_inotify(self, inotify):
+        """logs 디렉토리의 inotify 이벤트로 깨어나 변경분만 읽는 추적 방식입니다."""
+        log_dir = os.path.dirname(self.log_path) or "."
+        log_name = os.path.basename(self.log_path)
+
+        try:
+            dir_wd = inotify.add_watch(log_dir, IN_MODIFY | IN_CREATE | IN_MOVED_TO)
+            file_wd = inotify.add_watch(self.log_path, IN_MOVE_SELF | IN_DELETE_SELF)
+        except OSError as e:
+            log.warning("inotify watch failed (%s). Falling back to polling.", e)
+            inotify.close()
+            yield from self._follow_poll()
+            return
+
+        log.info("Tailing log file with inotify.")
+        try:
+            while self._running:
+                events = inotify.read_events(timeout=INOTIFY_SAFETY_INTERVAL)
+
+                modified = False
+                rotated = False
+                for wd, mask, name in events:
+                    if mask & IN_Q_OVERFLOW:
+                        modified = rotated = True
+                    elif wd == dir_wd and name == log_name:
+                        if mask & (IN_CREATE | IN_MOVED_TO):
+                            rotated = True
+                        elif mask & IN_MODIFY:
+                            modified = True
+                    elif wd == file_wd and mask & (IN_MOVE_SELF | IN_DELETE_SELF):
+                        # 기존 파일이 이동됨: 남은 내용만 읽고 새 파일 생성(IN_CREATE)을 기다림
+                        modified = True
+
+                if not events:
+                    # 일부 bind mount는 이벤트를 전달하지 않으므로 타임아웃마다 한 번씩 점검
+                    modified = True
+                    rotated = self._rotated()
+
+                if modified and self._fd is not None:
+                    lines = self._read_lines()
+                    yield from lines
+                    self._commit_offset(len(lines))
+
+                if rotated and self._rotated():
+                    yield from self._reopen_and_commit()
+                    if self._fd is not None:
+                        try:
+                            inotify.rm_watch(file_wd)
+                            file_wd = inotify.add_watch(self.log_path, IN_MOVE_SELF | IN_DELETE_SELF)
+                        except OSError as e:
+                            log.warning("Failed to re-watch %s: %s", self.log_path, e)
+
+                if not events and self.checkpoint:
+                    self.checkpoint.maybe_save()
+        finally:
+            inotify.close()
 
     def start(self):
-        print(f"Starting Log Parser on {self.log_path}...")
+        log.info("Starting log parser on %s...", self.log_path)
         self._running = True
         
         # Load initial players from usercache
         self.stats_reader.load_usercache()
-        self.known_players.update(self.stats_reader.uuid_map.keys())
-        print(f"[INFO] Loaded {len(self.known_players)} players from usercache.")
+        log.info("Loaded %d players from usercache.", len(self.known_players))
         
         # Wait for file to exist
         while not os.path.exists(self.log_path):
-            print(f"Waiting for log file: {self.log_path}")
+            log.info("Waiting for log file: %s", self.log_path)
             time.sleep(5)
 
         try:
-            with open(self.log_path, "r", encoding="utf-8", errors='ignore') as f:
-                self.log_file = f # Assign the opened file object
-                for line in self.follow():
-                    if not self._running: break
-                    self.process_line(line)
+            self._open_log()
+            self._resume()
+            for line in self.follow():
+                if not self._running: break
+                self.process_line(line)
         except Exception as e:
-            print(f"Log Parser Error: {e}")
+            log.exception("Log parser error: %s", e)
+        finally:
+            if self.checkpoint:
+                self.checkpoint.save()
+            self._close_log()
+
+    def _emit(self, event_type, data):
+        self.event_counts[event_type] = self.event_counts.get(event_type, 0) + 1
+        # 재생 중에는 모아서 한 번에 전달
+        if self._replay_events is not None:
+            self._replay_events.append((event_type, data))
+        elif self.event_callback:
+            self.event_callback(event_type, data)
 
     def process_line(self, line):
+        self.lines_processed += 1
+        # 아카이브 재생 중에는 이벤트가 아닌 라인의 시각으로도 자정을 넘겼는지 추적
+        archive_at = self._archive_clock.at(line) if self._archive_clock is not None else None
+        if self.lines_processed % MATCH_SAMPLE_EVERY:
+            event = self.parse_line(line)
+        else:
+            start = time.perf_counter()
+            event = self.parse_line(line)
+            LOG_MATCH_SECONDS.observe(time.perf_counter() - start)
+        if not event:
+            return
+
+        event_type, data = event
+        if event_type == "logout":
+            player = data["player"]
+            
+            # 광물 채굴 통계 업데이트
+            mined_stats = self.stats_reader.get_mined_counts(player)
+            log.debug("Logout detected for %s, stats: %s", player, mined_stats)
+            data["mined_stats"] = mined_stats
+
+        if event_type in TIMED_EVENTS:
+            # 재생된 이벤트도 실제 발생 시각으로 접속 기록을 남기도록 라인의 시각을 붙임
+            data["at"] = archive_at or line_time(line)
+
+        self._emit(event_type, data)
+
+    def parse_line(self, line):
+        """로그 한 줄을 파싱하여 (이벤트 종류, 데이터)를 반환합니다. 이벤트가 아니면 None."""
         # 메시지 내용을 추출하기 위한 기본 파싱
         # 로그 형식: [Time] [Thread/Level]: Message
         parts = line.split(']: ', 1)
         if len(parts) < 2:
-            return
+            return None
         
         message = ": " + parts[1].strip() # 정규식 일관성을 위해 콜론 추가
+
+        # 이벤트 문구가 하나도 없으면 개별 패턴을 돌리지 않음
+        first = self.trigger_pattern.search(message)
+        if not first:
+            return None
+        triggers = {m.lastgroup for m in self.trigger_pattern.finditer(message, first.start())}
         
         # 1. 로그인
-        match = self.patterns['login'].search(message)
+        match = 'login' in triggers and self.patterns['login'].search(message)
         if match:
             player = match.group(1)
             self.known_players.add(player)
-            if self.event_callback:
-                self.event_callback("login", {"player": player})
-            return
+            return "login", {"player": player}
 
         # 2. 로그아웃
-        match = self.patterns['logout'].search(message)
+        match = 'logout' in triggers and self.patterns['logout'].search(message)
         if match:
-            player = match.group(1)
-            
-            # 광물 채굴 통계 업데이트
-            print(f"[DEBUG] Logout detected for {player}. Fetching stats...")
-            mined_stats = self.stats_reader.get_mined_counts(player)
-            print(f"[DEBUG] Stats for {player}: {mined_stats}")
-            
-            if self.event_callback:
-                self.event_callback("logout", {"player": player, "mined_stats": mined_stats})
-            return
+            return "logout", {"player": match.group(1)}
 
         # 3. 발전 과제
-        match = self.patterns['advancement'].search(message)
+        match = 'advancement' in triggers and self.patterns['advancement'].search(message)
         if match:
             player = match.group(1)
             advancement = match.group(2)
-            if self.event_callback:
-                self.event_callback("advancement", {"player": player, "advancement": advancement})
-            return
+            return "advancement", {"player": player, "advancement": advancement}
 
         # 4. 사망
-        match = self.patterns['death'].search(message)
+        match = 'death' in triggers and self.patterns['death'].search(message)
         if match:
             victim = match.group(1)
             reason_part = match.group(2)
@@ -127,23 +571,24 @@ class LogParser:
             
             # 킬러가 플레이어인지 확인 (known_players 목록 대조)
             if "was slain by" in reason_part and killer_part:
-                clean_killer_part = killer_part.strip()
-                for player in self.known_players:
-                    # "Alex" 또는 "Alex using [Sword]" 형태 확인
-                    if clean_killer_part == player or clean_killer_part.startswith(f"{player} "):
-                        is_pvp = True
-                        killer = player
-                        break
+                # "Alex" 또는 "Alex using [Sword]" 형태 확인
+                killer = self.known_players.match_prefix(killer_part.strip())
+                is_pvp = killer is not None
             
-            if self.event_callback:
-                self.event_callback("death", {
-                    "victim": victim, 
-                    "killer": killer, 
-                    "is_pvp": is_pvp, 
-                    "reason": f"{reason_part} {killer_part}".strip()
-                })
-            return
+            return "death", {
+                "victim": victim, 
+                "killer": killer, 
+                "is_pvp": is_pvp, 
+                "reason": f"{reason_part} {killer_part}".strip()
+            }
+
+        # 5. 서버 종료 / 시작
+        if 'server_stop' in triggers and self.patterns['server_stop'].search(message):
+            return "server_stop", {}
+        if 'server_start' in triggers and self.patterns['server_start'].search(message):
+            return "server_start", {}
+
+        return None
 
     def stop(self):
         self._running = False
-        self._running = False
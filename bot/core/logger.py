@@ -0,0 +1,81 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+
+from .config import Config
+
+TEXT_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+_traceback_formatter = logging.Formatter()
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄에 JSON 객체 하나 (ts, level, logger, msg, 예외가 있으면 exc)."""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # 호출한 스레드에서는 메시지 인자만 합침 (인자 객체가 나중에 바뀌어도 안전).
+        # 예외는 exc_text로 넘겨 리스너 쪽 포맷터가 텍스트 / JSON에 맞게 붙임
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _traceback_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+
+def setup_logging(level=None, fmt=None, stream=None):
+    """
+    루트 로거를 큐 기반으로 설정합니다. 이벤트 루프나 로그 파서 스레드는 레코드를 큐에 넣기만 하고,
+    포맷과 출력(write)은 QueueListener 스레드가 합니다. 레벨보다 낮은 로그는 메시지를 만들지도 않습니다.
+    이미 설정되어 있으면 레벨만 바꿉니다.
+    """
+    global _listener
+    level = level or Config.LOG_LEVEL
+    root = logging.getLogger()
+    root.setLevel(level)
+    # discord.py의 DEBUG 로그(게이트웨이 패킷)는 너무 많으므로 INFO 이상만
+    logging.getLogger("discord").setLevel(max(root.level, logging.INFO))
+    if _listener:
+        return _listener
+
+    handler = logging.StreamHandler(stream or sys.stdout)
+    if (fmt or Config.LOG_FORMAT) == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    root.handlers[:] = [_QueueHandler(log_queue)]
+    _listener = logging.handlers.QueueListener(log_queue, handler)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    """큐에 남은 로그를 모두 출력하고 리스너 스레드를 종료합니다."""
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
+        logging.getLogger().handlers.clear()
@@ -0,0 +1,85 @@
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# 봇 자체 지표 (FastAPI /metrics, prometheus.yml의 bot 작업이 수집)
+# 라인마다 호출되는 경로에서는 정수만 증가시키고 BotCollector가 스크랩 시점에 읽어 갑니다.
+
+# 정규식 매칭 시간은 MATCH_SAMPLE_EVERY 라인마다 한 번만 측정
+MATCH_SAMPLE_EVERY = 64
+
+LOG_MATCH_SECONDS = Histogram(
+    "mcbot_log_match_seconds", f"parse_line time per log line (sampled 1/{MATCH_SAMPLE_EVERY})",
+    buckets=(1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 1e-3, 1e-2),
+)
+DB_QUERY_SECONDS = Histogram(
+    "mcbot_db_query_seconds", "Database operation latency (after a pool connection is acquired)", ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+DB_POOL_WAIT_SECONDS = Histogram(
+    "mcbot_db_pool_wait_seconds", "Time spent waiting for a database pool connection",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5),
+)
+RCON_COMMAND_SECONDS = Histogram(
+    "mcbot_rcon_command_seconds", "RCON round trip (single command, or a whole bulk call)", ["mode"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+RCON_ERRORS = Counter("mcbot_rcon_errors_total", "Failed RCON commands", ["reason"])
+CHART_RENDER_SECONDS = Histogram(
+    "mcbot_chart_render_seconds", "Chart render latency", ["path"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60),
+)
+DISCORD_SEND_SECONDS = Histogram(
+    "mcbot_discord_send_seconds", "Discord channel.send latency",
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 1, 2, 5, 10),
+)
+DISCORD_SEND_ERRORS = Counter("mcbot_discord_send_errors_total", "Failed Discord sends")
+EVENT_BUS_LAG_SECONDS = Histogram(
+    "mcbot_event_bus_lag_seconds", "Time from parser publish to handler start",
+    buckets=(0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+
+
+class BotCollector:
+    """스크랩할 때 각 컴포넌트의 현재 상태를 읽어 지표로 내보냅니다."""
+
+    def __init__(self):
+        self.log_parser = None
+        self.event_bus = None
+        self.notifier = None
+        self.chart_cache = None
+
+    def collect(self):
+        if self.log_parser:
+            yield CounterMetricFamily(
+                "mcbot_log_lines", "Log lines processed by the parser", value=self.log_parser.lines_processed
+            )
+            yield GaugeMetricFamily(
+                "mcbot_log_tail_lag_bytes", "Bytes written to latest.log but not yet parsed",
+                value=self.log_parser.tail_lag_bytes(),
+            )
+            events = CounterMetricFamily("mcbot_log_events", "Log events emitted by the parser", labels=["event_type"])
+            for event_type, count in list(self.log_parser.event_counts.items()):
+                events.add_metric([event_type], count)
+            yield events
+            yield CounterMetricFamily(
+                "mcbot_log_replay_skipped_events", "Replayed events skipped after the database kept rejecting them",
+                value=self.log_parser.replay_skipped,
+            )
+        if self.event_bus:
+            yield GaugeMetricFamily("mcbot_event_bus_depth", "Events queued or in progress", value=self.event_bus.stats()["depth"])
+        if self.notifier:
+            yield GaugeMetricFamily("mcbot_notifier_pending", "Notifications waiting to be sent", value=self.notifier.stats()["pending"])
+        if self.chart_cache:
+            lookups = CounterMetricFamily("mcbot_chart_cache_lookups", "Chart cache lookups by result", labels=["result"])
+            for result in ("hits", "misses", "coalesced"):
+                lookups.add_metric([result], getattr(self.chart_cache, result))
+            yield lookups
+
+
+collector = BotCollector()
+REGISTRY.register(collector)
+
+
+def render_metrics():
+    """/metrics 응답 (본문, Content-Type)."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+import discord
+
+from .metrics import DISCORD_SEND_ERRORS, DISCORD_SEND_SECONDS
+
+log = logging.getLogger(__name__)
+
+# 디스코드 메시지 최대 길이
+MAX_MESSAGE_LENGTH = 2000
+
+
+class Notifier:
+    """
+    디스코드 알림 발송기입니다. 이벤트 처리 코루틴은 notify()로 메시지를 넣기만 하고 전송을 기다리지 않습니다.
+    - 채널마다 발송 작업자 하나가 순서대로 보내며, 짧은 시간(window) 안에 쌓인 메시지는 한 메시지로 합칩니다.
+      같은 group의 알림(예: 퇴장)이 여러 개면 group 포맷터로 "5명이 서버에서 나갔습니다" 같은 한 줄로 요약합니다.
+    - 채널별 전송 예산(rate회 / per초, 디스코드 채널 제한)을 넘지 않도록 기다렸다 보내고, 기다리는 동안 들어온 메시지도 합칩니다.
+    - 디스코드 연결이 끊겨 있으면 다시 연결될 때까지 보관합니다 (채널별 최대 max_pending개, 넘으면 오래된 것부터 버림).
+    """
+
+    def __init__(self, bot, window=0.5, rate=5, per=5.0, max_pending=500):
+        self.bot = bot
+        self.window = window
+        self.rate = rate
+        self.per = per
+        self.max_pending = max_pending
+        self.online = asyncio.Event()
+        # group 이름 -> 항목 목록을 한 줄로 만드는 함수
+        self.groups = {}
+        # 채널 ID -> 채널 객체 (한 번만 조회)
+        self._channels = {}
+        # 채널 ID -> 대기 중인 (group, 내용) deque / 발송 작업자 / 최근 전송 시각
+        self._pending = {}
+        self._workers = {}
+        self._sent_at = {}
+        self._wakeups = {}
+        self._closed = False
+        self.queued = 0
+        self.sent = 0
+        self.merged = 0
+        self.dropped = 0
+        self.send_errors = 0
+        self.throttled_seconds = 0.0
+        self.send_seconds_total = 0.0
+        self.last_send_seconds = None
+
+    def add_group(self, name, formatter):
+        """formatter(items): 같은 group으로 합쳐진 항목 목록(2개 이상)을 메시지 한 줄로 만듭니다."""
+        self.groups[name] = formatter
+
+    def set_online(self, online):
+        if online:
+            self.online.set()
+        else:
+            self.online.clear()
+
+    def notify(self, channel_id, text, group=None, item=None):
+        """
+        메시지를 채널 큐에 넣습니다 (기다리지 않음).
+        group을 주면 같은 시간 안의 같은 group 알림을 모아 item 목록으로 요약합니다 (하나뿐이면 text 그대로).
+        """
+        if self._closed:
+            return
+        pending = self._pending.get(channel_id)
+        if pending is None:
+            pending = self._pending[channel_id] = deque()
+            self._wakeups[channel_id] = asyncio.Event()
+            self._workers[channel_id] = asyncio.create_task(self._run(channel_id))
+        if len(pending) >= self.max_pending:
+            pending.popleft()
+            self.dropped += 1
+        pending.append((group, text, item))
+        self.queued += 1
+        self._wakeups[channel_id].set()
+
+    async def get_channel(self, channel_id):
+        channel = self._channels.get(channel_id)
+        if channel is None:
+            channel = self.bot.get_channel(channel_id) or await self.bot.fetch_channel(channel_id)
+            self._channels[channel_id] = channel
+        return channel
+
+    def _compose(self, batch):
+        """대기 중인 알림들을 순서를 유지하며 group별로 합친 뒤, 길이 제한에 맞춰 메시지로 나눕니다."""
+        lines = []
+        grouped = {}
+        for group, text, item in batch:
+            if group is None:
+                lines.append(text)
+            elif group in grouped:
+                grouped[group][1].append(item)
+            else:
+                # 처음 나온 위치에 요약 줄을 둠
+                grouped[group] = (len(lines), [item], text)
+                lines.append(None)
+        for group, (index, items, text) in grouped.items():
+            lines[index] = text if len(items) == 1 else self.groups[group](items)
+
+        messages = []
+        current = ""
+        for line in lines:
+            line = line[:MAX_MESSAGE_LENGTH]
+            if current and len(current) + 1 + len(line) > MAX_MESSAGE_LENGTH:
+                messages.append(current)
+                current = line
+            else:
+                current = f"{current}\n{line}" if current else line
+        if current:
+            messages.append(current)
+        return messages
+
+    async def _wait_for_budget(self, channel_id):
+        # 최근 per초 안에 rate번 보냈으면 가장 오래된 전송이 창 밖으로 나갈 때까지 대기
+        sent_at = self._sent_at.setdefault(channel_id, deque())
+        while sent_at and time.monotonic() - sent_at[0] >= self.per:
+            sent_at.popleft()
+        if len(sent_at) >= self.rate:
+            delay = self.per - (time.monotonic() - sent_at[0])
+            if delay > 0:
+                self.throttled_seconds += delay
+                await asyncio.sleep(delay)
+            sent_at.popleft()
+
+    async def _run(self, channel_id):
+        pending = self._pending[channel_id]
+        wakeup = self._wakeups[channel_id]
+        while True:
+            if not pending:
+                if self._closed:
+                    return
+                wakeup.clear()
+                await wakeup.wait()
+                continue
+            await self.online.wait()
+            # 첫 알림 뒤 잠시 기다려 몰려오는 알림(대량 퇴장 등)을 함께 보냄
+            if not self._closed:
+                await asyncio.sleep(self.window)
+            await self._wait_for_budget(channel_id)
+
+            batch = list(pending)
+            pending.clear()
+            try:
+                channel = await self.get_channel(channel_id)
+            except discord.HTTPException as e:
+                log.error("Notification channel %s unavailable, dropping %d messages: %s", channel_id, len(batch), e)
+                self.dropped += len(batch)
+                continue
+
+            messages = self._compose(batch)
+            # 따로 보내지 않고 다른 알림과 합쳐진 수
+            self.merged += len(batch) - len(messages)
+            for i, message in enumerate(messages):
+                if i:
+                    await self._wait_for_budget(channel_id)
+                start = time.perf_counter()
+                try:
+                    await channel.send(message)
+                except (discord.Forbidden, discord.NotFound) as e:
+                    log.error("Cannot send notification to %s: %s", channel_id, e)
+                    self.send_errors += 1
+                    DISCORD_SEND_ERRORS.inc()
+                    self._channels.pop(channel_id, None)
+                    break
+                except Exception as e:
+                    # 일시적인 오류: 남은 메시지를 앞에 되돌려 놓고 잠시 뒤 다시 시도
+                    log.warning("Notification send failed (%s), retrying: %s", channel_id, e)
+                    self.send_errors += 1
+                    DISCORD_SEND_ERRORS.inc()
+                    pending.extendleft((None, text, None) for text in reversed(messages[i:]))
+                    await asyncio.sleep(self.per)
+                    break
+                finally:
+                    self._sent_at[channel_id].append(time.monotonic())
+                elapsed = time.perf_counter() - start
+                self.sent += 1
+                self.send_seconds_total += elapsed
+                self.last_send_seconds = elapsed
+                DISCORD_SEND_SECONDS.observe(elapsed)
+
+    async def stop(self, timeout=5):
+        """새 알림을 받지 않고, 연결되어 있으면 남은 알림을 timeout초 동안 보낸 뒤 종료합니다."""
+        self._closed = True
+        for wakeup in self._wakeups.values():
+            wakeup.set()
+        workers = list(self._workers.values())
+        if not workers:
+            return
+        if self.online.is_set():
+            await asyncio.wait(workers, timeout=timeout)
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    def stats(self):
+        return {
+            "pending": sum(len(pending) for pending in self._pending.values()),
+            "queued": self.queued,
+            "sent": self.sent,
+            "merged": self.merged,
+            "dropped": self.dropped,
+            "send_errors": self.send_errors,
+            "throttled_seconds": round(self.throttled_seconds, 3),
+            "send_ms_avg": round(self.send_seconds_total / self.sent * 1000, 1) if self.sent else None,
+            "send_ms_last": round(self.last_send_seconds * 1000, 1) if self.last_send_seconds is not None else None,
+        }
@@ -0,0 +1,63 @@
+import re
+
+from .config import Config
+
+# 마인크래프트 계정 이름 규칙 (영문/숫자/밑줄, 16자 이하, Floodgate(Bedrock) 플레이어는 접두사가 붙음).
+# 사망 패턴처럼 임의의 문자열을 잡는 패턴이 채팅 등에서 이름이 아닌 문자열을 넘길 수 있으므로 기록 전에 확인합니다.
+PLAYER_NAME_PATTERN = re.compile(rf'^(?:{re.escape(Config.FLOODGATE_PREFIX)})?[A-Za-z0-9_]{{1,16}}$')
+
+
+def is_player_name(name):
+    """name이 마인크래프트 계정 이름 형식인지 확인합니다."""
+    return bool(name) and PLAYER_NAME_PATTERN.match(name) is not None
+
+
+class PlayerIndex:
+    """
+    알려진 플레이어 이름 집합입니다.
+    첫 단어(공백 앞) 기준 인덱스를 함께 유지하여 "Alex using [Sword]" 같은 문자열에서
+    플레이어를 전체 목록 순회 없이 찾을 수 있습니다.
+    """
+
+    def __init__(self, names=()):
+        self._names = set()
+        # 첫 단어 -> 해당 단어로 시작하는 이름 목록 (긴 이름 우선)
+        self._by_first_token = {}
+        self.update(names)
+
+    def add(self, name):
+        if not name or name in self._names:
+            return
+        self._names.add(name)
+
+        token = name.split(" ", 1)[0]
+        bucket = self._by_first_token.get(token)
+        if bucket is None:
+            self._by_first_token[token] = [name]
+        else:
+            bucket.append(name)
+            bucket.sort(key=len, reverse=True)
+
+    def update(self, names):
+        for name in names:
+            self.add(name)
+
+    def match_prefix(self, text):
+        """text가 "이름" 또는 "이름 ..." 형태이면 해당 플레이어 이름을, 아니면 None을 반환합니다."""
+        candidates = self._by_first_token.get(text.split(" ", 1)[0])
+        if not candidates:
+            return None
+
+        for name in candidates:
+            if text == name or (text.startswith(name) and text[len(name)] == " "):
+                return name
+        return None
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
@@ -0,0 +1,251 @@
+import asyncio
+import io
+import math
+import re
+import time
+from datetime import timedelta, timezone
+
+from .render_cache import RenderError
+
+try:
+    import numpy as np
+    from matplotlib.figure import Figure
+    from matplotlib.ticker import FuncFormatter
+    import matplotlib.dates as mdates
+except ImportError:  # 선택 의존성: 없으면 항상 그라파나 렌더러 사용
+    np = None
+
+# 직접 그릴 수 있는 패널 종류 (그 밖의 stat, gauge, table 등은 렌더러 사용)
+NATIVE_PANEL_TYPES = {"timeseries", "graph"}
+# Prometheus query_range 응답의 시리즈당 최대 포인트 수
+MAX_POINTS = 11000
+# 그라파나 내장 변수 중 직접 치환할 수 있는 것 (대시보드 변수가 있으면 렌더러 사용)
+BUILTIN_VARIABLES = {"__interval", "__rate_interval", "__range"}
+VARIABLE_PATTERN = re.compile(r"\$\{(\w+)\}|\$(\w+)")
+LEGEND_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+RELATIVE_TIME_PATTERN = re.compile(r"^now(?:-(\d+)([smhdw]))?$")
+TIME_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+# 한국 표준시 (서머타임 없음, 컨테이너에 tzdata가 없어도 동작)
+KST = timezone(timedelta(hours=9), "KST")
+# 그라파나 기본 팔레트와 다크 테마 색상
+COLORS = ["#73BF69", "#F2CC0C", "#8AB8FF", "#FF780A", "#F2495C", "#5794F2", "#B877D9", "#705DA0", "#37872D", "#FADE2A"]
+BACKGROUND = "#181b1f"
+GRID = "#2c3235"
+TEXT = "#ccccdc"
+
+
+def available():
+    return np is not None
+
+
+def _is_prometheus(datasource):
+    # 데이터소스 미지정(기본값) 또는 Prometheus만 허용 ("-- Mixed --" 등 문자열 이름은 종류를 알 수 없음)
+    if datasource is None:
+        return True
+    if isinstance(datasource, dict):
+        return datasource.get("type", "prometheus") == "prometheus"
+    return False
+
+
+def panel_spec(panel):
+    """
+    대시보드 JSON의 패널에서 직접 그리는 데 필요한 정보를 추출합니다.
+    PromQL 쿼리만 쓰는 시계열 패널이 아니면 None을 반환합니다 (렌더러 사용).
+    """
+    if panel.get("type") not in NATIVE_PANEL_TYPES or panel.get("transformations"):
+        return None
+    if not _is_prometheus(panel.get("datasource")):
+        return None
+
+    queries = []
+    for target in panel.get("targets", []):
+        if target.get("hide"):
+            continue
+        expr = target.get("expr")
+        if not expr or not _is_prometheus(target.get("datasource")):
+            return None
+        for braced, plain in VARIABLE_PATTERN.findall(expr):
+            if (braced or plain) not in BUILTIN_VARIABLES:
+                return None
+        queries.append((expr, target.get("legendFormat", "")))
+    if not queries:
+        return None
+
+    defaults = panel.get("fieldConfig", {}).get("defaults", {})
+    return {
+        "title": panel.get("title", ""),
+        "unit": defaults.get("unit") or "",
+        "min": defaults.get("min"),
+        "max": defaults.get("max"),
+        "queries": queries,
+    }
+
+
+def parse_time(value, now):
+    """그라파나 상대 시간("now", "now-1h" 등)을 epoch 초로 변환합니다."""
+    match = RELATIVE_TIME_PATTERN.match(value)
+    if not match:
+        raise ValueError(f"unsupported time: {value}")
+    amount, unit = match.groups()
+    return now - int(amount) * TIME_UNITS[unit] if amount else now
+
+
+def query_step(start, end, scrape_interval):
+    """수집 주기 해상도로 조회하되 시리즈당 MAX_POINTS를 넘지 않는 step (초)."""
+    return max(scrape_interval, math.ceil((end - start) / MAX_POINTS))
+
+
+def expand_expr(expr, step, range_seconds, scrape_interval):
+    """그라파나 내장 변수를 조회 구간에 맞게 치환합니다."""
+    values = {
+        "__interval": f"{step}s",
+        # 그라파나와 같은 규칙: max(interval + scrape, 4 * scrape)
+        "__rate_interval": f"{max(step + scrape_interval, 4 * scrape_interval)}s",
+        "__range": f"{int(range_seconds)}s",
+    }
+    return VARIABLE_PATTERN.sub(lambda m: values[m.group(1) or m.group(2)], expr)
+
+
+def format_legend(legend_format, metric, expr):
+    if legend_format and legend_format != "__auto":
+        return LEGEND_PATTERN.sub(lambda m: metric.get(m.group(1), ""), legend_format)
+    labels = ", ".join(f'{k}="{v}"' for k, v in metric.items() if k != "__name__")
+    name = metric.get("__name__", "")
+    if name or labels:
+        return f"{name}{{{labels}}}" if labels else name
+    return expr
+
+
+def parse_matrix(result):
+    """query_range 결과(matrix)를 [(metric, 시각 배열, 값 배열)]로 변환합니다."""
+    series = []
+    for item in result:
+        values = item.get("values") or []
+        if not values:
+            continue
+        # [[ts, "값"], ...] -> (N, 2) float 배열 ("NaN", "+Inf" 포함 한 번에 변환)
+        arr = np.array(values, dtype=np.float64)
+        series.append((item.get("metric", {}), arr[:, 0], arr[:, 1]))
+    return series
+
+
+def downsample(ts, values, buckets):
+    """
+    포인트를 buckets개 구간으로 나눠 구간별 최소/최대값만 남깁니다 (픽셀 폭 기준).
+    step 간격으로 건너뛰어 조회하면 사라지는 짧은 TPS 급락 같은 값이 그대로 보입니다.
+    """
+    n = len(ts)
+    if n <= buckets * 2:
+        return ts, values
+    starts = np.linspace(0, n, buckets, endpoint=False).astype(np.intp)
+    ends = np.append(starts[1:], n) - 1
+    # fmin/fmax는 NaN을 무시 (구간 전체가 NaN이면 끊긴 구간으로 유지)
+    low = np.fmin.reduceat(values, starts)
+    high = np.fmax.reduceat(values, starts)
+    return np.column_stack((ts[starts], ts[ends])).ravel(), np.column_stack((low, high)).ravel()
+
+
+def insert_gaps(ts, values, step):
+    """수집되지 않은 구간(간격이 step의 2배 초과)에 NaN을 넣어 선을 끊습니다."""
+    if len(ts) < 2:
+        return ts, values
+    breaks = np.flatnonzero(np.diff(ts) > step * 2) + 1
+    if not len(breaks):
+        return ts, values
+    return np.insert(ts, breaks, ts[breaks - 1] + step), np.insert(values, breaks, np.nan)
+
+
+def format_value(value, unit):
+    if unit == "percent":
+        return f"{value:.0f}%"
+    if unit == "percentunit":
+        return f"{value * 100:.0f}%"
+    if unit in ("bytes", "decbytes"):
+        base = 1024 if unit == "bytes" else 1000
+        for suffix in ("B", "KB", "MB", "GB", "TB"):
+            if abs(value) < base:
+                return f"{value:.3g} {suffix}"
+            value /= base
+        return f"{value:.3g} PB"
+    if unit == "s":
+        return f"{value:.3g} s"
+    if unit == "ms":
+        return f"{value:.3g} ms"
+    if abs(value) >= 1000:
+        for suffix in ("K", "M", "B"):
+            value /= 1000
+            if abs(value) < 1000:
+                return f"{value:.3g}{suffix}"
+    return f"{value:.3g}"
+
+
+def draw_png(spec, series, start, end, width, height):
+    """
+    [(범례, 시각 배열, 값 배열)]을 그라파나 다크 테마와 비슷한 PNG로 그립니다.
+    pyplot 전역 상태를 쓰지 않으므로 스레드에서 호출해도 됩니다.
+    """
+    fig = Figure(figsize=(width / 100, height / 100), dpi=100, facecolor=BACKGROUND)
+    ax = fig.add_subplot()
+    ax.set_facecolor(BACKGROUND)
+    ax.set_title(spec["title"], color=TEXT, fontsize=11, loc="left")
+    for side in ax.spines.values():
+        side.set_visible(False)
+    ax.grid(color=GRID, linewidth=0.8)
+    ax.tick_params(colors=TEXT, labelsize=8, length=0)
+
+    for i, (label, ts, values) in enumerate(series):
+        # matplotlib 날짜 = 1970-01-01부터의 일 수
+        ax.plot(ts / 86400.0, values, color=COLORS[i % len(COLORS)], linewidth=1.2, label=label)
+    if not series:
+        ax.text(0.5, 0.5, "No data", color=TEXT, ha="center", va="center", transform=ax.transAxes)
+
+    ax.set_xlim(start / 86400.0, end / 86400.0)
+    ax.xaxis.set_major_formatter(mdates.DateFormatter("%m/%d %H:%M" if end - start > 86400 else "%H:%M", tz=KST))
+    ax.yaxis.set_major_formatter(FuncFormatter(lambda v, _: format_value(v, spec["unit"])))
+    if spec["min"] is not None or spec["max"] is not None:
+        ax.set_ylim(bottom=spec["min"], top=spec["max"])
+    if series and len(series) <= 10:
+        ax.legend(loc="upper center", bbox_to_anchor=(0.5, -0.07), ncol=min(len(series), 4), frameon=False,
+                  fontsize=8, labelcolor=TEXT)
+    # tight_layout은 그림을 한 번 더 그리므로 여백을 고정
+    fig.subplots_adjust(left=0.07, right=0.98, top=0.92, bottom=0.15 if series else 0.08)
+
+    buf = io.BytesIO()
+    # 디스코드 업로드용이므로 압축률보다 속도 우선
+    fig.savefig(buf, format="png", facecolor=BACKGROUND, pil_kwargs={"compress_level": 1})
+    return buf.getvalue()
+
+
+async def query_range(session, prometheus_url, expr, start, end, step):
+    """Prometheus /api/v1/query_range를 호출하여 matrix 결과를 반환합니다."""
+    params = {"query": expr, "start": f"{start:.3f}", "end": f"{end:.3f}", "step": str(step)}
+    async with session.get(f"{prometheus_url}/api/v1/query_range", params=params) as resp:
+        if resp.status != 200:
+            raise RenderError(resp.status, (await resp.text())[:200])
+        body = await resp.json()
+    if body.get("status") != "success":
+        raise RenderError(resp.status, body.get("error", ""))
+    return body["data"]["result"]
+
+
+async def render_panel(session, prometheus_url, spec, time_from, time_to, width, height, scrape_interval=15):
+    """패널의 PromQL 쿼리를 Prometheus에서 직접 조회하여 PNG bytes를 만듭니다."""
+    now = time.time()
+    start, end = parse_time(time_from, now), parse_time(time_to, now)
+    step = query_step(start, end, scrape_interval)
+    results = await asyncio.gather(*(
+        query_range(session, prometheus_url, expand_expr(expr, step, end - start, scrape_interval), start, end, step)
+        for expr, _ in spec["queries"]
+    ))
+
+    def build():
+        # 파싱, 다운샘플링, 그리기는 CPU 작업이므로 이벤트 루프 밖에서 실행
+        series = []
+        for (expr, legend_format), result in zip(spec["queries"], results):
+            for metric, ts, values in parse_matrix(result):
+                ts, values = insert_gaps(ts, values, step)
+                ts, values = downsample(ts, values, width)
+                series.append((format_legend(legend_format, metric, expr), ts, values))
+        return draw_png(spec, series, start, end, width, height)
+
+    return await asyncio.to_thread(build)
@@ -1,23 +1,294 @@
-from mcrcon import MCRcon
+import asyncio
+import itertools
+import logging
+import socket
+import struct
+import time
 from .config import Config
+from .metrics import RCON_COMMAND_SECONDS, RCON_ERRORS
+
+log = logging.getLogger(__name__)
+
+# RCON 패킷 종류
+SERVERDATA_AUTH = 3
+SERVERDATA_AUTH_RESPONSE = 2
+SERVERDATA_EXECCOMMAND = 2
+SERVERDATA_RESPONSE_VALUE = 0
+# 서버가 "Unknown request"로 응답하는 종류. 잘렸을 수 있는 응답 뒤에 보내 응답 조각의 끝을 표시합니다.
+SENTINEL_TYPE = 200
+# 서버가 응답을 나누는 최대 크기 (이 크기의 조각을 받으면 뒤에 조각이 더 있을 수 있음)
+MAX_RESPONSE_CHUNK = 4096
+
+# 명령 결과 대신 반환하는 오류 문자열의 접두사
+RCON_ERROR_PREFIX = "RCON 연결 오류"
+
+_HEADER = struct.Struct("<ii")  # request id, type (길이 필드 뒤)
+_MAX_PACKET_SIZE = 4096 + 14
+
+
+class RconError(Exception):
+    pass
+
+
+class RconAuthError(RconError):
+    pass
+
+
+def is_rcon_error(response):
+    """send_command / send_commands가 서버 응답 대신 반환한 오류 문자열이면 True."""
+    return response.startswith(RCON_ERROR_PREFIX)
+
+
+def encode_packet(request_id, packet_type, payload):
+    body = _HEADER.pack(request_id, packet_type) + payload.encode("utf-8") + b"\x00\x00"
+    return struct.pack("<i", len(body)) + body
+
+
+async def read_packet(reader):
+    """패킷 하나를 읽어 (request id, type, payload)를 반환합니다."""
+    length = struct.unpack("<i", await reader.readexactly(4))[0]
+    if length < 10 or length > _MAX_PACKET_SIZE:
+        raise RconError(f"잘못된 RCON 패킷 길이: {length}")
+    data = await reader.readexactly(length)
+    request_id, packet_type = _HEADER.unpack_from(data)
+    return request_id, packet_type, data[8:-2]
+
+
+class RconConnection:
+    """
+    인증된 RCON 연결 하나입니다. 명령은 한 번에 하나씩 보내고 응답을 받은 뒤 다음 명령을 보냅니다.
+    마인크래프트 서버는 소켓에서 한 번 읽은 데이터를 패킷 하나로만 처리하여, 여러 패킷이 한 번에 도착하면
+    뒤의 패킷을 버리거나 연결을 끊기 때문입니다. 응답이 최대 조각 크기(4096자)로 잘렸을 수 있으면
+    첫 조각을 받은 뒤 센티널 패킷을 따로 보내, 그 응답이 올 때까지 나머지 조각을 모읍니다.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self._ids = itertools.count(1)
+        # 읽기 작업이 받은 (요청 ID, payload) 또는 연결이 끊긴 원인(예외)
+        self._responses = asyncio.Queue()
+        self._lock = asyncio.Lock()
+        self._reader_task = None
+        self.closed = False
+
+    @classmethod
+    async def open(cls, host, port, password, timeout):
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        conn = cls(reader, writer)
+        try:
+            await asyncio.wait_for(conn._login(password), timeout)
+        except BaseException:
+            writer.close()
+            raise
+        conn._reader_task = asyncio.create_task(conn._read_loop())
+        return conn
+
+    async def _login(self, password):
+        request_id = next(self._ids)
+        self.writer.write(encode_packet(request_id, SERVERDATA_AUTH, password))
+        await self.writer.drain()
+        while True:
+            response_id, packet_type, _ = await read_packet(self.reader)
+            # 일부 구현은 인증 응답 앞에 빈 RESPONSE_VALUE를 보냄
+            if packet_type != SERVERDATA_AUTH_RESPONSE:
+                continue
+            if response_id == -1:
+                raise RconAuthError("RCON 인증 실패 (비밀번호 확인 필요)")
+            if response_id == request_id:
+                return
+
+    async def _read_loop(self):
+        # 명령을 보내지 않는 동안에도 읽어서 서버가 연결을 끊으면 바로 알아챔
+        try:
+            while True:
+                request_id, _, payload = await read_packet(self.reader)
+                self._responses.put_nowait((request_id, payload))
+        except asyncio.CancelledError:
+            self._fail(ConnectionError("RCON 연결 종료"))
+            raise
+        except Exception as e:
+            self._fail(ConnectionError(f"RCON 연결 끊김: {e!r}"))
+
+    def _fail(self, error):
+        if self.closed:
+            return
+        self.closed = True
+        self._responses.put_nowait(error)
+        self.writer.close()
+
+    async def _send(self, request_id, packet_type, payload):
+        self.writer.write(encode_packet(request_id, packet_type, payload))
+        await self.writer.drain()
+
+    async def _receive(self):
+        item = await self._responses.get()
+        if isinstance(item, Exception):
+            # 같은 연결을 기다리는 다음 명령도 실패하도록 되돌려 놓음
+            self._responses.put_nowait(item)
+            raise item
+        return item
+
+    async def _exchange(self, command):
+        command_id = next(self._ids)
+        await self._send(command_id, SERVERDATA_EXECCOMMAND, command)
+        while True:
+            request_id, payload = await self._receive()
+            if request_id == command_id:
+                break
+        chunks = [payload]
+        if len(payload) >= MAX_RESPONSE_CHUNK:
+            # 서버는 응답 조각을 모두 쓴 뒤 다음 패킷을 읽으므로, 센티널 응답 앞에 남은 조각이 모두 도착함
+            sentinel_id = next(self._ids)
+            await self._send(sentinel_id, SENTINEL_TYPE, "")
+            while True:
+                request_id, payload = await self._receive()
+                if request_id == sentinel_id:
+                    break
+                if request_id == command_id:
+                    chunks.append(payload)
+        return b"".join(chunks).decode("utf-8", errors="replace")
+
+    async def command(self, command, timeout):
+        """명령을 보내고 응답 문자열을 반환합니다. 시간 초과 등으로 중단되면 응답 순서를 알 수 없으므로 연결을 닫습니다."""
+        async with self._lock:
+            if self.closed:
+                raise ConnectionError("RCON 연결이 닫혀 있습니다.")
+            try:
+                return await asyncio.wait_for(self._exchange(command), timeout)
+            except BaseException:
+                self._fail(ConnectionError("RCON 명령 중단"))
+                raise
+
+    async def close(self):
+        if self._reader_task:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except asyncio.CancelledError:
+                pass
+            self._reader_task = None
+        self._fail(ConnectionError("RCON 연결 종료"))
+
 
 class RconClient:
-    def __init__(self):
-        self.host = Config.RCON_HOST
-        self.port = Config.RCON_PORT
-        self.password = Config.RCON_PASSWORD
+    """
+    인증을 마친 RCON 연결을 pool_size개 유지하며 명령을 보냅니다.
+    연결에 실패하면 재시도 간격을 늘려 가며(backoff) 다시 연결하고, 그동안의 명령은 기다리지 않고 바로 실패합니다.
+    """
 
-    def send_command(self, command: str) -> str:
+    def __init__(self, host=None, port=None, password=None, pool_size=None, timeout=None,
+                 backoff_min=0.5, backoff_max=30.0):
+        self.host = host or Config.RCON_HOST
+        self.port = port or Config.RCON_PORT
+        self.password = password if password is not None else Config.RCON_PASSWORD
+        self.pool_size = pool_size or Config.RCON_POOL_SIZE
+        self.timeout = timeout or Config.RCON_TIMEOUT
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+        self._slots = [None] * self.pool_size
+        self._locks = None
+        self._next_slot = itertools.cycle(range(self.pool_size))
+        self._backoff = backoff_min
+        self._retry_at = 0.0
+        self.connects = 0
+
+    async def _get_connection(self):
+        """살아 있는 연결을 돌아가며 반환합니다. 끊어진 슬롯은 다시 연결합니다."""
+        if self._locks is None:
+            self._locks = [asyncio.Lock() for _ in range(self.pool_size)]
+        index = next(self._next_slot)
+        async with self._locks[index]:
+            conn = self._slots[index]
+            if conn is not None and not conn.closed:
+                return conn
+
+            wait = self._retry_at - time.monotonic()
+            if wait > 0:
+                raise ConnectionError(f"재연결 대기 중 ({wait:.1f}초 후 재시도)")
+            try:
+                conn = await RconConnection.open(self.host, self.port, self.password, self.timeout)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, RconError) as e:
+                self._retry_at = time.monotonic() + self._backoff
+                log.warning("RCON 연결 실패, %.1f초 후 재시도: %r", self._backoff, e)
+                self._backoff = min(self._backoff * 2, self.backoff_max)
+                raise
+            self._backoff = self.backoff_min
+            self._retry_at = 0.0
+            self.connects += 1
+            self._slots[index] = conn
+            return conn
+
+    async def send_command(self, command: str, timeout=None) -> str:
         """
         RCON을 통해 마인크래프트 서버로 명령어를 전송합니다.
         서버로부터의 응답을 반환합니다.
         """
+        start = time.perf_counter()
         try:
-            with MCRcon(self.host, self.password, port=self.port) as mcr:
-                response = mcr.command(command)
-                return response
+            conn = await self._get_connection()
+            try:
+                response = await conn.command(command, timeout or self.timeout)
+            except asyncio.TimeoutError:
+                # 응답이 없는 연결은 버리고 다음 명령에서 새로 연결
+                RCON_ERRORS.labels("timeout").inc()
+                await conn.close()
+                return f"{RCON_ERROR_PREFIX}: 응답 시간 초과"
         except Exception as e:
-            return f"RCON 연결 오류: {str(e)}"
+            RCON_ERRORS.labels("connection").inc()
+            return f"{RCON_ERROR_PREFIX}: {str(e)}"
+        RCON_COMMAND_SECONDS.labels("single").observe(time.perf_counter() - start)
+        return response
+
+    async def send_commands(self, commands, timeout=None):
+        """
+        여러 명령을 풀의 연결들에 나누어 보내고, 입력 순서대로 응답 목록을 반환합니다.
+        연결마다 명령은 하나씩 응답을 받은 뒤 다음 명령을 보냅니다 (서버가 패킷을 한 번에 하나만 처리함).
+        """
+        timeout = timeout or self.timeout
+        start = time.perf_counter()
+        results = [None] * len(commands)
+        pending = iter(range(len(commands)))
+        connect_errors = []
+
+        async def worker():
+            try:
+                conn = await self._get_connection()
+            except Exception as e:
+                connect_errors.append(e)
+                return
+            for index in pending:
+                if conn.closed:
+                    # 이미 끊긴 연결로는 보내지 않음 (실행 여부가 불확실해지지 않도록 재전송도 하지 않음)
+                    RCON_ERRORS.labels("not_sent").inc()
+                    results[index] = f"{RCON_ERROR_PREFIX}: 연결이 끊겨 전송하지 않았습니다."
+                    continue
+                try:
+                    results[index] = await conn.command(commands[index], timeout)
+                except asyncio.TimeoutError:
+                    RCON_ERRORS.labels("timeout").inc()
+                    results[index] = f"{RCON_ERROR_PREFIX}: 응답 시간 초과"
+                except Exception as e:
+                    RCON_ERRORS.labels("connection").inc()
+                    results[index] = f"{RCON_ERROR_PREFIX}: {str(e)}"
+
+        await asyncio.gather(*(worker() for _ in range(min(self.pool_size, len(commands)))))
+        for index, result in enumerate(results):
+            if result is None:
+                # 연결을 하나도 얻지 못해 남은 명령
+                RCON_ERRORS.labels("connection").inc()
+                results[index] = f"{RCON_ERROR_PREFIX}: {str(connect_errors[0])}"
+        RCON_COMMAND_SECONDS.labels("bulk").observe(time.perf_counter() - start)
+        return results
+
+    async def close(self):
+        for i, conn in enumerate(self._slots):
+            if conn is not None:
+                await conn.close()
+                self._slots[i] = None
 
 # 싱글톤 인스턴스
 rcon = RconClient()
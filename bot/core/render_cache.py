@@ -0,0 +1,138 @@
+import asyncio
+import time
+from collections import OrderedDict
+from .config import Config
+
+
+class RenderError(Exception):
+    """렌더러가 이미지를 돌려주지 않은 경우 (HTTP 상태 코드 포함)."""
+
+    def __init__(self, status, message=""):
+        super().__init__(f"render failed ({status}) {message}".strip())
+        self.status = status
+
+
+class RenderCache:
+    """
+    렌더링된 차트 이미지 캐시입니다.
+    키는 (dashboard_uid, panel_id, 시작, 끝, 너비, 높이) 등 렌더 결과를 결정하는 값의 튜플이며,
+    TTL이 지나면 다시 렌더링하고, 개수/용량을 넘으면 가장 오래 쓰지 않은 이미지부터 버립니다.
+    같은 키의 렌더링이 진행 중이면 새로 렌더링하지 않고 그 결과를 함께 기다립니다.
+    """
+
+    def __init__(self, ttl=60, max_entries=32, max_bytes=32 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # 키 -> (렌더 완료 시각, 이미지 bytes)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        # 키 -> 진행 중인 렌더링 Task
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.renders = 0
+        self.prerenders = 0
+        self.render_errors = 0
+        self.evictions = 0
+        self.render_seconds_total = 0.0
+        self.last_render_seconds = None
+
+    def peek(self, key):
+        """TTL 안의 캐시된 이미지를 반환합니다 (없으면 None, 통계에 반영하지 않음)."""
+        entry = self._entries.get(key)
+        if entry and time.monotonic() - entry[0] <= self.ttl:
+            return entry[1]
+        return None
+
+    async def get(self, key, render):
+        """
+        캐시된 이미지를 반환하고, 없으면 render()(이미지 bytes를 반환하는 코루틴 함수)로 렌더링합니다.
+        반환: (이미지 bytes, 캐시 적중 여부)
+        """
+        data = self.peek(key)
+        if data is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data, True
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(self._render(key, render))
+            self._inflight[key] = task
+        # 요청한 명령이 취소되어도 다른 대기자를 위해 렌더링은 계속
+        return await asyncio.shield(task), False
+
+    async def refresh(self, key, render):
+        """
+        캐시 여부와 관계없이 다시 렌더링하여 캐시를 갱신합니다 (백그라운드 미리 렌더링용).
+        같은 키의 렌더링이 진행 중이면 그 결과를 기다립니다.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            self.prerenders += 1
+            task = asyncio.ensure_future(self._render(key, render))
+            self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _render(self, key, render):
+        start = time.perf_counter()
+        try:
+            data = await render()
+        except Exception:
+            self.render_errors += 1
+            raise
+        finally:
+            self._inflight.pop(key, None)
+            elapsed = time.perf_counter() - start
+            self.renders += 1
+            self.render_seconds_total += elapsed
+            self.last_render_seconds = elapsed
+        self.put(key, data)
+        return data
+
+    def put(self, key, data):
+        old = self._entries.pop(key, None)
+        if old:
+            self._bytes -= len(old[1])
+        if len(data) > self.max_bytes:
+            return
+        self._entries[key] = (time.monotonic(), data)
+        self._bytes += len(data)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    def invalidate(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 3) if lookups else None,
+            "renders": self.renders,
+            "prerenders": self.prerenders,
+            "render_errors": self.render_errors,
+            "evictions": self.evictions,
+            "render_seconds_avg": round(self.render_seconds_total / self.renders, 3) if self.renders else None,
+            "render_seconds_last": round(self.last_render_seconds, 3) if self.last_render_seconds is not None else None,
+            "inflight": len(self._inflight),
+        }
+
+# 싱글톤 인스턴스 (!chart 렌더 결과)
+chart_cache = RenderCache(
+    ttl=Config.CHART_CACHE_TTL,
+    max_entries=Config.CHART_CACHE_MAX_ENTRIES,
+    max_bytes=Config.CHART_CACHE_MAX_MB * 1024 * 1024,
+)
@@ -0,0 +1,183 @@
+import asyncio
+import datetime
+import logging
+
+from .config import Config
+from .db import db
+from .player_index import is_player_name
+
+log = logging.getLogger(__name__)
+
+# minecraft:play_time 단위 (서버 틱, 초당 20틱)
+TICKS_PER_SECOND = 20
+
+
+class Session:
+    """접속 중인 플레이어 한 명의 세션 (시작 시각, playtime에 마지막으로 반영한 시각)."""
+
+    __slots__ = ("started_at", "accounted_at")
+
+    def __init__(self, started_at, accounted_at=None):
+        self.started_at = started_at
+        self.accounted_at = accounted_at or started_at
+
+
+class SessionTracker:
+    """
+    접속 중인 플레이어의 세션을 메모리에 두고, 접속 기록(player_sessions)은 모아서 한 번에 기록합니다.
+    - 접속/퇴장 로그로 세션을 열고 닫습니다. 퇴장 로그를 놓친 세션은 다음 접속이나 서버 시작 때
+      마지막으로 반영한 시각에 끝난 것으로 닫습니다 (종료 사유 missed / crash).
+    - interval초마다 접속 중인 플레이어의 경과 시간을 틱으로 바꿔 playtime에 더하므로 랭킹이 접속 중에도 갱신됩니다.
+    - 통계 파일(minecraft:play_time)을 다시 읽으면 reconcile()로 파일 값 + 저장 이후 경과 시간으로 맞춥니다.
+    """
+
+    def __init__(self, database, interval=60):
+        self.db = database
+        self.interval = interval
+        # 플레이어 -> Session
+        self.open = {}
+        # (플레이어, 시작 시각) -> (종료 시각, 종료 사유): 아직 DB에 기록하지 않은 세션 행
+        self._dirty = {}
+        self._flush_lock = asyncio.Lock()
+        self._task = None
+        self.opened = 0
+        self.closed = {}
+        self.flushes = 0
+        self.reconciled = 0
+
+    def _account(self, player, session, until):
+        """마지막 반영 시각부터 until까지의 접속 시간을 쓰기 버퍼의 playtime 증가분으로 넣습니다."""
+        ticks = int((until - session.accounted_at).total_seconds() * TICKS_PER_SECOND)
+        if ticks <= 0:
+            return
+        self.db.writer.increment(player, "playtime", ticks)
+        # 버린 소수점 이하 틱은 다음 반영에 포함되도록 반영한 틱만큼만 전진
+        session.accounted_at += datetime.timedelta(seconds=ticks / TICKS_PER_SECOND)
+
+    def _close(self, player, at, reason, account=True):
+        session = self.open.pop(player, None)
+        if session is None:
+            return
+        if account:
+            self._account(player, session, at)
+        self._dirty[(player, session.started_at)] = (max(at, session.started_at), reason)
+        self.closed[reason] = self.closed.get(reason, 0) + 1
+
+    def on_login(self, player, at):
+        if not is_player_name(player):
+            # player_sessions 기록이 거부되어 다른 세션까지 저장되지 않는 일이 없도록 받지 않음
+            log.debug("Ignoring login for invalid player name %r", player)
+            return
+        session = self.open.get(player)
+        if session is not None:
+            if session.started_at == at:
+                # 같은 접속 로그를 다시 받은 경우
+                return
+            self._close(player, min(session.accounted_at, at), "missed", account=False)
+        self.open[player] = Session(at)
+        self._dirty[(player, at)] = (None, None)
+        self.opened += 1
+
+    def on_logout(self, player, at):
+        self._close(player, at, "logout")
+
+    def on_server_stop(self, at):
+        for player in list(self.open):
+            self._close(player, at, "server_stop")
+
+    def on_server_start(self, at):
+        # 종료 로그 없이 다시 시작됨: 서버가 비정상 종료된 것으로 보고 마지막으로 반영한 시각에 닫음
+        for player, session in list(self.open.items()):
+            self._close(player, min(session.accounted_at, at), "crash", account=False)
+
+    def reconcile(self, sets, saved_at, now=None):
+        """
+        StatsSync가 읽은 통계 파일 값으로 접속 중인 플레이어의 playtime을 맞춥니다.
+        sets: {플레이어: 통계} (접속 중인 플레이어의 playtime은 여기서 빼고 쓰기 버퍼에 설정),
+        saved_at: {플레이어: 통계 파일 저장 시각}
+        """
+        now = now or datetime.datetime.now()
+        for player, stats in sets.items():
+            session = self.open.get(player)
+            if session is None or "playtime" not in stats:
+                continue
+            # 파일 저장 이후(또는 이번 접속 이후)의 시간은 아직 파일에 없음
+            since = max(saved_at.get(player, now), session.started_at)
+            elapsed = max(0, int((now - since).total_seconds() * TICKS_PER_SECOND))
+            # 이미 쌓인 증가분보다 뒤에 적용되도록 쓰기 버퍼를 거침
+            self.db.writer.set(player, "playtime", stats.pop("playtime") + elapsed)
+            session.accounted_at = now
+            self.reconciled += 1
+
+    async def flush(self):
+        """바뀐 세션 행을 한 번의 쿼리로 기록합니다. 실패하면 다음 flush에서 다시 시도합니다."""
+        async with self._flush_lock:
+            if not self._dirty:
+                return
+            dirty, self._dirty = self._dirty, {}
+            rows = [(player, started_at, ended_at, reason) for (player, started_at), (ended_at, reason) in dirty.items()]
+            try:
+                await self.db.save_sessions(rows)
+                self.flushes += 1
+            except Exception as e:
+                log.error("Failed to save %d player sessions: %s", len(rows), e)
+                # 그 사이 바뀐 행이 더 최신
+                dirty.update(self._dirty)
+                self._dirty = dirty
+
+    async def tick(self):
+        now = datetime.datetime.now()
+        for player, session in self.open.items():
+            self._account(player, session, now)
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.exception("Session accounting failed: %s", e)
+
+    async def start(self):
+        """DB에 남은 접속 중 세션을 불러와 이어서 추적하고, 주기적인 반영을 시작합니다."""
+        now = datetime.datetime.now()
+        for player, started_at in await self.db.get_open_sessions():
+            # 봇이 꺼져 있던 동안의 시간은 퇴장 시 통계 파일이나 다음 동기화가 맞춤
+            self.open[player] = Session(started_at, accounted_at=max(now, started_at))
+        if self.open:
+            log.info("Resumed %d open player sessions", len(self.open))
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # 세션은 열어 둔 채로 지금까지의 시간과 행만 기록 (재시작 후 이어서 추적)
+        await self.tick()
+
+    async def history(self, player, limit=10):
+        """플레이어의 최근 접속 기록 (기록 대기 중인 행을 먼저 반영)."""
+        await self.flush()
+        return await self.db.get_player_sessions(player, limit)
+
+    def stats(self):
+        return {
+            "open": len(self.open),
+            "opened": self.opened,
+            "closed": dict(self.closed),
+            "pending_rows": len(self._dirty),
+            "flushes": self.flushes,
+            "reconciled": self.reconciled,
+        }
+
+
+# 전역 세션 추적기
+sessions = SessionTracker(db, interval=Config.SESSION_FLUSH_INTERVAL)
@@ -1,73 +1,112 @@
 import json
+import logging
 import os
+from collections import OrderedDict
+
+from .usercache import UserCache
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성: 없으면 표준 json 사용
+    orjson = None
+
+log = logging.getLogger(__name__)
+
+# 채굴 블록 -> 통계 컬럼. 이 표를 한 번 순회하여 모든 광물 컬럼을 집계합니다.
+ORE_BUCKETS = {
+    'minecraft:diamond_ore': "diamonds_mined", 'minecraft:deepslate_diamond_ore': "diamonds_mined",
+    'minecraft:coal_ore': "coal_mined", 'minecraft:deepslate_coal_ore': "coal_mined",
+    'minecraft:iron_ore': "iron_mined", 'minecraft:deepslate_iron_ore': "iron_mined",
+    'minecraft:gold_ore': "gold_mined", 'minecraft:deepslate_gold_ore': "gold_mined",
+    'minecraft:nether_gold_ore': "gold_mined",
+    'minecraft:emerald_ore': "emerald_mined", 'minecraft:deepslate_emerald_ore': "emerald_mined",
+    'minecraft:lapis_ore': "lapis_mined", 'minecraft:deepslate_lapis_ore': "lapis_mined",
+    'minecraft:redstone_ore': "redstone_mined", 'minecraft:deepslate_redstone_ore': "redstone_mined",
+    'minecraft:ancient_debris': "netherite_mined",
+}
+ORE_COLUMNS = tuple(dict.fromkeys(ORE_BUCKETS.values()))
+
+
+def load_json_file(path):
+    """JSON 파일을 읽습니다. orjson이 설치되어 있으면 사용합니다."""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if orjson:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def aggregate_stats(data):
+    """통계 파일 내용(dict)에서 광물별 채굴 수, 총 채굴량, 플레이 타임을 계산합니다."""
+    stats = data.get('stats', {})
+    mined = stats.get('minecraft:mined', {})
+
+    # 광물 블록 수(17개)만큼만 조회하고, 전체 합산은 C 레벨 sum으로 처리
+    result = dict.fromkeys(ORE_COLUMNS, 0)
+    for block, column in ORE_BUCKETS.items():
+        count = mined.get(block)
+        if count:
+            result[column] += count
+
+    result["blocks_broken"] = sum(mined.values())
+    # Extract playtime (ticks)
+    result["playtime"] = stats.get('minecraft:custom', {}).get('minecraft:play_time', 0)
+    return result
+
 
 class StatsReader:
-    def __init__(self, stats_dir="/mc-logs/world/stats", usercache_path="/mc-logs/usercache.json"):
+    def __init__(self, stats_dir="/mc-logs/world/stats", usercache_path="/mc-logs/usercache.json", cache_size=256, usercache=None):
         self.stats_dir = stats_dir
-        self.usercache_path = usercache_path
-        self.uuid_map = {}
+        # 이름 <-> UUID 매핑 (여러 컴포넌트가 같은 인덱스를 공유할 수 있음)
+        self.usercache = usercache or UserCache(usercache_path)
+        # 통계 파일 경로 -> (mtime_ns, size, 집계 결과). 파일이 바뀌지 않았으면 다시 파싱하지 않습니다.
+        self._cache = OrderedDict()
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
 
-    def load_usercache(self):
-        """usercache.json 파일을 로드하여 플레이어 이름을 UUID로 매핑합니다."""
-        if not os.path.exists(self.usercache_path):
-            print(f"[WARN] {self.usercache_path} 에서 usercache를 찾을 수 없습니다.")
-            return
+    @property
+    def uuid_map(self):
+        return self.usercache.uuid_map
 
-        try:
-            with open(self.usercache_path, 'r') as f:
-                data = json.load(f)
-                # usercache 형식: [{"name": "Player", "uuid": "..."}]
-                for entry in data:
-                    self.uuid_map[entry['name']] = entry['uuid']
-        except Exception as e:
-            print(f"[ERROR] usercache 로드 실패: {e}")
+    def load_usercache(self):
+        """usercache.json이 바뀌었으면 다시 읽습니다."""
+        self.usercache.refresh()
 
     def get_mined_counts(self, player_name):
         """플레이어의 광물 채굴 통계를 반환합니다."""
-        if player_name not in self.uuid_map:
-            print(f"[DEBUG] {player_name} not in cache. Reloading...")
-            self.load_usercache()
-        
-        if player_name not in self.uuid_map:
-            print(f"[DEBUG] {player_name} not found in usercache.")
+        uuid = self.usercache.get_uuid(player_name)
+        if uuid is None:
+            log.debug("%s not found in usercache.", player_name)
             return {}
 
-        uuid = self.uuid_map[player_name]
         stats_file = os.path.join(self.stats_dir, f"{uuid}.json")
-        print(f"[DEBUG] Reading stats from {stats_file}")
 
-        if not os.path.exists(stats_file):
-            print(f"[DEBUG] Stats file not found: {stats_file}")
+        try:
+            st = os.stat(stats_file)
+        except FileNotFoundError:
+            log.debug("Stats file not found: %s", stats_file)
+            return {}
+        except OSError as e:
+            log.error("%s의 통계 읽기 실패: %s", player_name, e)
             return {}
 
+        cached = self._cache.get(stats_file)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            self._cache.move_to_end(stats_file)
+            self.cache_hits += 1
+            return dict(cached[2])
+
+        self.cache_misses += 1
+        log.debug("Reading stats from %s", stats_file)
         try:
-            with open(stats_file, 'r') as f:
-                data = json.load(f)
-                stats = data.get('stats', {})
-                mined = stats.get('minecraft:mined', {})
-                
-                def get_count(items):
-                    return sum(mined.get(item, 0) for item in items)
-                
-                # Calculate total blocks broken
-                total_blocks_broken = sum(mined.values())
-                
-                # Extract playtime (ticks)
-                custom_stats = stats.get('minecraft:custom', {})
-                play_time_ticks = custom_stats.get('minecraft:play_time', 0)
-
-                return {
-                    "diamonds_mined": get_count(['minecraft:diamond_ore', 'minecraft:deepslate_diamond_ore']),
-                    "coal_mined": get_count(['minecraft:coal_ore', 'minecraft:deepslate_coal_ore']),
-                    "iron_mined": get_count(['minecraft:iron_ore', 'minecraft:deepslate_iron_ore']),
-                    "gold_mined": get_count(['minecraft:gold_ore', 'minecraft:deepslate_gold_ore', 'minecraft:nether_gold_ore']),
-                    "emerald_mined": get_count(['minecraft:emerald_ore', 'minecraft:deepslate_emerald_ore']),
-                    "lapis_mined": get_count(['minecraft:lapis_ore', 'minecraft:deepslate_lapis_ore']),
-                    "redstone_mined": get_count(['minecraft:redstone_ore', 'minecraft:deepslate_redstone_ore']),
-                    "netherite_mined": get_count(['minecraft:ancient_debris']),
-                    "blocks_broken": total_blocks_broken,
-                    "playtime": play_time_ticks
-                }
+            result = aggregate_stats(load_json_file(stats_file))
         except Exception as e:
-            print(f"[ERROR] {player_name}의 통계 읽기 실패: {e}")
+            log.error("%s의 통계 읽기 실패: %s", player_name, e)
             return {}
+
+        self._cache[stats_file] = (st.st_mtime_ns, st.st_size, result)
+        self._cache.move_to_end(stats_file)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return dict(result)
@@ -0,0 +1,202 @@
+import asyncio
+import datetime
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .stats_reader import aggregate_stats, load_json_file
+
+log = logging.getLogger(__name__)
+
+# 워커 작업 하나에 묶을 파일 수 (프로세스 간 전달 비용을 줄이기 위함)
+PARSE_CHUNK_SIZE = 64
+
+
+def parse_stats_files(paths):
+    """
+    통계 파일들을 읽어 집계합니다 (프로세스 풀 워커).
+    반환: ([(경로, 집계 결과 또는 None)], 워커 CPU 시간)
+    """
+    cpu_start = time.process_time()
+    results = []
+    for path in paths:
+        try:
+            results.append((path, aggregate_stats(load_json_file(path))))
+        except Exception as e:
+            # 서버가 저장 중인 파일 등: 다음 주기에 다시 시도
+            log.warning("통계 파일 파싱 실패 (%s): %s", path, e)
+            results.append((path, None))
+    return results, time.process_time() - cpu_start
+
+
+class StatsSync:
+    """
+    world/stats/*.json 전체를 주기적으로 훑어 변경된 파일만 다시 읽고,
+    한 번의 apply_batch로 player_stats에 반영합니다. 접속 중인 플레이어의 랭킹도 주기마다 갱신됩니다.
+    sessions(SessionTracker)를 주면 접속 중인 플레이어의 playtime은 파일 값에 저장 이후 경과 시간을 더해 맞춥니다.
+    """
+
+    def __init__(self, stats_reader, database, interval=300, workers=2, sessions=None):
+        self.stats_reader = stats_reader
+        self.db = database
+        self.interval = interval
+        self.workers = workers
+        self.sessions = sessions
+        # 경로 -> (mtime_ns, size): 마지막으로 DB에 반영한 파일 상태
+        self._synced = {}
+        self._executor = None
+        self._task = None
+        self._wakeup = asyncio.Event()
+        self._requested_at = None
+        self.passes = 0
+        self.last_pass = None
+
+    def _scan(self):
+        """변경된(새로 생기거나 mtime/크기가 바뀐) 통계 파일과 전체 파일 상태를 반환합니다."""
+        current = {}
+        changed = []
+        try:
+            entries = os.scandir(self.stats_reader.stats_dir)
+        except FileNotFoundError:
+            return current, changed
+        with entries:
+            for entry in entries:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                state = (st.st_mtime_ns, st.st_size)
+                current[entry.path] = state
+                if self._synced.get(entry.path) != state:
+                    changed.append(entry.path)
+        return current, changed
+
+    def _get_executor(self):
+        if self._executor is None:
+            # 봇 프로세스에는 스레드(로그 파서, 디스코드)가 있으므로 fork 대신 spawn 사용
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _resolve_names(self, paths):
+        """통계 파일 경로(<uuid>.json)를 플레이어 이름으로 바꿉니다."""
+        usercache = self.stats_reader.usercache
+        return {path: usercache.get_name(os.path.basename(path)[:-len(".json")]) for path in paths}
+
+    async def run_once(self):
+        """한 번 동기화하고 결과 통계(dict)를 반환합니다."""
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        current, changed = await loop.run_in_executor(None, self._scan)
+
+        parsed = []
+        worker_cpu = 0.0
+        if changed:
+            executor = self._get_executor()
+            chunks = [changed[i:i + PARSE_CHUNK_SIZE] for i in range(0, len(changed), PARSE_CHUNK_SIZE)]
+            for results, cpu in await asyncio.gather(
+                *(loop.run_in_executor(executor, parse_stats_files, chunk) for chunk in chunks)
+            ):
+                parsed.extend(results)
+                worker_cpu += cpu
+
+        names = await loop.run_in_executor(None, self._resolve_names, [path for path, _ in parsed])
+        sets = {}
+        saved_at = {}
+        synced = []
+        for path, stats in parsed:
+            name = names.get(path)
+            if stats is None or name is None:
+                # 실패했거나 아직 usercache에 없는 플레이어: 다음 주기에 다시 시도
+                continue
+            sets[name] = stats
+            saved_at[name] = datetime.datetime.fromtimestamp(current[path][0] / 1e9)
+            synced.append(path)
+
+        if self.sessions and sets:
+            self.sessions.reconcile(sets, saved_at)
+        if sets:
+            await self.db.apply_batch(sets=sets)
+
+        # DB 반영이 끝난 파일만 동기화된 것으로 기록 (삭제된 파일은 제거)
+        self._synced = {path: state for path, state in self._synced.items() if path in current}
+        for path in synced:
+            self._synced[path] = current[path]
+
+        self.passes += 1
+        self.last_pass = {
+            "files": len(current),
+            "changed": len(changed),
+            "written": len(sets),
+            "duration_s": round(time.perf_counter() - start, 3),
+            # 메인 프로세스 CPU에는 같은 시간대의 다른 스레드 작업도 포함됩니다
+            "cpu_main_s": round(time.process_time() - cpu_start, 3),
+            "cpu_workers_s": round(worker_cpu, 3),
+        }
+        return self.last_pass
+
+    async def _run(self):
+        while True:
+            try:
+                result = await self.run_once()
+                log.info(
+                    "Stats sync: %d/%d files changed, %d players written in %.2fs (CPU main %.2fs, workers %.2fs)",
+                    result['changed'], result['files'], result['written'], result['duration_s'],
+                    result['cpu_main_s'], result['cpu_workers_s'],
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.exception("Stats sync failed: %s", e)
+                # 워커가 죽었을 수 있으므로 다음 주기에 풀을 새로 만듦
+                self._shutdown_executor()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._next_delay())
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._requested_at is not None:
+                # 요청된 시각까지 기다린 뒤 동기화 (서버가 통계 파일을 다 저장할 시간)
+                await asyncio.sleep(max(0, self._requested_at - time.monotonic()))
+                self._requested_at = None
+
+    def _next_delay(self):
+        return self.interval if self._requested_at is None else max(0, self._requested_at - time.monotonic())
+
+    def request(self, delay=0, full=False):
+        """
+        다음 주기를 기다리지 않고 delay초 뒤에 동기화합니다 (서버 종료/시작 로그 등).
+        full이면 바뀌지 않은 파일도 모두 다시 읽어 반영합니다.
+        """
+        if full:
+            self._synced = {}
+        requested_at = time.monotonic() + delay
+        if self._requested_at is None or requested_at < self._requested_at:
+            self._requested_at = requested_at
+        self._wakeup.set()
+
+    def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    def _shutdown_executor(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._shutdown_executor()
@@ -0,0 +1,92 @@
+import json
+import logging
+import os
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+
+class UserCache:
+    """
+    usercache.json 인덱스 (이름 -> UUID, UUID -> 이름).
+    파일의 mtime/크기가 바뀌었을 때만 다시 읽고, 찾지 못한 이름/UUID는 negative_ttl초 동안 다시 찾지 않습니다.
+    로그 파서 스레드와 이벤트 루프에서 함께 사용할 수 있도록 맵은 통째로 교체합니다.
+    """
+
+    def __init__(self, path="/mc-logs/usercache.json", negative_ttl=60):
+        self.path = path
+        self.negative_ttl = negative_ttl
+        self.uuid_map = {}
+        self.name_map = {}
+        # 마지막으로 읽은 파일 상태 (mtime_ns, size)
+        self._state = None
+        # 찾지 못한 키 -> 다시 찾아볼 수 있는 시각
+        self._misses = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+        self.reloads = 0
+
+    def add_listener(self, callback):
+        """새로 추가된 플레이어 이름 목록을 받는 콜백을 등록합니다. 이미 읽은 이름은 바로 전달됩니다."""
+        self._listeners.append(callback)
+        if self.uuid_map:
+            callback(list(self.uuid_map))
+
+    def refresh(self):
+        """파일이 바뀌었으면 다시 읽습니다. 다시 읽었으면 True를 반환합니다."""
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                if self._state is None:
+                    log.warning("%s 에서 usercache를 찾을 수 없습니다.", self.path)
+                return False
+
+            state = (st.st_mtime_ns, st.st_size)
+            if state == self._state:
+                return False
+
+            try:
+                with open(self.path, 'rb') as f:
+                    data = json.load(f)
+            except Exception as e:
+                log.error("usercache 로드 실패: %s", e)
+                return False
+
+            # usercache 형식: [{"name": "Player", "uuid": "..."}]
+            uuid_map = {entry['name']: entry['uuid'] for entry in data}
+            added = [name for name in uuid_map if name not in self.uuid_map]
+            self.uuid_map = uuid_map
+            self.name_map = {uuid: name for name, uuid in uuid_map.items()}
+            self._state = state
+            self._misses.clear()
+            self.reloads += 1
+
+        if added:
+            for callback in self._listeners:
+                callback(added)
+        return True
+
+    def _lookup(self, mapping_name, key):
+        value = getattr(self, mapping_name).get(key)
+        if value is not None:
+            return value
+
+        retry_at = self._misses.get((mapping_name, key))
+        if retry_at is not None and time.monotonic() < retry_at:
+            return None
+
+        self.refresh()
+        value = getattr(self, mapping_name).get(key)
+        if value is None:
+            self._misses[(mapping_name, key)] = time.monotonic() + self.negative_ttl
+        return value
+
+    def get_uuid(self, name):
+        """플레이어 이름의 UUID를 반환합니다. 없으면 None."""
+        return self._lookup("uuid_map", name)
+
+    def get_name(self, uuid):
+        """UUID의 플레이어 이름을 반환합니다. 없으면 None."""
+        return self._lookup("name_map", uuid)
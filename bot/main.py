@@ -1,13 +1,30 @@
 import asyncio
+import datetime
+import logging
 import os
 import threading
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, BackgroundTasks, Request
+from fastapi import FastAPI, BackgroundTasks, Request, Response
 import discord
 from discord.ext import commands
 from core.config import Config
 from core.db import db
+from core.rcon_client import rcon
+from core.render_cache import chart_cache
+from core.events import record_event
+from core.sessions import sessions
 from core.log_parser import LogParser
+from core.log_checkpoint import LogCheckpoint
+from core.player_index import is_player_name
+from core.stats_sync import StatsSync
+from core.event_bus import EventBus
+from core.notifier import Notifier
+from core.metrics import collector, render_metrics
+from core.logger import setup_logging
+
+# 큐 기반 로깅 (LOG_LEVEL / LOG_FORMAT)
+setup_logging()
+log = logging.getLogger("bot")
 
 # 디스코드 봇 설정
 intents = discord.Intents.default()
@@ -17,12 +34,36 @@ bot = commands.Bot(command_prefix="!", intents=intents)
 
 # 로그 파서 인스턴스
 # 로그 파서 인스턴스는 lifespan에서 초기화됩니다
+log_parser = None
+stats_sync = None
+event_bus = None
+
+# 디스코드 알림 발송기 (채널별로 몰아서 보내고, 끊겨 있는 동안의 알림은 재연결 후 전송)
+notifier = Notifier(
+    bot,
+    window=Config.NOTIFY_COALESCE_SECONDS,
+    rate=Config.NOTIFY_RATE,
+    per=Config.NOTIFY_RATE_PERIOD,
+    max_pending=Config.NOTIFY_MAX_PENDING,
+)
+notifier.add_group("login", lambda players: f"👋 **{len(players)}명**이 서버에 접속했습니다: " + ", ".join(f"**{p}**" for p in players))
+notifier.add_group("logout", lambda players: f"🚪 **{len(players)}명**이 서버에서 나갔습니다: " + ", ".join(f"**{p}**" for p in players))
 
 @bot.event
 async def on_ready():
-    print(f'Logged in as {bot.user} (ID: {bot.user.id})')
+    log.info("Logged in as %s (ID: %s)", bot.user, bot.user.id)
+    notifier.set_online(True)
     # Extensions are now loaded in lifespan startup to avoid reloading on reconnects
 
+@bot.event
+async def on_resumed():
+    notifier.set_online(True)
+
+@bot.event
+async def on_disconnect():
+    log.warning("Discord disconnected, buffering notifications until reconnect")
+    notifier.set_online(False)
+
 @bot.event
 async def on_command_error(ctx, error):
     if isinstance(error, commands.CommandNotFound):
@@ -32,7 +73,7 @@ async def on_command_error(ctx, error):
         # Usually checking handles messaging, but this catches bubbles
         return
     
-    print(f"[ERROR] Command Error: {error}")
+    log.error("Command error in %s: %s", ctx.command, error)
     # await ctx.send(f"❌ **오류 발생**: `{error}`") # 유저에게 에러 보여주기 (옵션)
 
 # 관리자 권한 확인 함수
@@ -45,75 +86,66 @@ async def check_admin(ctx):
     user_roles = [role.name.lower().strip() for role in ctx.author.roles]
     is_admin = ctx.author.guild_permissions.administrator
     
-    print(f"[DEBUG] Check Admin for {ctx.author} (ID: {ctx.author.id})")
-    print(f"[DEBUG] Admin Perm: {is_admin}, Roles: {user_roles}")
+    log.debug("Check admin for %s (ID: %s), admin perm: %s, roles: %s", ctx.author, ctx.author.id, is_admin, user_roles)
 
     # [Strict Mode] 관리자 권한(Administrator)이 있어도 이름이 일치하는 역할이 없으면 차단
     # 만약 서버 주인도 차단된다면 이 주석을 해제하세요.
     # if is_admin:
-    #     print("[DEBUG] Access Granted (Administrator)")
+    #     log.debug("Access granted (Administrator)")
     #     return True
     
     allowed_roles = ["admin", "minecraft admin", "operator", "op", "관리자", "운영자"]
     
     if any(role in allowed_roles for role in user_roles):
-        print("[DEBUG] Access Granted (Role Match)")
+        log.debug("Access granted (role match)")
         return True
 
-    print("[DEBUG] Access Denied")
+    log.debug("Access denied for %s", ctx.author)
     await ctx.send("⛔ **권한이 없습니다.** 'Admin' 또는 '관리자' 역할이 필요합니다.")
     return False
 
 @bot.command()
 @commands.check(check_admin)
 async def ping(ctx):
-    print(f"[DEBUG] Executing PING command for {ctx.author}")
+    log.debug("Executing PING command for %s", ctx.author)
     await ctx.send('Pong!')
 
 @bot.command()
 @commands.check(check_admin)
 async def health(ctx):
     """봇의 상태를 확인합니다."""
-    print(f"[DEBUG] Executing HEALTH command for {ctx.author}")
+    log.debug("Executing HEALTH command for %s", ctx.author)
     latency = round(bot.latency * 1000, 2)
     await ctx.send(f"✅ **System Healthy**\nLatency: `{latency}ms`")
 
 # 킬 스트릭 추적기
 kill_streaks = {}
 
+def event_keys(event_type, data):
+    """이벤트 버스에서 처리 순서를 보장할 플레이어 목록."""
+    if event_type == 'death':
+        return (data['victim'], data['killer']) if data['killer'] else (data['victim'],)
+    if event_type in ('server_stop', 'server_start'):
+        return ()
+    return (data['player'],)
+
 async def handle_log_event(event_type, data):
-    # 1. DB 업데이트 (비동기)
-    if event_type == 'login':
-        await db.update_timestamp(data['player'], "last_login")
-        
-    elif event_type == 'logout':
-        player = data['player']
-        # 플레이 타임 계산 로직은 DB로 이동하거나 여기서 처리해야 함
-        await db.update_timestamp(player, "last_logout")
-        
-        # 광물 통계 업데이트
-        if 'mined_stats' in data:
-            for stat, value in data['mined_stats'].items():
-                await db.set_stat(player, stat, value)
+    # 1. DB 업데이트 (쓰기 버퍼를 통해 모아서 기록)
+    await record_event(event_type, data)
 
-    elif event_type == 'advancement':
-        await db.update_stat(data['player'], "advancements")
+    # 서버가 종료하며 저장한 통계 파일 / 재시작 후의 통계를 바로 반영
+    if stats_sync and event_type == 'server_stop':
+        stats_sync.request(delay=10)
+    elif stats_sync and event_type == 'server_start':
+        stats_sync.request(full=True)
 
-    elif event_type == 'death':
-        victim = data['victim']
-        killer = data['killer']
-        is_pvp = data['is_pvp']
-        
-        await db.update_stat(victim, "deaths")
-        if is_pvp and killer:
-            await db.update_stat(killer, "kills")
-
-    # 2. 디스코드 알림
-    channel = bot.get_channel(1445330465530576938)
-    if not channel:
-        print(f"Warning: !!! No channel found to broadcast {event_type}")
+    # 2. 디스코드 알림 (발송기 큐에 넣기만 하고 전송은 기다리지 않음)
+    if not Config.DISCORD_TOKEN:
         return
 
+    def send(text, group=None, item=None):
+        notifier.notify(Config.NOTIFY_CHANNEL_ID, text, group=group, item=item)
+
     if event_type == 'death':
         victim = data['victim']
         killer = data['killer']
@@ -123,7 +155,7 @@ async def handle_log_event(event_type, data):
         # Reset victim's streak
         if victim in kill_streaks:
             if kill_streaks[victim] >= 3:
-                await channel.send(f"🛑 **{victim}**님의 {kill_streaks[victim]}연속 킬이 **{killer if killer else reason}**에 의해 저지당했습니다!")
+                send(f"🛑 **{victim}**님의 {kill_streaks[victim]}연속 킬이 **{killer if killer else reason}**에 의해 저지당했습니다!")
             del kill_streaks[victim]
 
         # PvP 처리
@@ -132,102 +164,211 @@ async def handle_log_event(event_type, data):
             streak = kill_streaks[killer]
             
             if streak == 3:
-                await channel.send(f"🔥 **{killer}**님이 **학살**을 시작했습니다! (3킬)")
+                send(f"🔥 **{killer}**님이 **학살**을 시작했습니다! (3킬)")
             elif streak == 5:
-                await channel.send(f"🩸 **{killer}**님을 **막을 수 없습니다**! (5킬)")
+                send(f"🩸 **{killer}**님을 **막을 수 없습니다**! (5킬)")
             elif streak >= 10:
-                await channel.send(f"💀 **{killer}**님은 **신**입니다! ({streak}킬)")
+                send(f"💀 **{killer}**님은 **신**입니다! ({streak}킬)")
 
-            await channel.send(f"⚔️ **{victim}**님이 **{killer}**님에게 살해당했습니다.")
+            send(f"⚔️ **{victim}**님이 **{killer}**님에게 살해당했습니다.")
 
         # 굴욕적인 죽음 처리 (PvE)
         if not is_pvp:
             if "cactus" in reason or "pricked" in reason:
-                await channel.send(f"🌵 **{victim}**님이 선인장이나 가시에 찔려 사망했습니다. 따끔하네요.")
+                send(f"🌵 **{victim}**님이 선인장이나 가시에 찔려 사망했습니다. 따끔하네요.")
             elif "berry" in reason:
-                await channel.send(f"🫐 **{victim}**님이 달콤한 베리 덤불에 찔려 죽었습니다. 부끄럽군요.")
+                send(f"🫐 **{victim}**님이 달콤한 베리 덤불에 찔려 죽었습니다. 부끄럽군요.")
             elif "high place" in reason or "hit the ground" in reason:
-                await channel.send(f"📉 **{victim}**님이 날 수 있다고 믿었습니다.")
+                send(f"📉 **{victim}**님이 날 수 있다고 믿었습니다.")
             elif "drowned" in reason:
-                await channel.send(f"💧 **{victim}**님이 숨쉬는 법을 까먹었습니다.")
+                send(f"💧 **{victim}**님이 숨쉬는 법을 까먹었습니다.")
             elif "lava" in reason:
-                await channel.send(f"🔥 **{victim}**님이 용암 수영을 시도했습니다.")
+                send(f"🔥 **{victim}**님이 용암 수영을 시도했습니다.")
             elif "starved" in reason:
-                await channel.send(f"🍖 **{victim}**님이 배고픔을 이기지 못했습니다. 밥 좀 챙겨 드세요.")
+                send(f"🍖 **{victim}**님이 배고픔을 이기지 못했습니다. 밥 좀 챙겨 드세요.")
             elif "suffocated" in reason:
-                await channel.send(f"🧱 **{victim}**님이 벽 속에 갇혔습니다.")
+                send(f"🧱 **{victim}**님이 벽 속에 갇혔습니다.")
             elif "squashed" in reason or "anvil" in reason:
-                await channel.send(f"🔨 **{victim}**님이 떨어지는 모루에 납작해졌습니다. 머리 조심!")
+                send(f"🔨 **{victim}**님이 떨어지는 모루에 납작해졌습니다. 머리 조심!")
             elif "world" in reason or "void" in reason:
-                await channel.send(f"🌌 **{victim}**님이 공허로 떠났습니다. 사요나라.")
+                send(f"🌌 **{victim}**님이 공허로 떠났습니다. 사요나라.")
             elif "kinetic" in reason:
-                await channel.send(f"🚀 **{victim}**님이 너무 빨리 날았습니다. (운동 에너지)")
+                send(f"🚀 **{victim}**님이 너무 빨리 날았습니다. (운동 에너지)")
             elif "lightning" in reason:
-                await channel.send(f"⚡ **{victim}**님이 천벌을 받았습니다.")
+                send(f"⚡ **{victim}**님이 천벌을 받았습니다.")
             elif "frozen" in reason:
-                await channel.send(f"🥶 **{victim}**님이 동태가 되었습니다.")
+                send(f"🥶 **{victim}**님이 동태가 되었습니다.")
             elif "stung" in reason:
-                await channel.send(f"🐝 **{victim}**님이 벌집을 건드렸나 봅니다.")
+                send(f"🐝 **{victim}**님이 벌집을 건드렸나 봅니다.")
             else:
-                await channel.send(f"☠️ **{victim}**님이 사망했습니다. ({reason})")
+                send(f"☠️ **{victim}**님이 사망했습니다. ({reason})")
 
     elif event_type == 'advancement':
         player = data['player']
         advancement = data['advancement']
-        await channel.send(f"🏆 **{player}**님이 **[{advancement}]** 업적을 달성했습니다!")
+        send(f"🏆 **{player}**님이 **[{advancement}]** 업적을 달성했습니다!")
 
     elif event_type == 'login':
-        await channel.send(f"👋 **{data['player']}**님이 서버에 접속했습니다!")
+        send(f"👋 **{data['player']}**님이 서버에 접속했습니다!", group="login", item=data['player'])
 
     elif event_type == 'logout':
-        await channel.send(f"🚪 **{data['player']}**님이 서버에서 나갔습니다.")
+        send(f"🚪 **{data['player']}**님이 서버에서 나갔습니다.", group="logout", item=data['player'])
+
+async def handle_replayed_events(events):
+    """
+    봇이 꺼져 있던 동안의 로그 이벤트를 한 번에 반영합니다.
+    DB 변경은 플레이어별로 합쳐 한 번의 배치로 쓰고, 디스코드에는 요약 메시지 하나만 보냅니다.
+    실패하면 예외를 그대로 올려 파서가 몇 번 다시 시도한 뒤 이벤트를 격리하고 건너뜁니다.
+    """
+    increments = {}
+    sets = {}
+    timestamps = {}
+    counts = {"login": 0, "logout": 0, "advancement": 0, "death": 0, "pvp": 0, "server_stop": 0, "server_start": 0}
+
+    def add(player, stat, value=1):
+        # 플레이어 이름이 아닌 사망 대상(채팅, 이름 붙은 몹) 하나 때문에 배치 전체가 거부되지 않도록 걸러냄
+        if not is_player_name(player):
+            return
+        player_stats = increments.setdefault(player, {})
+        player_stats[stat] = player_stats.get(stat, 0) + value
+
+    for event_type, data in events:
+        counts[event_type] += 1
+        at = data.get('at') or datetime.datetime.now()
+        if event_type in ('login', 'logout') and not is_player_name(data['player']):
+            continue
+        if event_type == 'login':
+            sessions.on_login(data['player'], at)
+            timestamps.setdefault(data['player'], set()).add("last_login")
+        elif event_type == 'logout':
+            sessions.on_logout(data['player'], at)
+            timestamps.setdefault(data['player'], set()).add("last_logout")
+            # 통계 파일 스냅샷은 마지막 값만 반영
+            if data.get('mined_stats'):
+                sets[data['player']] = dict(data['mined_stats'])
+        elif event_type == 'server_stop':
+            sessions.on_server_stop(at)
+        elif event_type == 'server_start':
+            sessions.on_server_start(at)
+        elif event_type == 'advancement':
+            add(data['player'], "advancements")
+        elif event_type == 'death':
+            add(data['victim'], "deaths")
+            if data['is_pvp'] and data['killer']:
+                add(data['killer'], "kills")
+                counts["pvp"] += 1
+
+    # 세션 추적기가 쓰기 버퍼에 넣은 접속 시간보다 뒤에 적용되도록 통계 파일의 playtime은 버퍼로 설정
+    for player, stats in sets.items():
+        if 'playtime' in stats:
+            db.writer.set(player, "playtime", stats.pop('playtime'))
+
+    await db.apply_batch(increments=increments, sets=sets, timestamps=timestamps)
+    await sessions.flush()
+    log.info("Applied %d replayed events: %s", len(events), counts)
+
+    # 봇이 아직 로그인 중이면 발송기가 연결될 때까지 보관했다가 전송
+    if Config.DISCORD_TOKEN:
+        notifier.notify(
+            Config.NOTIFY_CHANNEL_ID,
+            f"🔄 **봇이 꺼져 있던 동안의 기록을 반영했습니다.**\n"
+            f"접속 {counts['login']}회 · 퇴장 {counts['logout']}회 · 업적 {counts['advancement']}개 · "
+            f"사망 {counts['death']}회 (PvP {counts['pvp']}회)"
+        )
 
 # FastAPI 설정
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # 시작
-    print("Initializing Database...")
+    log.info("Initializing database...")
     await db.connect()
     await db.init_db() # Recreate tables
+    # 백필이 실시간으로 반영한 날의 로그를 다시 집계하지 않도록 시작일을 기록
+    await db.record_live_ingest_start()
+    # 봇이 꺼지기 전에 접속 중이던 세션을 이어서 추적
+    await sessions.start()
     
     # Load all extensions here
     extensions = ["cogs.admin", "cogs.stats", "cogs.grafana"]
     for ext in extensions:
         try:
             await bot.load_extension(ext)
-            print(f"Loaded extension: {ext}")
+            log.info("Loaded extension: %s", ext)
         except Exception as e:
-            print(f"Failed to load extension {ext}: {e}")
+            log.exception("Failed to load extension %s: %s", ext, e)
     
-    print("Starting Log Parser...")
+    log.info("Starting log parser...")
     
-    # Define callback wrapper for thread safety
+    # 파서 스레드 -> 이벤트 루프: 크기가 제한된 버스로 넘기고, 플레이어별 순서대로 처리
+    global event_bus
+    event_bus = EventBus(
+        handle_log_event,
+        keys=event_keys,
+        workers=Config.EVENT_BUS_WORKERS,
+        maxsize=Config.EVENT_BUS_SIZE,
+    )
+    event_bus.start()
+
     def event_callback(event_type, data):
-        if Config.DISCORD_TOKEN and bot.is_ready():
-            asyncio.run_coroutine_threadsafe(handle_log_event(event_type, data), bot.loop)
+        event_bus.publish(event_type, data)
+
+    loop = asyncio.get_running_loop()
+
+    def replay_callback(events):
+        # DB 반영이 끝난 뒤에 체크포인트가 저장되도록 파서 스레드에서 완료를 기다림
+        # (실패하면 예외를 그대로 넘겨 파서가 REPLAY_MAX_ATTEMPTS번까지 다시 시도한 뒤 격리하고 건너뜀)
+        asyncio.run_coroutine_threadsafe(handle_replayed_events(events), loop).result()
             
     # Initialize parser with callback
     global log_parser
-    log_parser = LogParser(event_callback=event_callback)
+    log_parser = LogParser(
+        event_callback=event_callback,
+        tail_mode=Config.LOG_TAIL_MODE,
+        checkpoint=LogCheckpoint(Config.LOG_CHECKPOINT_PATH),
+        replay_callback=replay_callback,
+    )
     
+    # /metrics 스크랩 시 각 컴포넌트의 현재 상태를 읽음
+    collector.log_parser = log_parser
+    collector.event_bus = event_bus
+    collector.notifier = notifier
+    collector.chart_cache = chart_cache
+
     parser_thread = threading.Thread(target=log_parser.start, daemon=True)
     parser_thread.start()
+
+    # 접속 중이거나 퇴장 로그를 놓친 플레이어의 통계도 주기적으로 반영
+    # (usercache 인덱스는 로그 파서와 공유)
+    global stats_sync
+    stats_sync = StatsSync(
+        log_parser.stats_reader,
+        db,
+        interval=Config.STATS_SYNC_INTERVAL,
+        workers=Config.STATS_SYNC_WORKERS,
+        sessions=sessions,
+    )
+    stats_sync.start()
     
     # Run Discord Bot in background
     if Config.DISCORD_TOKEN:
         asyncio.create_task(bot.start(Config.DISCORD_TOKEN))
     else:
-        print("WARNING: DISCORD_TOKEN not set. Bot will not start.")
+        log.warning("DISCORD_TOKEN not set. Bot will not start.")
         
     yield
     
     # 종료
-    print("Stopping Log Parser...")
+    log.info("Stopping log parser...")
     log_parser.stop()
+    await event_bus.stop()
+    await notifier.stop()
+    await stats_sync.stop()
     
     if not bot.is_closed():
         await bot.close()
         
+    await rcon.close()
+    await sessions.stop()
     await db.close()
 
 app = FastAPI(lifespan=lifespan)
@@ -245,16 +386,28 @@ async def health_check():
     return {
         "status": "healthy",
         "bot_connected": not bot.is_closed() and bot.is_ready(),
-        "bot_latency_ms": round(bot.latency * 1000, 2) if bot.is_ready() else None
+        "bot_latency_ms": round(bot.latency * 1000, 2) if bot.is_ready() else None,
+        "leaderboard_cache": db.leaderboard.stats(),
+        "stats_sync": stats_sync.last_pass if stats_sync else None,
+        "sessions": sessions.stats(),
+        "event_bus": event_bus.stats() if event_bus else None,
+        "notifier": notifier.stats(),
+        "chart_cache": chart_cache.stats()
     }
 
+@app.get("/metrics")
+async def metrics():
+    """봇 자체 지표 (Prometheus 텍스트 형식). prometheus.yml의 bot 작업이 수집합니다."""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 @app.post("/alert")
 async def receive_alert(request: Request):
     """
     Prometheus Alertmanager로부터 경고를 수신하는 엔드포인트입니다.
     """
     data = await request.json()
-    print(f"Received alert: {data}")
+    log.info("Received alert: %s", data)
     
     # Extract alert info
     alerts = data.get('alerts', [])